@@ -0,0 +1,216 @@
+"""Historical backtests: replay a monthly return history over every rolling window.
+
+A return history is a CSV with one row per month: a ``month`` label
+followed by one column per catalog strategy, holding that month's return
+in percent. Lines starting with ``#`` are comments; a ``# source:`` line
+names where the numbers come from and is shown with every result.
+
+    # source: ...
+    month,High-Yield Savings,Roth IRA,...
+    1990-01,0.41,-6.71,...
+
+The app loads ``data/return_history.csv`` when it exists. The repository
+only ships ``data/sample_return_history.csv``, which is SYNTHETIC: draws from
+the catalog's returns, volatilities and correlations made by
+``synthetic_history`` (``--write-sample``), not market data. Drop a real
+history in the same format next to it to backtest against actual returns.
+
+Every window of ``years * 12`` consecutive months is a start date. With
+the prefix products ``C`` of the blended monthly growth, the value after
+``k`` months of the window starting at ``t`` is
+
+    V[t, k] = C[t + k] * (initial / C[t] + sum(c[i] / C[t + i] for 1 <= i <= k))
+
+so one strided ``sliding_window_view`` of ``1 / C`` and one cumulative sum
+give all windows at once, without re-running a projection per start date.
+The portfolio is rebalanced to the target weights every month, like the
+blended projection.
+
+Usage:
+    python backtest.py [--history FILE] [--monthly 500] [--annual-increase 5] [--years 30]
+                       [--initial 0] [--allocations "Roth IRA=70; Treasury Bonds=30"]
+    python backtest.py --write-sample data/sample_return_history.csv
+"""
+import argparse
+import csv
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from projection_engine import contribution_schedule
+from strategy_catalog import CORRELATIONS, RETURN_RATES, VOLATILITIES
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+HISTORY_PATH = os.path.join(DATA_DIR, 'return_history.csv')
+SAMPLE_PATH = os.path.join(DATA_DIR, 'sample_return_history.csv')
+
+# A month cannot lose more than this fraction of the portfolio (as in monte_carlo)
+WORST_MONTH = -0.99
+
+
+class ReturnHistory:
+    """Monthly returns (%) as a (months, strategies) matrix with row labels"""
+
+    def __init__(self, labels, returns, strategies, source=''):
+        self.labels = list(labels)
+        self.returns = np.asarray(returns, dtype=float)
+        self.strategies = list(strategies)
+        self.source = source
+
+    def __len__(self):
+        return len(self.labels)
+
+    @classmethod
+    def load(cls, path):
+        source = ''
+        rows = []
+        with open(path, newline='') as handle:
+            for line in handle:
+                if line.startswith('#'):
+                    if line[1:].strip().lower().startswith('source:'):
+                        source = line[1:].strip()[len('source:'):].strip()
+                elif line.strip():
+                    rows.append(line)
+        reader = csv.reader(rows)
+        header = next(reader, None)
+        if not header or header[0].strip().lower() != 'month':
+            raise ValueError(f"{path}: the first column must be 'month'")
+        labels, returns = [], []
+        for number, row in enumerate(reader, start=2):
+            try:
+                returns.append([float(value) for value in row[1:]])
+            except ValueError:
+                raise ValueError(f"{path}: row {number} has a non-numeric return") from None
+            if len(returns[-1]) != len(header) - 1:
+                raise ValueError(f"{path}: row {number} has {len(returns[-1])} returns, expected {len(header) - 1}")
+            labels.append(row[0])
+        return cls(labels, np.array(returns).reshape(len(labels), len(header) - 1),
+                   [name.strip() for name in header[1:]], source or os.path.basename(path))
+
+    def write(self, path):
+        with open(path, 'w', newline='') as handle:
+            handle.write(f"# source: {self.source}\n")
+            writer = csv.writer(handle, lineterminator='\n')
+            writer.writerow(['month', *self.strategies])
+            for label, row in zip(self.labels, self.returns):
+                writer.writerow([label, *(f"{value:.4f}" for value in row)])
+
+    def portfolio_returns(self, allocations):
+        """Blended monthly return (fraction) for a {strategy: weight} mix, rebalanced monthly"""
+        missing = [s for s in allocations if s not in self.strategies]
+        if missing:
+            raise ValueError(f"no history for {', '.join(missing)} in {self.source}")
+        total = sum(allocations.values())
+        if total <= 0:
+            raise ValueError("allocations must sum to a positive value")
+        weights = np.zeros(len(self.strategies))
+        for strategy, weight in allocations.items():
+            weights[self.strategies.index(strategy)] = weight / total
+        return np.maximum(self.returns @ weights / 100, WORST_MONTH)
+
+
+def synthetic_history(months=1200, seed=1926):
+    """A SYNTHETIC history drawn from the catalog (normal returns, catalog correlations)
+
+    Only meant as a stand-in until a real history is supplied; see the
+    module docstring.
+    """
+    from correlated_shocks import cholesky_factor, correlation_matrix
+    strategies = list(RETURN_RATES)
+    factor = cholesky_factor(correlation_matrix(strategies, CORRELATIONS))
+    shocks = np.random.default_rng(seed).standard_normal((months, len(strategies))) @ factor.T
+    returns = (np.array([RETURN_RATES[s] for s in strategies]) / 12
+               + shocks * np.array([VOLATILITIES[s] for s in strategies]) / np.sqrt(12))
+    return ReturnHistory([f"month {m}" for m in range(1, months + 1)], returns, strategies,
+                         f"SYNTHETIC sample, not market data (backtest.synthetic_history, seed {seed})")
+
+
+@lru_cache(maxsize=1)
+def default_history():
+    """The real history if one has been added, otherwise the synthetic sample"""
+    return ReturnHistory.load(HISTORY_PATH if os.path.exists(HISTORY_PATH) else SAMPLE_PATH)
+
+
+class Backtest:
+    """Portfolio values for every rolling start date, shaped (windows, months + 1)"""
+
+    def __init__(self, values, contributions_total, starts, source):
+        self.values = values
+        self.contributions_total = contributions_total
+        self.starts = starts
+        self.source = source
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def final_values(self):
+        return self.values[:, -1]
+
+    def outcome(self, which):
+        """(start label, final value) of the 'worst', 'median' or 'best' window"""
+        order = np.argsort(self.final_values, kind='stable')
+        index = {'worst': order[0], 'median': order[len(order) // 2], 'best': order[-1]}[which]
+        return self.starts[index], float(self.final_values[index])
+
+    def band(self):
+        """Per-month (worst, median, best) across windows, each of length months + 1"""
+        return self.values.min(axis=0), np.median(self.values, axis=0), self.values.max(axis=0)
+
+
+def backtest(history, monthly, annual_increase, years, initial, allocations):
+    """Project the {strategy: weight} mix over every window of ``years`` in ``history``"""
+    months = int(years) * 12
+    if months > len(history):
+        raise ValueError(f"{years} years needs {months} months of history; {history.source} has {len(history)}")
+    growth = np.empty(len(history) + 1)
+    growth[0] = 1.0
+    np.cumprod(1 + history.portfolio_returns(allocations), out=growth[1:])
+    # Row t is 1 / C[t .. t + months], a strided view: no window is copied
+    windows = sliding_window_view(1 / growth, months + 1)
+    contributions = contribution_schedule(float(monthly), float(annual_increase), months)
+
+    values = windows * contributions
+    np.cumsum(values, axis=1, out=values)
+    values += float(initial) * windows[:, :1]
+    values /= windows
+    return Backtest(values, np.cumsum(contributions), history.labels[:len(values)], history.source)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history', help="return history CSV (default: data/return_history.csv, else the sample)")
+    parser.add_argument('--monthly', type=float, default=500.0)
+    parser.add_argument('--annual-increase', type=float, default=5.0, help="yearly contribution increase (%%)")
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--initial', type=float, default=0.0)
+    parser.add_argument('--allocations', default='Index Funds (S&P500)=60; Treasury Bonds=40',
+                        help='"Strategy=weight; ..." (default: 60/40 index funds and Treasury bonds)')
+    parser.add_argument('--write-sample', metavar='FILE', help="write a synthetic sample history and exit")
+    args = parser.parse_args(argv)
+
+    if args.write_sample:
+        synthetic_history().write(args.write_sample)
+        return 0
+    try:
+        history = ReturnHistory.load(args.history) if args.history else default_history()
+        allocations = {name.strip(): float(weight) for name, weight in
+                       (part.split('=') for part in args.allocations.split(';') if part.strip())}
+        result = backtest(history, args.monthly, args.annual_increase / 100, args.years, args.initial, allocations)
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"error: {exc}\n")
+
+    contributed = result.contributions_total[-1] + args.initial
+    print(f"history: {result.source}, {len(history)} months")
+    print(f"{len(result)} rolling {args.years}-year windows, ${contributed:,.2f} contributed in each")
+    for which in ('worst', 'median', 'best'):
+        start, final = result.outcome(which)
+        print(f"  {which:<7} ${final:>16,.2f}  starting {start}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
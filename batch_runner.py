@@ -0,0 +1,301 @@
+"""Headless batch runner: project scenarios from CSV/JSONL without a GUI.
+
+Usage:
+    python batch_runner.py scenarios.csv -o results.csv [--workers 4] [--chunk-size 10000]
+                           [--columns id final_value monthly_income ...]
+    python investment_calc.py --batch scenarios.csv -o results.parquet
+    python batch_runner.py scenarios.csv -o summary.csv --store sweep/ [--store-dtype float32]
+
+Each input row is one scenario. Fields use the same units as the GUI form:
+    id               optional label, defaults to the row number
+    monthly          monthly contribution ($)
+    annual_increase  yearly contribution increase (%), default 5
+    years            investment period, default 30
+    initial          initial investment ($), default 0
+    withdrawal_rate  safe withdrawal rate (%), default 4
+    weighted_return  annual return (%), or instead
+    allocations      "Roth IRA=70; Treasury Bonds=30" (a JSON object in JSONL)
+
+Rows are read, projected and written one chunk at a time, so memory stays
+constant however long the input is. Output format follows the file
+extension (.csv, .jsonl, .parquet; Parquet needs pyarrow) or --format.
+With --store, the full month-by-month matrices are also written, chunk by
+chunk, into a memory-mapped result store (see result_store.py); its rows
+follow the input order.
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from milestones import MILESTONE_TARGETS, NOT_REACHED, first_crossings
+from parallel import BatchPool
+from projection_engine import allocation_returns, project_batch
+from result_store import ResultStore
+from strategy_catalog import RETURN_RATES
+
+# Defaults for omitted fields, matching the GUI form
+DEFAULTS = {'annual_increase': 5.0, 'years': 30, 'initial': 0.0, 'withdrawal_rate': 4.0}
+
+OUTPUT_COLUMNS = ('id', 'monthly', 'annual_increase', 'years', 'initial', 'withdrawal_rate',
+                  'weighted_return', 'final_value', 'total_contributed', 'total_gains', 'roi_pct',
+                  'annual_income', 'monthly_income') + tuple(f'years_to_{target}' for target in MILESTONE_TARGETS)
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+
+# Below this many rows per worker, shipping a chunk to the pool costs more
+# than projecting it in this process
+MIN_SHARD_ROWS = 2500
+
+
+def read_scenarios(path):
+    """Yield one dict of raw field values per scenario row"""
+    with open(path, newline='') as source:
+        if path.endswith(('.jsonl', '.ndjson', '.json')):
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(source)
+
+
+def parse_allocations(value):
+    """{strategy: weight} from a dict or a 'Strategy=weight; ...' string"""
+    if isinstance(value, dict):
+        allocations = value
+    else:
+        allocations = {}
+        for part in str(value).split(';'):
+            if part.strip():
+                strategy, _, weight = part.rpartition('=')
+                allocations[strategy.strip()] = weight
+    unknown = set(allocations) - set(RETURN_RATES)
+    if unknown:
+        raise ValueError(f"unknown strategies: {', '.join(sorted(unknown))}")
+    allocations = {strategy: float(weight) for strategy, weight in allocations.items()}
+    if sum(allocations.values()) <= 0:
+        raise ValueError("allocations must sum to a positive value")
+    return allocations
+
+
+def _field(row, name):
+    value = row.get(name)
+    if value is None or value == '':
+        if name not in DEFAULTS:
+            raise ValueError(f"missing '{name}'")
+        return DEFAULTS[name]
+    return float(value)
+
+
+def scenario_arrays(rows, first_row):
+    """Column arrays for a chunk of raw rows; ``first_row`` numbers rows in errors"""
+    strategies = list(RETURN_RATES)
+    columns = {name: np.empty(len(rows)) for name in
+               ('monthly', 'annual_increase', 'years', 'initial', 'withdrawal_rate', 'weighted_return')}
+    mixes = np.zeros((len(rows), len(strategies)))
+    has_mix = np.zeros(len(rows), dtype=bool)
+    ids = []
+    for i, row in enumerate(rows):
+        try:
+            for name in ('monthly', 'annual_increase', 'years', 'initial', 'withdrawal_rate'):
+                columns[name][i] = _field(row, name)
+            if row.get('weighted_return') not in (None, ''):
+                columns['weighted_return'][i] = float(row['weighted_return'])
+            elif row.get('allocations') not in (None, ''):
+                mix = parse_allocations(row['allocations'])
+                mixes[i] = [mix.get(strategy, 0.0) for strategy in strategies]
+                has_mix[i] = True
+            else:
+                raise ValueError("needs 'weighted_return' or 'allocations'")
+        except ValueError as exc:
+            raise ValueError(f"row {first_row + i}: {exc}") from None
+        ids.append(str(row.get('id') or first_row + i))
+    if has_mix.any():
+        columns['weighted_return'][has_mix] = allocation_returns(
+            mixes[has_mix], [RETURN_RATES[strategy] for strategy in strategies])
+    columns['years'] = columns['years'].astype(np.int64)
+    columns['id'] = ids
+    return columns
+
+
+def scan(path):
+    """(row count, longest horizon in months) of a scenario file, for sizing a store"""
+    count = horizon = 0
+    for count, row in enumerate(read_scenarios(path), 1):
+        try:
+            horizon = max(horizon, int(_field(row, 'years')) * 12)
+        except ValueError:
+            pass  # reported with its row number once the chunk is parsed
+    return count, horizon
+
+
+def project_chunk(columns, pool=None, store=None, start=0):
+    """Projection summary and milestone columns for one chunk of scenarios
+
+    ``pool`` is a BatchPool shared by every chunk of a run; chunks too small
+    to split across it are projected in this process. With a ResultStore,
+    the chunk's matrices are also written to its rows from ``start``.
+    """
+    args = (columns['monthly'], columns['annual_increase'] / 100, columns['years'],
+            columns['initial'], columns['weighted_return'])
+    if pool is not None and len(columns['id']) >= pool.workers * MIN_SHARD_ROWS:
+        batch = pool.project(*args)
+    else:
+        batch = project_batch(*args)
+    if store is not None:
+        store.write(start, batch, np.column_stack(args))
+
+    final_value = batch.final_values
+    total_contributed = batch.final_contributions + columns['initial']
+    total_gains = final_value - total_contributed
+    annual_income = final_value * columns['withdrawal_rate'] / 100
+    results = dict(columns)
+    results.update({
+        'final_value': final_value,
+        'total_contributed': total_contributed,
+        'total_gains': total_gains,
+        'roi_pct': np.divide(total_gains * 100, total_contributed,
+                             out=np.zeros(len(final_value)), where=total_contributed > 0),
+        'annual_income': annual_income,
+        'monthly_income': annual_income / 12,
+    })
+    crossings = first_crossings(batch.portfolio_values, MILESTONE_TARGETS)
+    for i, target in enumerate(MILESTONE_TARGETS):
+        results[f'years_to_{target}'] = np.where(crossings[:, i] == NOT_REACHED, np.nan, crossings[:, i] / 12)
+    return results, int(batch.months.sum())
+
+
+def _records(results, columns):
+    """Row tuples with NaN (milestone not reached) as None"""
+    data = [results[name] if name == 'id' else results[name].tolist() for name in columns]
+    for row in zip(*data):
+        yield tuple(None if isinstance(value, float) and math.isnan(value) else value for value in row)
+
+
+class CsvSink:
+    def __init__(self, path, columns):
+        self.columns = columns
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, results):
+        self._writer.writerows(_records(results, self.columns))
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlSink:
+    def __init__(self, path, columns):
+        self.columns = columns
+        self._file = open(path, 'w')
+
+    def write(self, results):
+        for record in _records(results, self.columns):
+            self._file.write(json.dumps(dict(zip(self.columns, record))) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """Parquet output via pyarrow, one row group per chunk"""
+
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow") from None
+        self._pa = pa
+        self.columns = columns
+        self._schema = pa.schema([(name, pa.string() if name == 'id' else
+                                   pa.int64() if name == 'years' else pa.float64()) for name in columns])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, results):
+        arrays = [self._pa.array(results[name], type=self._schema.field(name).type,
+                                 from_pandas=True) for name in self.columns]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+SINKS = {'csv': CsvSink, 'jsonl': JsonlSink, 'parquet': ParquetSink}
+
+
+def run(input_path, output_path, columns=OUTPUT_COLUMNS, workers=1, chunk_size=10000, output_format=None,
+        store_path=None, store_dtype='float64'):
+    """Stream every scenario in ``input_path`` to ``output_path``; returns run statistics"""
+    output_format = output_format or os.path.splitext(output_path)[1].lstrip('.').lower()
+    if output_format not in SINKS:
+        raise ValueError(f"unsupported output format '{output_format}' (use one of {', '.join(FORMATS)})")
+
+    start = time.perf_counter()
+    store = None
+    if store_path is not None:
+        store = ResultStore.create(store_path, *scan(input_path), dtype=store_dtype)
+    scenarios = months = 0
+    rows = read_scenarios(input_path)
+    sink = SINKS[output_format](output_path, tuple(columns))
+    # One pool for the whole run; its processes start with the first chunk big enough to use them
+    pool = BatchPool(workers) if workers > 1 else None
+    try:
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            results, chunk_months = project_chunk(scenario_arrays(chunk, scenarios + 1), pool,
+                                                  store, scenarios)
+            sink.write(results)
+            scenarios += len(chunk)
+            months += chunk_months
+    finally:
+        sink.close()
+        if pool is not None:
+            pool.close()
+    if store is not None:
+        store.close()
+    return {'scenarios': scenarios, 'months': months, 'seconds': time.perf_counter() - start}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog='\n'.join(__doc__.splitlines()[2:]))
+    parser.add_argument('input', help="scenario file (.csv or .jsonl)")
+    parser.add_argument('-o', '--output', required=True, help="result file (.csv, .jsonl or .parquet)")
+    parser.add_argument('--format', choices=FORMATS, help="output format if not implied by the extension")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes shared by every chunk (default 1); small chunks run in-process")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="scenarios held in memory at once")
+    parser.add_argument('--columns', nargs='+', choices=OUTPUT_COLUMNS, default=OUTPUT_COLUMNS,
+                        metavar='COLUMN', help="output columns, in order (default: all)")
+    parser.add_argument('--store', metavar='DIR', help="also write the monthly matrices to a result store")
+    parser.add_argument('--store-dtype', choices=('float64', 'float32'), default='float64',
+                        help="storage precision of the result store (default float64)")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = run(args.input, args.output, args.columns, args.workers, args.chunk_size, args.format,
+                    args.store, args.store_dtype)
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"error: {exc}\n")
+
+    seconds = max(stats['seconds'], 1e-9)
+    print(f"{stats['scenarios']:,} scenarios ({stats['months']:,} projected months) in {seconds:.2f}s: "
+          f"{stats['scenarios'] / seconds:,.0f} scenarios/s, {stats['months'] / seconds / 1e6:,.1f}M months/s",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
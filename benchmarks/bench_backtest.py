@@ -0,0 +1,95 @@
+"""Speed and accuracy of the rolling-window historical backtest.
+
+Times ``backtest`` (one strided sliding-window view and one cumulative sum
+for every start date) against projecting each window separately, the way
+re-running the calculation per start date would, and checks both agree.
+Fails (exit 1) if any window differs by more than --tolerance, relative to
+its final value.
+
+Runs on the bundled sample history unless --history is given; note the
+sample is SYNTHETIC (see backtest.py).
+
+Usage:
+    python benchmarks/bench_backtest.py [--history FILE] [--tolerance 1e-9] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from backtest import ReturnHistory, backtest, default_history
+from projection_engine import contribution_schedule
+
+HORIZONS = (10, 30, 40, 60)
+SCENARIO = (500, 0.05, 1000)  # monthly, annual increase, initial
+ALLOCATIONS = {'Index Funds (S&P500)': 0.6, 'Treasury Bonds': 0.4}
+
+
+def best(fn, repeat=5):
+    """Best seconds per call"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def per_window(history, monthly, annual_increase, years, initial):
+    """Reference: one projection per start date"""
+    months = years * 12
+    returns = history.portfolio_returns(ALLOCATIONS)
+    contributions = contribution_schedule(monthly, annual_increase, months)
+    rows = []
+    for start in range(len(history) - months + 1):
+        growth = np.concatenate([[1.0], np.cumprod(1 + returns[start:start + months])])
+        rows.append(growth * (initial + np.cumsum(contributions / growth)))
+    return np.array(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history', help="return history CSV (default: the app's history)")
+    parser.add_argument('--tolerance', type=float, default=1e-9,
+                        help="largest allowed difference from the per-window loop, relative to the final value")
+    parser.add_argument('--json', action='store_true', help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    history = ReturnHistory.load(args.history) if args.history else default_history()
+    monthly, annual_increase, initial = SCENARIO
+    rows = []
+    for years in HORIZONS:
+        if years * 12 > len(history):
+            continue
+        run = lambda: backtest(history, monthly, annual_increase, years, initial, ALLOCATIONS)
+        result = run()
+        reference = per_window(history, monthly, annual_increase, years, initial)
+        error = float((np.abs(result.values - reference) / reference[:, -1:]).max())
+        rows.append({'years': years, 'windows': len(result), 'strided_ms': best(run) * 1e3,
+                     'per_window_ms': best(lambda: per_window(history, monthly, annual_increase, years, initial),
+                                           1) * 1e3,
+                     'worst': result.outcome('worst')[1], 'median': result.outcome('median')[1],
+                     'best': result.outcome('best')[1], 'max_error': error})
+    failed = [row['years'] for row in rows if row['max_error'] > args.tolerance]
+
+    if args.json:
+        print(json.dumps({'history': history.source, 'months': len(history), 'allocations': ALLOCATIONS,
+                          'horizons': rows, 'tolerance': args.tolerance, 'failed': failed}, indent=2))
+    else:
+        print(f"history: {history.source}, {len(history)} months")
+        print(f"{'years':>6}{'windows':>9}{'strided ms':>12}{'loop ms':>10}{'worst $':>15}{'median $':>15}"
+              f"{'best $':>15}{'max error':>11}")
+        for row in rows:
+            print(f"{row['years']:>6}{row['windows']:>9}{row['strided_ms']:>12.2f}{row['per_window_ms']:>10.2f}"
+                  f"{row['worst']:>15,.0f}{row['median']:>15,.0f}{row['best']:>15,.0f}{row['max_error']:>11.1e}")
+    if failed:
+        print(f"strided backtest differs from the per-window loop at {', '.join(map(str, failed))} years",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Memory and accuracy of the float64 and compact (float32) result modes.
+
+Projects a batch of scenarios and a Monte Carlo run in every storage mode,
+reports peak traced memory, bytes per stored month and time, then checks
+float32 results against float64:
+
+    batch/float64+derived  float64 values and contributions, plus gains, ROI
+                           and income materialized like create_graph does
+    batch/float64          float64 values and contributions
+    batch/float32          compact storage, derived series on demand
+    paths/float64          every Monte Carlo path kept
+    paths/float32          every path kept in float32
+    bands                  quantile-only reduction while generating (run())
+
+Fails (exit 1) if any float32 value differs from float64 by more than
+--tolerance relative to the float64 portfolio value.
+
+Usage:
+    python benchmarks/bench_compact.py [--scenarios 20000] [--paths 20000] [--years 40]
+                                       [--tolerance 1e-6] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from monte_carlo import MonteCarloSimulation
+from projection_engine import project_batch
+from strategy_catalog import RETURN_RATES, VOLATILITIES
+
+STRATEGIES = ('Roth IRA', 'Index Funds (S&P500)', 'High-Yield Savings')
+
+
+def measure(fn):
+    """(result, peak traced bytes, seconds) of one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak, seconds
+
+
+def materialized(batch, initial, withdrawal_rate):
+    """A float64 batch with every derived series computed up front"""
+    return batch, batch.gains(), batch.roi(initial), batch.income(withdrawal_rate)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=20000)
+    parser.add_argument('--paths', type=int, default=20000)
+    parser.add_argument('--years', type=int, default=40)
+    parser.add_argument('--tolerance', type=float, default=1e-6,
+                        help="largest allowed float32 error, relative to the portfolio value")
+    parser.add_argument('--json', action='store_true', help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(17)
+    count = args.scenarios
+    initial = rng.uniform(0, 10000, count)
+    sweep = (rng.uniform(10, 1000, count), rng.uniform(0, 0.1, count), args.years, initial,
+             rng.uniform(0, 12, count))
+    withdrawal_rate = 0.04
+    simulation = MonteCarloSimulation(500, 0.05, args.years, 1000, [RETURN_RATES[s] for s in STRATEGIES],
+                                      [VOLATILITIES[s] for s in STRATEGIES], (0.4, 0.4, 0.2),
+                                      n_paths=args.paths, seed=2024)
+    stored_months = {'batch': count * (args.years * 12 + 1), 'paths': args.paths * (args.years * 12 + 1)}
+
+    modes = {
+        'batch/float64+derived': lambda: materialized(project_batch(*sweep), initial, withdrawal_rate),
+        'batch/float64': lambda: project_batch(*sweep),
+        'batch/float32': lambda: project_batch(*sweep, dtype=np.float32),
+        'paths/float64': simulation.paths,
+        'paths/float32': lambda: simulation.paths(np.float32),
+        'bands': simulation.run,
+    }
+    results = {}
+    outputs = {}
+    for mode, fn in modes.items():
+        outputs[mode], peak, seconds = measure(fn)
+        months = stored_months['batch' if mode.startswith('batch') else 'paths']
+        results[mode] = {'peak_mb': peak / 2 ** 20, 'bytes_per_month': peak / months, 'seconds': seconds}
+
+    exact, compact = outputs['batch/float64'], outputs['batch/float32']
+    scale = np.maximum(np.abs(exact.portfolio_values), 1)
+    errors = {
+        'batch_values': np.nanmax(np.abs(compact.portfolio_values - exact.portfolio_values) / scale),
+        'batch_contributions': np.nanmax(np.abs(compact.contributions_total - exact.contributions_total) / scale),
+        'batch_gains': np.nanmax(np.abs(compact.gains() - exact.gains()) / scale),
+        'batch_income': np.nanmax(np.abs(compact.income(withdrawal_rate) - exact.income(withdrawal_rate)) / scale),
+        'paths': np.max(np.abs(outputs['paths/float32'] - outputs['paths/float64'])
+                        / np.maximum(np.abs(outputs['paths/float64']), 1)),
+    }
+    errors = {name: float(error) for name, error in errors.items()}
+    failed = sorted(name for name, error in errors.items() if error > args.tolerance)
+
+    if args.json:
+        print(json.dumps({'modes': results, 'max_relative_error': errors, 'tolerance': args.tolerance,
+                          'failed': failed}, indent=2))
+    else:
+        print(f"{args.scenarios:,} scenarios and {args.paths:,} paths over {args.years} years")
+        print(f"\n{'mode':<24}{'peak MB':>10}{'bytes/month':>14}{'seconds':>10}")
+        for mode, row in results.items():
+            print(f"{mode:<24}{row['peak_mb']:>10.1f}{row['bytes_per_month']:>14.2f}{row['seconds']:>10.3f}")
+        print(f"\n{'float32 vs float64':<24}{'max rel. error':>16}")
+        for name, error in errors.items():
+            print(f"{name:<24}{error:>16.2e}")
+    if failed:
+        print(f"\nfloat32 error above {args.tolerance:g}: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Throughput and accuracy of the correlated shock generator.
+
+Streams --path-months correlated draws for every catalog strategy and
+compares the rate with drawing the same independent normals alone (the
+matmul is the only extra work). It then checks the sample correlation
+against the catalog matrix, times a Cholesky factorization against a cache
+hit, and replays a run of slider moves and re-runs through one
+CholeskyCache. It edits a return rate and a correlation through the
+calculator's set_return_rate / set_correlation (on a calculator with no
+window) and checks the next projection and factor use the new values. Last,
+it shows how correlation widens the Monte Carlo bands of an equity-heavy
+mix. Fails (exit 1) if the sample correlation is off by more than
+--tolerance, if the replay factorizes more than once per strategy subset,
+or if an edit leaves a stale projection or factor in the caches.
+
+Usage:
+    python benchmarks/bench_correlated.py [--path-months 10000000] [--tolerance 0.01] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from correlated_shocks import CholeskyCache, CorrelatedShocks, cholesky_factor, correlation_matrix
+from monte_carlo import MonteCarloSimulation
+from strategy_catalog import CORRELATIONS, RETURN_RATES, VOLATILITIES
+
+STRATEGIES = list(RETURN_RATES)
+MIX = {'Roth IRA': 0.35, 'Index Funds (S&P500)': 0.35, 'Robo-Advisor': 0.2, 'Treasury Bonds': 0.1}
+
+
+def rate(fn, path_months):
+    """Path-months per second of one call"""
+    start = time.perf_counter()
+    fn()
+    return path_months / (time.perf_counter() - start)
+
+
+def edit_replay():
+    """Stale cache entries left after editing a return rate and a correlation"""
+    from instrumentation import Instrumentation
+    from investment_calc import InvestmentCalculator
+
+    calc = InvestmentCalculator.__new__(InvestmentCalculator)  # the edit methods need no window
+    calc.return_rates, calc.correlations = dict(RETURN_RATES), dict(CORRELATIONS)
+    calc.return_rates_version = calc.correlations_version = 0
+    calc.projection_cache, calc.pipeline, calc.cholesky_cache = None, None, CholeskyCache()
+    calc.metrics = Instrumentation()
+    mix = tuple(MIX.items())
+
+    def final_value():
+        # Same hand-off as request_calculation: the worker sees a copy of the rates
+        inputs = dict(monthly=500, annual_increase=0.05, years=30, initial=1000, allocations=mix,
+                      rates_version=calc.return_rates_version, history=False, retirement=False)
+        projection = calc.compute_projection(None, inputs, dict(calc.return_rates), None, None, 0)[2]
+        return float(projection.portfolio_values[-1])
+
+    def factor():
+        return calc.cholesky_cache.factor(list(MIX), calc.correlations, calc.correlations_version)
+
+    stale = []
+    before = final_value()
+    calc.set_return_rate('Roth IRA', RETURN_RATES['Roth IRA'] + 2)
+    if final_value() <= before:
+        stale.append("projection after a return edit")
+    before = factor()
+    calc.set_correlation('Index Funds (S&P500)', 'Roth IRA', 0.1)
+    if np.allclose(factor(), before) or len(calc.cholesky_cache) != 1:
+        stale.append("factor after a correlation edit")
+    return stale
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--path-months', type=int, default=10_000_000)
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help="largest allowed gap between sample and catalog correlation")
+    parser.add_argument('--json', action='store_true', help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    matrix = correlation_matrix(STRATEGIES)
+    shocks = CorrelatedShocks(cholesky_factor(matrix), seed=7)
+    rng = np.random.default_rng(7)
+    scratch = np.empty((shocks.chunk_rows, len(STRATEGIES)))
+
+    def independent():
+        for start in range(0, args.path_months, shocks.chunk_rows):
+            rows = min(shocks.chunk_rows, args.path_months - start)
+            rng.standard_normal((rows, len(STRATEGIES)), out=scratch[:rows])
+
+    throughput = {'independent': rate(independent, args.path_months),
+                  'correlated': rate(lambda: sum(1 for _ in shocks.chunks(args.path_months)), args.path_months)}
+    sample = shocks.draw(min(args.path_months, 2_000_000))
+    error = float(np.abs(np.corrcoef(sample.T) - matrix).max())
+
+    timer = timeit.Timer(lambda: cholesky_factor(correlation_matrix(STRATEGIES)))
+    number, _ = timer.autorange()
+    factorize = min(timer.repeat(5, number)) / number
+    cache = CholeskyCache()
+    cache.factor(STRATEGIES)
+    timer = timeit.Timer(lambda: cache.factor(STRATEGIES))
+    number, _ = timer.autorange()
+    lookup = min(timer.repeat(5, number)) / number
+
+    # 200 calculations: slider moves keep the subset, a few toggles change it
+    replay = CholeskyCache()
+    subsets = set()
+    for step in range(200):
+        subset = STRATEGIES[:3 + (step // 50) % 3]
+        subsets.add(tuple(subset))
+        replay.factor(subset)
+    refactorized = replay.factorizations - len(subsets)
+
+    simulation = lambda factor: MonteCarloSimulation(
+        500, 0.05, 30, 1000, [RETURN_RATES[s] for s in MIX], [VOLATILITIES[s] for s in MIX], list(MIX.values()),
+        n_paths=20000, seed=11, correlation_factor=factor).run().percentiles()[:, -1]
+    bands = {'independent': simulation(None).tolist(),
+             'correlated': simulation(CholeskyCache().factor(list(MIX))).tolist()}
+
+    stale = edit_replay()
+
+    failed = [f"stale {item}" for item in stale]
+    if error > args.tolerance:
+        failed.append(f"sample correlation off by {error:.4f}")
+    if refactorized:
+        failed.append(f"{refactorized} avoidable factorizations")
+    if args.json:
+        print(json.dumps({'path_months': args.path_months, 'throughput': throughput, 'max_correlation_error': error,
+                          'factorize_us': factorize * 1e6, 'cached_us': lookup * 1e6, 'replay': replay.stats(),
+                          'stale_after_edits': stale,
+                          'final_bands': bands, 'failed': failed}, indent=2))
+    else:
+        print(f"{args.path_months:,} path-months x {len(STRATEGIES)} strategies, "
+              f"chunks of {shocks.chunk_rows:,} rows")
+        for name, value in throughput.items():
+            print(f"  {name:<12}{value / 1e6:>8.1f} M path-months/s")
+        print(f"  max |sample - catalog| correlation  {error:.4f}")
+        print(f"  Cholesky factorization {factorize * 1e6:.1f} us, cache hit {lookup * 1e6:.2f} us")
+        print(f"  replay of 200 calculations: {replay.factorizations} factorizations for {len(subsets)} subsets")
+        print(f"  return and correlation edits: {'stale ' + ', '.join(stale) if stale else 'caches refreshed'}")
+        print(f"\nfinal value P5/P50/P95, {', '.join(MIX)}")
+        for name, values in bands.items():
+            print(f"  {name:<12}" + ''.join(f"  ${value:>12,.0f}" for value in values))
+    if failed:
+        print('; '.join(failed), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
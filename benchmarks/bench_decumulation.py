@@ -0,0 +1,103 @@
+"""Speed and accuracy of the batched withdrawal-rate sweep.
+
+Times one ``decumulation.stochastic`` pass over every rate of the default
+sweep against one pass per rate. It reports the share of path-months whose
+cumulative sums were still computed once paths out of money at every rate
+are dropped, for the default sweep and for a high-rate sweep (random draws
+are made for every path either way). The depletion months are checked
+against a month-by-month balance loop over a subset of the paths. Fails
+(exit 1) if any path runs out in a different month than the loop says.
+
+Usage:
+    python benchmarks/bench_decumulation.py [--paths 10000] [--check-paths 200] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import decumulation
+from decumulation import NOT_DEPLETED, SWEEP_RATES, decumulate, withdrawal_schedule
+from strategy_catalog import RETURN_RATES, VOLATILITIES
+
+MIX = {'Index Funds (S&P500)': 0.6, 'Treasury Bonds': 0.4}
+HIGH_RATES = np.round(np.arange(0.06, 0.12 + 1e-9, 0.0025), 4)
+
+
+def best(fn, repeat=3):
+    """Best seconds per call"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def balance_loop(growth, rates, inflation):
+    """Reference: walk every path's balance month by month at every rate"""
+    schedule = withdrawal_schedule(growth.shape[1], inflation)
+    depletion = np.full((len(growth), len(rates)), NOT_DEPLETED)
+    for path, factors in enumerate(growth):
+        for column, rate in enumerate(rates):
+            balance = 1.0
+            for month, factor in enumerate(factors):
+                balance = balance * max(factor, 1 + decumulation.WORST_MONTH) - rate * schedule[month]
+                if balance <= 0:
+                    depletion[path, column] = month + 1
+                    break
+    return depletion
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paths', type=int, default=10000)
+    parser.add_argument('--check-paths', type=int, default=200, help="paths checked against the balance loop")
+    parser.add_argument('--json', action='store_true', help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    params = ([RETURN_RATES[s] for s in MIX], [VOLATILITIES[s] for s in MIX], list(MIX.values()))
+
+    def sweep(rates):
+        return decumulation.stochastic(*params, n_paths=args.paths, seed=3, rates=rates)
+
+    def per_rate():
+        return [sweep([rate]) for rate in SWEEP_RATES]
+
+    result = sweep(SWEEP_RATES)
+    timings = {'batched_ms': best(lambda: sweep(SWEEP_RATES)) * 1e3, 'per_rate_ms': best(per_rate, 1) * 1e3}
+    full = args.paths * result.months
+    computed = {'default': result.months_computed / full, 'high': sweep(HIGH_RATES).months_computed / full}
+
+    growth = 1 + np.random.default_rng(5).normal(0.006, 0.045, (args.check_paths, result.months))
+    batched = decumulate(lambda rows, start, stop: growth[rows, start:stop].copy(), args.check_paths, result.months)
+    mismatches = int((batched.depletion != balance_loop(growth, SWEEP_RATES, decumulation.INFLATION)).sum())
+
+    failed = [f"{mismatches} depletion months differ from the balance loop"] if mismatches else []
+    if args.json:
+        print(json.dumps({'paths': args.paths, 'rates': len(SWEEP_RATES), 'timings': timings,
+                          'months_computed': computed, 'success': dict(zip(SWEEP_RATES.tolist(),
+                                                                           result.success_rates.tolist())),
+                          'max_safe_rate': result.max_safe_rate(), 'mismatches': mismatches, 'failed': failed},
+                         indent=2))
+    else:
+        print(f"{args.paths:,} paths x {result.months} months, {len(SWEEP_RATES)} rates "
+              f"({SWEEP_RATES[0]:.2%}-{SWEEP_RATES[-1]:.2%}), {', '.join(MIX)}")
+        print(f"  batched sweep   {timings['batched_ms']:>9.1f} ms")
+        print(f"  one run a rate  {timings['per_rate_ms']:>9.1f} ms")
+        print(f"  path-months summed (all are drawn): {computed['default']:.1%} for the default sweep, "
+              f"{computed['high']:.1%} for {HIGH_RATES[0]:.0%}-{HIGH_RATES[-1]:.0%}")
+        safe = result.max_safe_rate()
+        print(f"  success at 4%: {result.success(0.04):.1%}, highest 95% rate: "
+              f"{f'{safe:.2%}' if safe is not None else 'none'}")
+        print(f"  {mismatches} mismatches against the balance loop over {args.check_paths} paths")
+    if failed:
+        print('; '.join(failed), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Throughput and quality of the allocation optimizer.
+
+Times the batch estimate (mixes scored per second), the common-random-number
+Monte Carlo that confirms the shortlist, and a whole ``optimize`` call for
+both objectives over the full catalog. It reports how far the estimates of
+the simulated mixes are from their simulated medians. Fails (exit 1) if an
+optimum breaks a cap, or if any single-strategy mix or the equal-weight mix
+beats it on the same simulated paths.
+
+Usage:
+    python benchmarks/bench_optimizer.py [--candidates 4000] [--years 30] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from correlated_shocks import CholeskyCache
+from optimizer import CONFIRM_PATHS, capped, optimize, ranking, score, simulate
+from strategy_catalog import ALLOCATION_CAPS, RETURN_RATES, VOLATILITIES
+
+STRATEGIES = list(RETURN_RATES)
+SCENARIO = (500, 0.05, 1000)  # monthly, annual increase, initial
+
+
+def seconds(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=4000, help="first-round candidates per optimize call")
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--json', action='store_true', help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    monthly, annual_increase, initial = SCENARIO
+    factor = CholeskyCache().factor(STRATEGIES)
+    returns = [RETURN_RATES[s] for s in STRATEGIES]
+    vols = [VOLATILITIES[s] for s in STRATEGIES]
+    limits = [ALLOCATION_CAPS.get(s, 1.0) for s in STRATEGIES]
+    weights = capped(np.random.default_rng(1).dirichlet(np.ones(len(STRATEGIES)), args.candidates), limits)
+
+    elapsed, _ = seconds(lambda: score(weights, returns, vols, monthly, annual_increase, args.years, initial,
+                                       correlation_factor=factor))
+    rates = {'estimate_per_s': len(weights) / elapsed}
+    elapsed, _ = seconds(lambda: simulate(weights[:32], returns, vols, monthly, annual_increase, args.years,
+                                          initial, factor))
+    rates['simulated_per_s'] = 32 / elapsed
+
+    # Baselines: every single strategy that fits under its cap, and equal weights
+    baselines = np.vstack([np.eye(len(STRATEGIES))[[i for i, cap in enumerate(limits) if cap >= 1]],
+                           capped(np.ones((1, len(STRATEGIES))), limits)])
+    rows, failed = [], []
+    target = None
+    for objective in ('median', 'shortfall'):
+        if objective == 'shortfall':
+            # A goal the equal-weight mix misses about half the time
+            target = float(np.median(simulate(baselines[-1:], returns, vols, monthly, annual_increase, args.years,
+                                              initial, factor)))
+        elapsed, result = seconds(lambda: optimize(STRATEGIES, monthly, annual_increase, args.years, initial,
+                                                   objective, target, correlation_factor=factor,
+                                                   candidates=args.candidates, seed=0))
+        shown = list(result.simulated)
+        errors = [result.medians[i] / result.simulated[i][0] - 1 for i in shown]
+        # Same seed as the confirmation, so the baselines replay the optimum's paths
+        finals = simulate(np.vstack([result.weights[result.best], baselines]), returns, vols, monthly,
+                          annual_increase, args.years, initial, factor)
+        medians = np.median(finals, axis=1)
+        shortfalls = None if target is None else (finals < target).mean(axis=1)
+        order = ranking(medians, shortfalls, objective)
+        beaten = order[0] != 0 and (medians[order[0]] > medians[0] if objective == 'median'
+                                    else shortfalls[order[0]] < shortfalls[0])
+        over_cap = any(result.weights[result.best, i] > cap + 1e-9 for i, cap in enumerate(limits))
+        median, low, shortfall = result.outcome()
+        rows.append({'objective': objective, 'mixes': len(result), 'optimize_ms': elapsed * 1e3,
+                     'simulated': len(shown), 'median': median, 'p5': low, 'shortfall': shortfall,
+                     'target': target, 'optimum': result.slider_percentages(),
+                     'estimate_error_min': float(min(errors)), 'estimate_error_max': float(max(errors))})
+        if beaten:
+            failed.append(f"{objective}: a baseline mix beats the optimum")
+        if over_cap:
+            failed.append(f"{objective}: the optimum breaks a cap")
+
+    if args.json:
+        print(json.dumps({'years': args.years, 'confirm_paths': CONFIRM_PATHS, 'throughput': rates,
+                          'runs': rows, 'failed': failed}, indent=2))
+    else:
+        print(f"{len(STRATEGIES)} strategies, {args.years} years, {CONFIRM_PATHS:,} confirmation paths")
+        print(f"  batch estimate  {rates['estimate_per_s']:>10,.0f} mixes/s")
+        print(f"  simulated       {rates['simulated_per_s']:>10,.0f} mixes/s")
+        for row in rows:
+            print(f"\n{row['objective']}: {row['mixes']:,} mixes in {row['optimize_ms']:.0f} ms, "
+                  f"{row['simulated']} simulated")
+            print("  optimum  " + ", ".join(f"{p}% {s}" for s, p in row['optimum'].items() if p))
+            print(f"  median ${row['median']:,.0f}, P5 ${row['p5']:,.0f}"
+                  + (f", {row['shortfall']:.1%} below ${row['target']:,.0f}" if row['shortfall'] is not None else ""))
+            print(f"  estimate vs simulated median {row['estimate_error_min']:+.1%} to {row['estimate_error_max']:+.1%}")
+    if failed:
+        print('; '.join(failed), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
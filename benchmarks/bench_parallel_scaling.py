@@ -0,0 +1,74 @@
+"""Speedup of the process-pool executor versus worker count.
+
+Usage:
+    python benchmarks/bench_parallel_scaling.py [--paths 400000] [--scenarios 200000]
+                                                [--workers 1 2 4 8 16 32] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from monte_carlo import MonteCarloSimulation
+from parallel import project_batch_parallel
+from projection_engine import project_batch
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paths', type=int, default=400000)
+    parser.add_argument('--scenarios', type=int, default=200000)
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--workers', type=int, nargs='+')
+    parser.add_argument('--json', action='store_true', help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, 4, 8, 16, 32, cores} & set(range(1, cores + 1)))
+
+    simulation = MonteCarloSimulation(30, 0.05, args.years, 0, [4.5, 8.0, 8.0], [0.5, 15.0, 15.0],
+                                      [1, 1, 1], n_paths=args.paths, seed=2024)
+    rng = np.random.default_rng(7)
+    sweep = (rng.uniform(10, 1000, args.scenarios), rng.uniform(0, 0.1, args.scenarios),
+             rng.integers(1, args.years + 1, args.scenarios), rng.uniform(0, 10000, args.scenarios),
+             rng.uniform(4, 10, args.scenarios))
+
+    results = []
+    mc_base, reference = timed(simulation.run)
+    sweep_base, _ = timed(lambda: project_batch(*sweep))
+    for count in workers:
+        mc_time, bands = timed(lambda: simulation.run(workers=count))
+        if not np.array_equal(bands.percentiles(), reference.percentiles()):
+            raise SystemExit(f"Monte Carlo result changed with {count} workers")
+        sweep_time, _ = timed(lambda: project_batch_parallel(*sweep, workers=count))
+        results.append({'workers': count,
+                        'monte_carlo_seconds': mc_time, 'monte_carlo_speedup': mc_base / mc_time,
+                        'sweep_seconds': sweep_time, 'sweep_speedup': sweep_base / sweep_time})
+
+    if args.json:
+        print(json.dumps({'cores': cores, 'paths': args.paths, 'scenarios': args.scenarios,
+                          'serial': {'monte_carlo_seconds': mc_base, 'sweep_seconds': sweep_base},
+                          'results': results}, indent=2))
+        return
+
+    print(f"{cores} cores | {args.paths:,} paths x {args.years * 12} months | {args.scenarios:,} scenarios")
+    print(f"serial: monte carlo {mc_base:.2f}s, sweep {sweep_base:.2f}s")
+    print(f"{'workers':>8} {'MC s':>8} {'MC x':>6} {'sweep s':>8} {'sweep x':>8}")
+    for row in results:
+        print(f"{row['workers']:>8} {row['monte_carlo_seconds']:>8.2f} {row['monte_carlo_speedup']:>6.2f}"
+              f" {row['sweep_seconds']:>8.2f} {row['sweep_speedup']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Speed and drift of the float and cent-exact projection paths.
+
+For each horizon, times ``project`` (vectorized float) against
+``project_cents`` (integer cents, banker's rounding every month) and reports
+how far the float result drifts from the exact statement. Fails (exit 1) if
+the exact path is more than --max-ratio times slower than the float path at
+any horizon.
+
+Usage:
+    python benchmarks/bench_precision.py [--max-ratio 10] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from projection_engine import project, project_cents
+
+HORIZONS = (1, 10, 30, 50, 100)
+SCENARIO = (500, 0.05, 1000, 6.83)  # monthly, annual increase, initial, weighted return
+
+
+def best(fn, repeat=7):
+    """Best seconds per call"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-ratio', type=float, default=10.0,
+                        help="allowed slowdown of the exact path versus the float path")
+    parser.add_argument('--json', action='store_true', help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    monthly, annual_increase, initial, rate = SCENARIO
+    rows = []
+    for years in HORIZONS:
+        exact = project_cents(monthly, annual_increase, years, initial, rate)
+        fast = project(monthly, annual_increase, years, initial, rate)
+        float_seconds = best(lambda: project(monthly, annual_increase, years, initial, rate))
+        cents_seconds = best(lambda: project_cents(monthly, annual_increase, years, initial, rate))
+        rows.append({'years': years, 'float_us': float_seconds * 1e6, 'cents_us': cents_seconds * 1e6,
+                     'ratio': cents_seconds / float_seconds,
+                     'final_drift': fast.final_value - exact.final_value,
+                     'max_drift': float(abs(fast.portfolio_values - exact.portfolio_values).max())})
+    slow = [row['years'] for row in rows if row['ratio'] > args.max_ratio]
+
+    if args.json:
+        print(json.dumps({'scenario': dict(zip(('monthly', 'annual_increase', 'initial', 'weighted_return'),
+                                              SCENARIO)),
+                          'horizons': rows, 'max_ratio': args.max_ratio}, indent=2))
+    else:
+        print(f"{'years':>6}{'float [us]':>13}{'cents [us]':>13}{'ratio':>8}{'final drift $':>16}{'max drift $':>14}")
+        for row in rows:
+            print(f"{row['years']:>6}{row['float_us']:>13.1f}{row['cents_us']:>13.1f}{row['ratio']:>8.1f}"
+                  f"{row['final_drift']:>16.4f}{row['max_drift']:>14.4f}")
+    if slow:
+        print(f"cent-exact path over {args.max_ratio:g}x slower at {', '.join(map(str, slow))} years",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Speed and correctness of per-strategy projections in every rebalance mode.
+
+For each horizon and mode, times ``project_strategies`` against a plain
+month-by-month loop over the strategy balances (the obvious implementation)
+and against the blended ``project``. Fails (exit 1) if the vectorized values
+or rebalance months differ from the loop by more than --tolerance, relative
+to the portfolio value.
+
+Usage:
+    python benchmarks/bench_rebalance.py [--tolerance 1e-9] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from projection_engine import (REBALANCE_MODES, REBALANCE_PERIODS, REBALANCE_THRESHOLD, contribution_schedule,
+                               project, project_strategies, weighted_return)
+from strategy_catalog import RETURN_RATES
+
+HORIZONS = (10, 30, 100)
+SCENARIO = (500, 0.05, 1000)  # monthly, annual increase, initial
+ALLOCATIONS = {'Roth IRA': 0.4, 'Index Funds (S&P500)': 0.3, 'High-Yield Savings': 0.2,
+               'Crypto (High Risk)': 0.1}
+
+
+def best(fn, repeat=5):
+    """Best seconds per call"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def looped(monthly, annual_increase, years, initial, rebalance):
+    """Reference: every month, every strategy, in Python"""
+    weights = [ALLOCATIONS[s] / sum(ALLOCATIONS.values()) for s in ALLOCATIONS]
+    growth = [1 + RETURN_RATES[s] / 1200 for s in ALLOCATIONS]
+    months = years * 12
+    deposits = contribution_schedule(monthly, annual_increase, months).tolist()
+    period = REBALANCE_PERIODS.get(rebalance)
+    balances = [initial * w for w in weights]
+    rows, rebalanced = [balances], []
+    for month in range(1, months + 1):
+        balances = [b * g + deposits[month] * w for b, g, w in zip(balances, growth, weights)]
+        rows.append(balances)
+        total = sum(balances)
+        if month < months and (period and month % period == 0 or rebalance == 'threshold' and total > 0 and max(
+                abs(b / total - w) for b, w in zip(balances, weights)) > REBALANCE_THRESHOLD):
+            balances = [total * w for w in weights]
+            rebalanced.append(month)
+    return np.array(rows), rebalanced
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tolerance', type=float, default=1e-9,
+                        help="largest allowed difference from the loop, relative to the portfolio value")
+    parser.add_argument('--json', action='store_true', help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    monthly, annual_increase, initial = SCENARIO
+    blended = weighted_return(RETURN_RATES, ALLOCATIONS)
+    rows = []
+    for years in HORIZONS:
+        blended_seconds = best(lambda: project(monthly, annual_increase, years, initial, blended))
+        for mode in REBALANCE_MODES:
+            run = lambda: project_strategies(monthly, annual_increase, years, initial, RETURN_RATES, ALLOCATIONS, mode)
+            result = run()
+            reference, rebalanced = looped(monthly, annual_increase, years, initial, mode)
+            error = float(np.abs(result.strategy_values - reference).max() / np.abs(reference).sum(axis=1).max())
+            rows.append({'years': years, 'mode': mode, 'rebalances': len(result.rebalance_months),
+                         'vectorized_us': best(run) * 1e6,
+                         'loop_us': best(lambda: looped(monthly, annual_increase, years, initial, mode), 1) * 1e6,
+                         'blended_us': blended_seconds * 1e6, 'final_value': result.final_value,
+                         'max_error': error, 'same_rebalances': result.rebalance_months == rebalanced})
+    failed = [f"{row['mode']}/{row['years']}" for row in rows
+              if row['max_error'] > args.tolerance or not row['same_rebalances']]
+
+    if args.json:
+        print(json.dumps({'allocations': ALLOCATIONS, 'rows': rows, 'tolerance': args.tolerance,
+                          'failed': failed}, indent=2))
+    else:
+        print(f"{'years':>6}  {'mode':<10}{'rebal.':>8}{'vector [us]':>13}{'loop [us]':>12}{'blend [us]':>12}"
+              f"{'final $':>20}{'max error':>11}")
+        for row in rows:
+            print(f"{row['years']:>6}  {row['mode']:<10}{row['rebalances']:>8}{row['vectorized_us']:>13.1f}"
+                  f"{row['loop_us']:>12.1f}{row['blended_us']:>12.1f}{row['final_value']:>20,.2f}"
+                  f"{row['max_error']:>11.1e}")
+    if failed:
+        print(f"vectorized projection differs from the loop at {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
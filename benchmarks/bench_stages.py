@@ -0,0 +1,217 @@
+"""Per-stage benchmark of a calculation, with baseline regression checks.
+
+Times every stage behind the Calculate button on the Agg backend, so no
+display is needed:
+
+    simulation_loop  the original per-month Python loop, as a reference
+    engine           projection_engine.project
+    milestones       MilestoneIndex over one projection
+    report           building and rendering every report section as text
+    figure           creating the five-panel WealthChart
+    draw             a full canvas draw
+    chart_update     an in-place update that blits
+    batch            project_batch over N scenarios
+    monte_carlo      a Monte Carlo run with N paths
+
+across horizons of 1-100 years, batch sizes and path counts. Each stage
+reports the median of --repeat rounds. Results are written as JSON. With
+--baseline, a stage that is slower than the baseline by more than
+--threshold (--mc-threshold for the Monte Carlo stages, whose run times
+swing more between runs) and by more than --min-delta in absolute terms
+makes the run exit with status 1.
+
+Usage:
+    python benchmarks/bench_stages.py [--quick] [--output results.json]
+                                      [--baseline benchmarks/baseline_stages.json] [--threshold 0.25]
+                                      [--mc-threshold 0.5]
+    python benchmarks/bench_stages.py --save-baseline benchmarks/baseline_stages.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+
+from chart_panel import WealthChart
+from milestones import MilestoneIndex
+from monte_carlo import MonteCarloSimulation
+from projection_engine import allocation_returns, project, project_batch
+from report import join_sections, projection_sections, render_plain
+from strategy_catalog import RETURN_RATES, RISK_LEVELS, VOLATILITIES
+
+HORIZONS = (1, 10, 30, 50, 100)
+BATCH_SIZES = (1000, 10000, 100000)
+MONTE_CARLO_PATHS = (1000, 10000, 100000)
+QUICK = {'horizons': (1, 30, 100), 'batch_sizes': (1000, 10000), 'paths': (1000, 10000)}
+
+COLORS = {'bg_light': '#0f3460', 'bg_medium': '#16213e', 'accent_blue': '#00d4ff',
+          'accent_gold': '#ffd700', 'text_color': '#e4e4e4', 'text_dim': '#a0a0a0'}
+
+# Inputs shared by every single-scenario stage
+MONTHLY, ANNUAL_INCREASE, INITIAL, WITHDRAWAL_RATE = 500, 0.05, 1000, 0.04
+STRATEGIES = ('Roth IRA', 'Index Funds (S&P500)', 'High-Yield Savings')
+ALLOCATIONS = (0.4, 0.4, 0.2)
+WEIGHTED_RETURN = sum(RETURN_RATES[s] * a for s, a in zip(STRATEGIES, ALLOCATIONS))
+
+
+def timed(fn, repeat=5, min_time=0.02):
+    """Median per-call time of ``fn`` over ``repeat`` rounds of at least ``min_time`` seconds"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    return statistics.median(rounds)
+
+
+def simulation_loop(monthly, annual_increase, years, initial, weighted_return):
+    """The per-month loop the GUI used before projection_engine"""
+    monthly_rate = weighted_return / 100 / 12
+    portfolio_values = [initial]
+    contributions_total = [0]
+    monthly_contribution = monthly
+    for month in range(1, years * 12 + 1):
+        if month % 12 == 0:
+            monthly_contribution *= (1 + annual_increase)
+        portfolio_values.append(portfolio_values[-1] * (1 + monthly_rate) + monthly_contribution)
+        contributions_total.append(contributions_total[-1] + monthly_contribution)
+    return portfolio_values, contributions_total
+
+
+def chart_data(result, years, milestones):
+    return {'time_array': np.arange(result.months + 1) / 12, 'portfolio_values': result.portfolio_values,
+            'contributions_total': result.contributions_total, 'years': years,
+            'withdrawal_rate': WITHDRAWAL_RATE, 'milestones': milestones, 'monthly': MONTHLY,
+            'annual_increase': ANNUAL_INCREASE, 'initial': INITIAL}
+
+
+def run_stages(horizons, batch_sizes, paths, repeat):
+    """{stage name: seconds per call}"""
+    results = {}
+    for years in horizons:
+        args = (MONTHLY, ANNUAL_INCREASE, years, INITIAL, WEIGHTED_RETURN)
+        result = project(*args)
+        milestones = MilestoneIndex(result.portfolio_values)
+        results[f'simulation_loop/{years}y'] = timed(lambda: simulation_loop(*args), repeat)
+        results[f'engine/{years}y'] = timed(lambda: project(*args), repeat)
+        results[f'milestones/{years}y'] = timed(lambda: MilestoneIndex(result.portfolio_values), repeat)
+
+        def report():
+            sections = projection_sections(MONTHLY, ANNUAL_INCREASE, years, INITIAL, WITHDRAWAL_RATE,
+                                           list(STRATEGIES), list(ALLOCATIONS), WEIGHTED_RETURN,
+                                           result.portfolio_values, result.contributions_total, milestones,
+                                           RETURN_RATES, RISK_LEVELS)
+            return render_plain(join_sections(sections).segments)
+        results[f'report/{years}y'] = timed(report, repeat)
+
+        chart = WealthChart(COLORS)
+        canvas = chart.attach_headless()
+        data = chart_data(result, years, milestones)
+        chart.update(data, live=True)
+        results[f'draw/{years}y'] = timed(canvas.draw, repeat)
+        nudged = chart_data(project(MONTHLY * 1.01, ANNUAL_INCREASE, years, INITIAL, WEIGHTED_RETURN),
+                            years, milestones)
+        flip = [data, nudged]
+        results[f'chart_update/{years}y'] = timed(lambda: (flip.reverse(), chart.update(flip[0], live=True)),
+                                                  repeat)
+        chart.close()
+
+    def figure():
+        WealthChart(COLORS).close()
+    results['figure'] = timed(figure, repeat)
+
+    rng = np.random.default_rng(7)
+    for count in batch_sizes:
+        sweep = (rng.uniform(10, 1000, count), rng.uniform(0, 0.1, count), rng.integers(1, 41, count),
+                 rng.uniform(0, 10000, count),
+                 allocation_returns(rng.uniform(0, 1, (count, 3)), [RETURN_RATES[s] for s in STRATEGIES]))
+        results[f'batch/{count}'] = timed(lambda: project_batch(*sweep), repeat)
+
+    for count in paths:
+        simulation = MonteCarloSimulation(MONTHLY, ANNUAL_INCREASE, 30, INITIAL,
+                                          [RETURN_RATES[s] for s in STRATEGIES], [VOLATILITIES[s] for s in STRATEGIES],
+                                          ALLOCATIONS, n_paths=count, seed=2024)
+        results[f'monte_carlo/{count}'] = timed(simulation.run, max(3, repeat // 2 * 2 + 1))
+    return results
+
+
+def compare(results, baseline, threshold, min_delta, mc_threshold=None):
+    """Stages slower than the baseline beyond the threshold, as (stage, baseline, current) rows
+
+    ``mc_threshold`` (default ``threshold``) applies to the monte_carlo stages.
+    """
+    regressions = []
+    for stage, seconds in results.items():
+        reference = baseline.get(stage)
+        if reference is None:
+            continue
+        allowed = mc_threshold if stage.startswith('monte_carlo/') and mc_threshold is not None else threshold
+        if seconds > reference * (1 + allowed) and seconds - reference > min_delta:
+            regressions.append((stage, reference, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="fewer horizons, batch sizes and path counts")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', metavar='PATH', help="write the results as a new baseline")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown versus the baseline (0.25 = 25%%)")
+    parser.add_argument('--mc-threshold', type=float, default=0.5,
+                        help="allowed slowdown of the Monte Carlo stages (default 0.5 = 50%%)")
+    parser.add_argument('--min-delta', type=float, default=0.0005,
+                        help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK if args.quick else {'horizons': HORIZONS, 'batch_sizes': BATCH_SIZES, 'paths': MONTE_CARLO_PATHS}
+    results = run_stages(sizes['horizons'], sizes['batch_sizes'], sizes['paths'], args.repeat)
+    report = {'python': platform.python_version(), 'numpy': np.__version__,
+              'matplotlib': matplotlib.__version__, 'machine': platform.machine(),
+              'cpus': os.cpu_count(), 'seconds': results}
+
+    for stage, seconds in results.items():
+        print(f"{stage:<28} {seconds * 1000:>12.3f} ms")
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as target:
+                json.dump(report, target, indent=2, sort_keys=True)
+                target.write('\n')
+
+    if args.baseline:
+        with open(args.baseline) as source:
+            baseline = json.load(source)['seconds']
+        regressions = compare(results, baseline, args.threshold, args.min_delta, args.mc_threshold)
+        for stage, reference, seconds in regressions:
+            print(f"REGRESSION {stage}: {reference * 1000:.3f} ms -> {seconds * 1000:.3f} ms "
+                  f"({seconds / reference - 1:+.0%})", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no stage regressed by more than {args.threshold:.0%} ({args.mc_threshold:.0%} for Monte Carlo) "
+              f"against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
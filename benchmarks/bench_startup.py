@@ -0,0 +1,104 @@
+"""Startup cost of investment_calc: import time per module and time to first window.
+
+Runs ``python -X importtime -c "import investment_calc"`` in fresh
+interpreters and reports the slowest imports, like the importtime output
+but aggregated over several runs. Fails (exit 1) if any module listed under
+--forbid is imported at startup; by default NumPy and Matplotlib, which the
+GUI loads lazily. With --gui, also measures the time until the Tk window is
+idle, which needs a display.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--top 15] [--gui] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUI_SNIPPET = """
+import time
+start = time.perf_counter()
+import investment_calc
+root = investment_calc.tk.Tk()
+app = investment_calc.InvestmentCalculator(root)
+root.after_idle(lambda: (print(time.perf_counter() - start), root.destroy()))
+root.mainloop()
+"""
+
+
+def import_profile():
+    """One cold import: ({module: (self_us, cumulative_us)}, wall seconds)"""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import investment_calc'],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules, wall
+
+
+def gui_startup():
+    """Seconds from interpreter start of the script to the first idle Tk loop, or None"""
+    completed = subprocess.run([sys.executable, '-c', GUI_SNIPPET], cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return None
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help="number of slowest imports to list")
+    parser.add_argument('--forbid', nargs='*', default=['numpy', 'matplotlib'],
+                        help="top-level packages that must not be imported at startup")
+    parser.add_argument('--gui', action='store_true', help="also time the window startup (needs a display)")
+    parser.add_argument('--json', action='store_true', help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    runs = [import_profile() for _ in range(args.runs)]
+    names = set.intersection(*(set(modules) for modules, _ in runs))
+    cumulative = {name: statistics.median(modules[name][1] for modules, _ in runs) for name in names}
+    own = {name: statistics.median(modules[name][0] for modules, _ in runs) for name in names}
+    slowest = sorted(names, key=cumulative.get, reverse=True)[:args.top]
+    forbidden = sorted({name.split('.')[0] for name in names} & set(args.forbid))
+    results = {
+        'import_ms': cumulative.get('investment_calc', 0) / 1000,
+        'interpreter_wall_ms': statistics.median(wall for _, wall in runs) * 1000,
+        'modules': len(names),
+        'slowest': [{'module': name, 'self_ms': own[name] / 1000, 'cumulative_ms': cumulative[name] / 1000}
+                    for name in slowest],
+        'forbidden_imports': forbidden,
+    }
+    if args.gui:
+        seconds = gui_startup()
+        results['window_ms'] = None if seconds is None else seconds * 1000
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"import investment_calc: {results['import_ms']:.1f} ms "
+              f"({results['modules']} modules, interpreter total {results['interpreter_wall_ms']:.0f} ms, "
+              f"median of {args.runs})")
+        if args.gui:
+            window = results['window_ms']
+            print("window idle: " + ("unavailable (no display?)" if window is None else f"{window:.0f} ms"))
+        print(f"\n{'self [ms]':>10} | {'cumulative':>10} | imported package")
+        for row in results['slowest']:
+            print(f"{row['self_ms']:>10.2f} | {row['cumulative_ms']:>10.2f} | {row['module']}")
+    if forbidden:
+        print(f"\nimported at startup but expected to load lazily: {', '.join(forbidden)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
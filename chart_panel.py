@@ -0,0 +1,422 @@
+"""Persistent five-panel wealth chart that is updated in place.
+
+The figure, axes, static decorations and every data artist are created once.
+Later updates only push new data into the existing artists. The figure is a
+bare ``matplotlib.figure.Figure`` that is not registered with pyplot, so
+nothing keeps old figures alive between updates.
+
+Data artists are animated: a full draw renders only the static background
+(axes, grids, ticks, threshold lines, legends), which is cached per panel on
+every ``draw_event``. An update that leaves a panel's view limits alone
+restores that background, draws the panel's dynamic artists on top and
+blits the panel; anything else falls back to ``draw_idle``.
+"""
+import time
+
+import matplotlib.style
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.transforms import Bbox
+from matplotlib.ticker import FuncFormatter
+
+from incremental import CHART_STAGES
+from instrumentation import Instrumentation
+from milestones import CHART_MILESTONE_TARGETS
+
+PANELS = CHART_STAGES
+
+# In live mode a panel keeps its y-range while the data fills at least this
+# much of it, so slider drags can blit instead of redrawing the figure
+STICKY_FILL = 0.5
+# Room added above the data when a live update does have to rescale
+LIVE_HEADROOM = 0.15
+# Range and median bands on the portfolio panel: (range label, median label,
+# color or theme color name)
+BAND_STYLES = {
+    'monte_carlo': ('Monte Carlo P5-P95', 'Monte Carlo P50', 'accent_gold'),
+    'history': ('Backtest worst-best', 'Backtest median', '#b388ff'),
+}
+# Stacked per-strategy areas on the portfolio panel, cycled in allocation order
+STACK_COLORS = ('#00ff88', '#00d4ff', '#ffd700', '#ff6b6b', '#b388ff', '#ff9f43', '#4dd0e1', '#f06292',
+                '#c5e1a5')
+
+
+def _thousands(x, p):
+    return f'${x/1000:.0f}K' if x >= 1000 else f'${x:.0f}'
+
+
+class WealthChart:
+    """Five-panel wealth figure built once and updated in place
+
+    ``colors`` supplies the GUI theme (bg_light, bg_medium, accent_blue,
+    accent_gold, text_color, text_dim). Call ``attach`` to embed the figure
+    in Tk, or ``attach_headless`` to render with Agg; then ``update`` with
+    the same data dict the GUI builds. Blits and full redraws are reported
+    to ``metrics`` (an ``Instrumentation``) as the chart_blit and
+    chart_redraw stages.
+    """
+
+    def __init__(self, colors, metrics=None):
+        self.colors = colors
+        self.metrics = metrics if metrics is not None else Instrumentation()
+        self._redraw_requested = None
+        self.canvas = None
+        self.backgrounds = None
+        self.limits = {}
+        self.band_artists = {}
+        self.band_limits = {}
+        self.strategy_fills = []
+        self.stack_strategies = ()
+        self._legend_changed = False
+
+        # Set dark theme for matplotlib
+        matplotlib.style.use('dark_background')
+
+        self.figure = Figure(figsize=(10, 9))
+        gs = self.figure.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
+        self.figure.patch.set_facecolor(colors['bg_light'])
+
+        self.axes = {
+            'chart_portfolio': self.figure.add_subplot(gs[0, :]),      # Main portfolio growth (larger, top)
+            'chart_income': self.figure.add_subplot(gs[1, 0]),         # Passive income growth (middle left)
+            'chart_gains': self.figure.add_subplot(gs[1, 1]),          # Gains vs Contributions breakdown (middle right)
+            'chart_contributions': self.figure.add_subplot(gs[2, 0]),  # Annual contribution growth (bottom left)
+            'chart_roi': self.figure.add_subplot(gs[2, 1])             # ROI over time (bottom right)
+        }
+        for ax in self.axes.values():
+            ax.set_facecolor(colors['bg_light'])
+            ax.grid(True, alpha=0.2, color=colors['text_dim'])
+            ax.tick_params(colors=colors['text_dim'], labelsize=8)
+            for spine in ax.spines.values():
+                spine.set_color(colors['accent_blue'])
+
+        self._build_portfolio(self.axes['chart_portfolio'])
+        self._build_income(self.axes['chart_income'])
+        self._build_gains(self.axes['chart_gains'])
+        self._build_contributions(self.axes['chart_contributions'])
+        self._build_roi(self.axes['chart_roi'])
+
+    # --- construction -----------------------------------------------------
+
+    def _labels(self, ax, xlabel, ylabel, title, size=10, title_size=11, pad=10):
+        ax.set_xlabel(xlabel, fontsize=size, color=self.colors['text_color'], fontweight='bold')
+        ax.set_ylabel(ylabel, fontsize=size, color=self.colors['text_color'], fontweight='bold')
+        ax.set_title(title, fontsize=title_size, fontweight='bold', color=self.colors['accent_gold'], pad=pad)
+
+    def _legend(self, ax, fontsize=7):
+        ax.legend(loc='upper left', fontsize=fontsize, framealpha=0.9,
+                  facecolor=self.colors['bg_medium'], edgecolor=self.colors['accent_blue'])
+
+    def _portfolio_legend(self):
+        self._legend(self.axes['chart_portfolio'], fontsize=9 if len(self.stack_strategies) < 4 else 7)
+
+    def _build_portfolio(self, ax):
+        self.value_line, = ax.plot([], [], label='Portfolio Value', color='#00ff88', linewidth=2.5, zorder=3)
+        self.contributed_line, = ax.plot([], [], label='Total Contributed', color='#00d4ff', linewidth=2, linestyle='--', zorder=2)
+        self.gains_fill = ax.fill_between([0, 0], 0, 0, alpha=0.3, color='#00ff88', label='Investment Gains', zorder=1)
+
+        # One marker line and label per possible milestone, hidden until reached
+        self.milestone_lines = []
+        self.milestone_labels = []
+        for target in CHART_MILESTONE_TARGETS:
+            line = ax.axvline(x=0, color='#ffd700', linestyle=':', alpha=0.3, linewidth=1, visible=False)
+            label = ax.text(0, 0, f'${target/1000:.0f}K',
+                            fontsize=7, color='#ffd700', rotation=90, clip_on=True,
+                            verticalalignment='bottom', horizontalalignment='right', visible=False)
+            self.milestone_lines.append(line)
+            self.milestone_labels.append(label)
+
+        self._labels(ax, 'Years', 'Portfolio Value ($)', 'Portfolio Growth Over Time (with Milestones)',
+                     size=11, title_size=13, pad=15)
+        self._legend(ax, fontsize=9)
+        ax.yaxis.set_major_formatter(FuncFormatter(_thousands))
+        ax.tick_params(labelsize=10)
+
+    def _build_income(self, ax):
+        self.income_line, = ax.plot([], [], label='Monthly Passive Income', color='#ffd700', linewidth=2.5, zorder=3)
+        ax.axhline(y=1000, color='#ff6b6b', linestyle='--', linewidth=1.5, label='$1K/month', zorder=2, alpha=0.7)
+        ax.axhline(y=2000, color='#ff6b6b', linestyle='--', linewidth=2, label='$2K/month', zorder=2)
+        ax.axhline(y=3000, color='#ff6b6b', linestyle='--', linewidth=1.5, label='$3K/month', zorder=2, alpha=0.7)
+        self._labels(ax, 'Years', 'Monthly Income ($)', 'Passive Income Growth')
+        self._legend(ax)
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
+
+    def _build_gains(self, ax):
+        self.money_line, = ax.plot([], [], label='Your Money', color='#00d4ff', linewidth=2, zorder=2)
+        self.gains_line, = ax.plot([], [], label='Investment Gains', color='#00ff88', linewidth=2.5, zorder=3)
+        self._labels(ax, 'Years', 'Value ($)', 'Your Money vs. Compound Gains')
+        self._legend(ax)
+        ax.yaxis.set_major_formatter(FuncFormatter(_thousands))
+
+    def _build_contributions(self, ax):
+        self.contribution_bars = None
+        ax.grid(False, axis='x')
+        self._labels(ax, 'Year', 'Annual Contribution ($)', 'How Your Contributions Grow')
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
+
+    def _build_roi(self, ax):
+        self.roi_line, = ax.plot([], [], color='#ffd700', linewidth=2.5)
+        ax.axhline(y=0, color='#ff6b6b', linestyle='-', linewidth=1, alpha=0.5)
+        self.roi_fill = ax.fill_between([0, 0], 0, 0, alpha=0.3, color='#00ff88', interpolate=True)
+        self._labels(ax, 'Years', 'ROI (%)', 'Return on Investment Over Time')
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'{x:.0f}%'))
+
+    # --- canvas -----------------------------------------------------------
+
+    def attach(self, master):
+        """Embed the figure in a Tk container; returns the canvas widget to pack"""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        self.canvas = FigureCanvasTkAgg(self.figure, master)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        return self.canvas.get_tk_widget()
+
+    def attach_headless(self):
+        """Render with the Agg canvas (no display needed)"""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        return self.canvas
+
+    def close(self):
+        """Release the figure and its canvas widget"""
+        if self.canvas is not None and hasattr(self.canvas, 'get_tk_widget'):
+            self.canvas.get_tk_widget().destroy()
+        self.figure.clear()
+        self.canvas = None
+        self.backgrounds = None
+        self.limits = {}
+        self.band_artists = {}
+        self.band_limits = {}
+        self.strategy_fills = []
+        self.stack_strategies = ()
+
+    # --- blitting ---------------------------------------------------------
+
+    def _dynamic_artists(self, panel):
+        """Artists redrawn on every update of a panel, in drawing order"""
+        if panel == 'chart_portfolio':
+            artists = [self.value_line, self.contributed_line, self.gains_fill, *self.strategy_fills,
+                       *self.milestone_lines, *self.milestone_labels, *self.band_artists.values()]
+        elif panel == 'chart_income':
+            artists = [self.income_line]
+        elif panel == 'chart_gains':
+            artists = [self.money_line, self.gains_line]
+        elif panel == 'chart_contributions':
+            artists = list(self.contribution_bars) if self.contribution_bars is not None else []
+        else:
+            artists = [self.roi_fill, self.roi_line]
+        artists.sort(key=lambda artist: artist.get_zorder())
+        return artists
+
+    def _on_draw(self, event):
+        """After a full draw: cache the static backgrounds, then paint the data on top"""
+        self.backgrounds = {panel: self.canvas.copy_from_bbox(ax.bbox) for panel, ax in self.axes.items()}
+        for panel in PANELS:
+            for artist in self._dynamic_artists(panel):
+                artist.draw(event.renderer)
+        if self._redraw_requested is not None:
+            # Includes the wait for Tk to run the idle draw, as the user sees it
+            self.metrics.record('chart_redraw', time.perf_counter() - self._redraw_requested)
+            self._redraw_requested = None
+
+    def _render(self, panels, rescaled):
+        """Blit the given panels, or redraw everything if a cached background is stale"""
+        for panel in PANELS:
+            for artist in self._dynamic_artists(panel):
+                artist.set_animated(True)
+        if self.canvas is None:
+            return
+        if rescaled or self.backgrounds is None or not self.canvas.supports_blit:
+            # The draw_event handler re-caches the backgrounds
+            self.backgrounds = None
+            if self.metrics.enabled and self._redraw_requested is None:
+                self._redraw_requested = time.perf_counter()
+            self.metrics.count('chart_redraws')
+            self.canvas.draw_idle()
+            return
+        with self.metrics.timer('chart_blit'):
+            renderer = self.canvas.get_renderer()
+            for panel in panels:
+                self.canvas.restore_region(self.backgrounds[panel])
+                for artist in self._dynamic_artists(panel):
+                    artist.draw(renderer)
+                self.canvas.blit(self.axes[panel].bbox)
+        self.metrics.count('chart_blits')
+
+    # --- updates ----------------------------------------------------------
+
+    def update(self, data, panels=PANELS, live=False):
+        """Push new projection data into the given panels and redraw them
+
+        ``data`` holds time_array, portfolio_values, contributions_total,
+        years, withdrawal_rate, milestones, monthly, annual_increase and
+        initial. Optional ``strategies`` and ``strategy_values`` (months + 1,
+        strategies) from a per-strategy projection are stacked on the
+        portfolio panel. With ``live`` set, y-ranges are sticky so that small
+        changes are blitted rather than triggering a full redraw.
+        """
+        rescaled = False
+        for panel in panels:
+            self.limits[panel] = getattr(self, '_update_' + panel[len('chart_'):])(self.axes[panel], data)
+            rescaled |= self._rescale(self.axes[panel], panel, live)
+        # A new legend is part of the cached background
+        rescaled |= self._legend_changed
+        self._legend_changed = False
+        self._render(panels, rescaled)
+
+    def _rescale(self, ax, panel, live=False):
+        """Autoscale a panel to its data; True if the view limits changed"""
+        before = ax.viewLim.get_points().copy()
+        # The update methods report their data extents, which is much cheaper
+        # than ax.relim() walking every bar patch and text
+        ax.dataLim.set_points(Bbox.null().get_points())
+        ax.ignore_existing_data_limits = True
+        ax.update_datalim(self.limits.get(panel, []))
+        if panel == 'chart_portfolio':
+            for limits in self.band_limits.values():
+                ax.update_datalim(limits)
+        low, high = ax.dataLim.intervaly
+        bottom, top = ax.get_ylim()
+        sticky = live and bottom <= low and high <= top and high - low >= STICKY_FILL * (top - bottom)
+        ax.autoscale_view(scaley=not sticky)
+        if live and not sticky:
+            bottom, top = ax.get_ylim()
+            ax.set_ylim(bottom, top + LIVE_HEADROOM * (top - bottom), auto=None)
+        return not np.array_equal(ax.viewLim.get_points(), before)
+
+    @staticmethod
+    def _set_fill(ax, fill, x, y1, y2, where=None, interpolate=False):
+        """Move a fill_between collection to new data, recreating it on old Matplotlib"""
+        if hasattr(fill, 'set_data'):
+            # interpolate is fixed when the collection is created
+            fill.set_data(x, y1, y2, where=where)
+            return fill
+        style = dict(alpha=fill.get_alpha(), color=fill.get_facecolor()[0], zorder=fill.get_zorder(),
+                     label=fill.get_label(), visible=fill.get_visible())
+        fill.remove()
+        return ax.fill_between(x, y1, y2, where=where, interpolate=interpolate, **style)
+
+    def _update_portfolio(self, ax, data):
+        time_array = data['time_array']
+        portfolio_values = data['portfolio_values']
+        contributions_total = data['contributions_total']
+        self.value_line.set_data(time_array, portfolio_values)
+        self.contributed_line.set_data(time_array, contributions_total)
+        self.gains_fill = self._set_fill(ax, self.gains_fill, time_array, contributions_total, portfolio_values)
+        strategy_values = data.get('strategy_values')
+        self._update_stack(ax, time_array, data.get('strategies', ()) if strategy_values is not None else (),
+                           strategy_values)
+
+        reached = dict(data['milestones'].reached(CHART_MILESTONE_TARGETS))
+        for target, line, label in zip(CHART_MILESTONE_TARGETS, self.milestone_lines, self.milestone_labels):
+            month = reached.get(target)
+            line.set_visible(month is not None)
+            label.set_visible(month is not None)
+            if month is not None:
+                line.set_xdata([month / 12, month / 12])
+                label.set_position((month / 12, portfolio_values[month]))
+        return [(time_array[0], min(contributions_total.min(), portfolio_values.min())),
+                (time_array[-1], max(contributions_total.max(), portfolio_values.max()))]
+
+    def _update_stack(self, ax, time_array, strategies, strategy_values):
+        """Stack one area per strategy under the portfolio line; the gains area makes way for it"""
+        strategies = tuple(strategies)
+        if strategies != self.stack_strategies:
+            for fill in self.strategy_fills:
+                fill.remove()
+            self.strategy_fills = [ax.fill_between([0, 0], 0, 0, alpha=0.35, color=STACK_COLORS[i % len(STACK_COLORS)],
+                                                   label=strategy, zorder=0.5)
+                                   for i, strategy in enumerate(strategies)]
+            self.stack_strategies = strategies
+            self.gains_fill.set_visible(not strategies)
+            self.gains_fill.set_label('_Investment Gains' if strategies else 'Investment Gains')
+            self._portfolio_legend()
+            self._legend_changed = True
+        if not strategies:
+            return
+        tops = np.cumsum(strategy_values, axis=1)
+        bottom = 0
+        for i, fill in enumerate(self.strategy_fills):
+            self.strategy_fills[i] = self._set_fill(ax, fill, time_array, bottom, tops[:, i])
+            bottom = tops[:, i]
+
+    def _update_income(self, ax, data):
+        income = data['portfolio_values'] * data['withdrawal_rate'] / 12
+        self.income_line.set_data(data['time_array'], income)
+        # The $1K-$3K threshold lines always stay in view
+        return [(data['time_array'][0], min(income.min(), 1000)), (data['time_array'][-1], max(income.max(), 3000))]
+
+    def _update_gains(self, ax, data):
+        contributions_total = data['contributions_total']
+        self.money_line.set_data(data['time_array'], contributions_total)
+        gains = data['portfolio_values'] - contributions_total
+        self.gains_line.set_data(data['time_array'], gains)
+        return [(data['time_array'][0], min(contributions_total.min(), gains.min())),
+                (data['time_array'][-1], max(contributions_total.max(), gains.max()))]
+
+    def _update_contributions(self, ax, data):
+        years = data['years']
+        yearly_contributions = data['monthly'] * 12 * (1 + data['annual_increase']) ** np.arange(years + 1)
+        limits = [(-0.4, 0), (years + 0.4, yearly_contributions.max())]
+        bars = self.contribution_bars
+        if bars is not None and len(bars) == years + 1:
+            for bar, height in zip(bars, yearly_contributions):
+                bar.set_height(height)
+            return limits
+        if bars is not None:
+            bars.remove()
+        self.contribution_bars = ax.bar(np.arange(years + 1), yearly_contributions, color='#00d4ff', alpha=0.7,
+                                        edgecolor=self.colors['accent_blue'], linewidth=1.5)
+        return limits
+
+    def _update_roi(self, ax, data):
+        contributed = data['contributions_total'] + data['initial']
+        roi_values = np.divide((data['portfolio_values'] - contributed) * 100, contributed,
+                               out=np.zeros(len(contributed)), where=contributed > 0)
+        self.roi_line.set_data(data['time_array'], roi_values)
+        self.roi_fill = self._set_fill(ax, self.roi_fill, data['time_array'], 0, roi_values,
+                                       where=roi_values >= 0, interpolate=True)
+        return [(data['time_array'][0], min(roi_values.min(), 0)), (data['time_array'][-1], max(roi_values.max(), 0))]
+
+    # --- bands -------------------------------------------------------------
+
+    def set_bands(self, low, median, high, live=False, kind='monte_carlo'):
+        """Show a low-high range and a median line on the portfolio panel
+
+        ``kind`` picks the style from BAND_STYLES: Monte Carlo P5-P95 / P50
+        bands, or the worst/median/best of a historical backtest. Each kind
+        is kept and cleared separately.
+        """
+        ax = self.axes['chart_portfolio']
+        time_array = np.arange(len(median)) / 12
+        fill_label, median_label, color = BAND_STYLES[kind]
+        color = self.colors.get(color, color)
+        if (kind, 'fill') not in self.band_artists:
+            self.band_artists[kind, 'fill'] = ax.fill_between(time_array, low, high, color=color, alpha=0.15,
+                                                              label=fill_label, zorder=0)
+            self.band_artists[kind, 'median'], = ax.plot(time_array, median, color=color, linewidth=1.5,
+                                                         linestyle='-.', label=median_label, zorder=2)
+            self._portfolio_legend()
+            # The legend is part of the cached background
+            rescaled = True
+        else:
+            self.band_artists[kind, 'fill'] = self._set_fill(ax, self.band_artists[kind, 'fill'], time_array,
+                                                             low, high)
+            self.band_artists[kind, 'median'].set_data(time_array, median)
+            rescaled = False
+        self.band_limits[kind] = [(time_array[0], low.min()), (time_array[-1], high.max())]
+        rescaled |= self._rescale(ax, 'chart_portfolio', live)
+        self._render(['chart_portfolio'], rescaled)
+
+    def clear_bands(self, kind='monte_carlo'):
+        """Remove one kind of band from the portfolio panel"""
+        artists = [key for key in self.band_artists if key[0] == kind]
+        if not artists:
+            return
+        for key in artists:
+            self.band_artists.pop(key).remove()
+        self.band_limits.pop(kind, None)
+        ax = self.axes['chart_portfolio']
+        self._portfolio_legend()
+        self._rescale(ax, 'chart_portfolio')
+        self._render(['chart_portfolio'], True)
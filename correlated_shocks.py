@@ -0,0 +1,148 @@
+"""Correlated monthly return shocks for a subset of the strategy catalog.
+
+Monte Carlo draws independent standard normals ``z`` and correlates them as
+``z @ L.T``, where ``L`` is the Cholesky factor of the correlation matrix of
+the selected strategies. Factorizing is the only non-trivial step, so
+``CholeskyCache`` keeps one factor per (strategy subset, matrix version):
+re-running a simulation or moving an allocation slider reuses it, and only
+editing the matrix (which bumps the version) or picking different
+strategies factorizes again.
+
+``CorrelatedShocks`` streams correlated draws for any number of
+path-months in fixed-size chunks, one ``standard_normal`` and one matmul
+per chunk, written into reused buffers. Chunks are seeded like Monte Carlo
+blocks, so the stream depends only on the seed and the chunk size.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from monte_carlo import BLOCK_BYTES
+from strategy_catalog import CORRELATIONS, correlation
+
+# Smallest eigenvalue kept when an edited matrix is not positive definite
+EIGEN_FLOOR = 1e-8
+
+
+def correlation_matrix(strategies, correlations=CORRELATIONS):
+    """(S, S) matrix for ``strategies`` from a {(a, b): rho} mapping"""
+    return np.array([[correlation(a, b, correlations) for b in strategies] for a in strategies], dtype=float)
+
+
+def cholesky_factor(matrix):
+    """Lower-triangular ``L`` with ``L @ L.T == matrix``
+
+    The matrix must be symmetric with a unit diagonal and entries in
+    [-1, 1]. One that is not positive definite (easy to produce by editing
+    pairs one at a time) is replaced by the nearest one with eigenvalues of
+    at least ``EIGEN_FLOOR``, rescaled back to a unit diagonal.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError("correlation matrix must be square")
+    if not np.allclose(matrix, matrix.T) or not np.allclose(np.diag(matrix), 1):
+        raise ValueError("correlation matrix must be symmetric with ones on the diagonal")
+    if np.abs(matrix).max(initial=0) > 1:
+        raise ValueError("correlations must lie between -1 and 1")
+    try:
+        return np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+        repaired = (eigenvectors * np.maximum(eigenvalues, EIGEN_FLOOR)) @ eigenvectors.T
+        scale = 1 / np.sqrt(np.diag(repaired))
+        return np.linalg.cholesky(repaired * scale[:, None] * scale)
+
+
+class CholeskyCache:
+    """Bounded LRU of Cholesky factors keyed on (strategy subset, matrix version)
+
+    The subset is order-sensitive because the factor's rows follow the
+    order the strategies are passed in. Factors are read-only because they
+    are shared between the Tk thread and the worker.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.factorizations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def factor(self, strategies, correlations=CORRELATIONS, version=0):
+        """Cached Cholesky factor of the correlation matrix of ``strategies``"""
+        key = (tuple(strategies), version)
+        with self._lock:
+            factor = self._entries.get(key)
+            if factor is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return factor
+        factor = cholesky_factor(correlation_matrix(key[0], correlations))
+        factor.setflags(write=False)
+        with self._lock:
+            self.factorizations += 1
+            self._entries[key] = factor
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return factor
+
+    def invalidate(self, version=None):
+        """Drop every factor, or only those built from one matrix version"""
+        with self._lock:
+            if version is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[1] == version]:
+                del self._entries[key]
+
+    def stats(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'factorizations': self.factorizations}
+
+
+class CorrelatedShocks:
+    """Stream of correlated standard normal draws, one row per path-month
+
+    ``factor`` is a Cholesky factor (see ``CholeskyCache``). Each row of a
+    chunk has covariance ``factor @ factor.T``; scale column ``s`` by a
+    strategy's monthly volatility to get its return shock.
+    """
+
+    def __init__(self, factor, seed=None, chunk_bytes=BLOCK_BYTES):
+        self.factor = np.asarray(factor, dtype=float)
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.chunk_rows = max(1, chunk_bytes // (16 * len(self.factor)))
+
+    def chunk(self, index, rows, out=None, scratch=None):
+        """Correlated draws of shape (rows, strategies) for one seeded chunk"""
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(index,)))
+        shape = (rows, len(self.factor))
+        independent = rng.standard_normal(shape, out=scratch[:rows] if scratch is not None else None)
+        if out is None:
+            out = np.empty(shape)
+        return np.matmul(independent, self.factor.T, out=out[:rows])
+
+    def chunks(self, path_months):
+        """Yield (path_months, strategies) draws as consecutive chunks
+
+        The yielded arrays are reused buffers, overwritten by the next chunk;
+        copy anything that must outlive the iteration.
+        """
+        path_months = int(path_months)
+        size = min(self.chunk_rows, path_months)
+        out = np.empty((size, len(self.factor)))
+        scratch = np.empty_like(out)
+        for index, start in enumerate(range(0, path_months, self.chunk_rows)):
+            yield self.chunk(index, min(self.chunk_rows, path_months - start), out, scratch)
+
+    def draw(self, path_months):
+        """Every draw as one (path_months, strategies) array"""
+        out = np.empty((int(path_months), len(self.factor)))
+        start = 0
+        for chunk in self.chunks(path_months):
+            out[start:start + len(chunk)] = chunk
+            start += len(chunk)
+        return out
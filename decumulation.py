@@ -0,0 +1,187 @@
+"""Retirement (decumulation) phase: does a withdrawal rate last?
+
+Retirement starts from the balance at the end of the projection. Each
+month the balance grows by that month's return, then the withdrawal is
+taken. The first year withdraws ``rate`` of the starting balance, and the
+withdrawal rises with inflation once a year, like the contribution schedule.
+A path is depleted in the first month its balance reaches zero; the rate
+succeeds on a path that lasts every month of the retirement.
+
+With ``G[m]`` the path's growth up to month ``m`` and ``w[m]`` the
+withdrawal schedule per dollar withdrawn in year one, the balance is
+
+    B[m] = G[m] * B0 * (1 - rate * D[m]),   D[m] = sum(w[i] / G[i] for i <= m)
+
+so a path is depleted once ``D[m] >= 1 / rate``. ``D`` does not depend on
+the rate or on ``B0``. One cumulative sum per path therefore answers every
+rate of a sweep (2-8% by default), and the success rate does not depend on
+the starting balance. Months are processed in chunks of ``CHUNK_MONTHS``,
+and paths depleted at every swept rate are dropped at each chunk boundary,
+so later months only compound the survivors.
+
+Paths are either stochastic (normal monthly returns of the blended mix,
+from the Monte Carlo parameters) or historical (the months that follow each
+backtest window in a return history).
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Withdrawal rates swept by default: 2% to 8% in quarter-point steps
+SWEEP_RATES = np.round(np.arange(0.02, 0.08 + 1e-9, 0.0025), 4)
+RETIREMENT_YEARS = 30
+INFLATION = 0.025
+# A rate is "safe" if at least this fraction of paths last the whole retirement
+SUCCESS_TARGET = 0.95
+CHUNK_MONTHS = 60
+NOT_DEPLETED = -1
+
+# A month cannot lose more than this fraction of the portfolio (as in monte_carlo)
+WORST_MONTH = -0.99
+
+
+class DecumulationResult:
+    """Depletion month of every path at every swept rate
+
+    ``depletion`` is ``(paths, rates)``: the month (1-based) a path ran out
+    at that rate, or NOT_DEPLETED. ``spent`` is each path's final ``D``
+    (where it stopped, for paths dropped early), which settles success at
+    any rate from the lowest swept one up.
+    """
+
+    def __init__(self, rates, depletion, spent, months, inflation, source, months_computed):
+        self.rates = rates
+        self.depletion = depletion
+        self.spent = spent
+        self.months = months
+        self.inflation = inflation
+        self.source = source
+        self.months_computed = months_computed
+
+    def __len__(self):
+        return len(self.depletion)
+
+    @property
+    def success_rates(self):
+        """Fraction of paths that last the whole retirement, per swept rate"""
+        return (self.depletion == NOT_DEPLETED).mean(axis=0)
+
+    def _column(self, rate):
+        index = int(np.argmin(np.abs(self.rates - rate)))
+        if not np.isclose(self.rates[index], rate):
+            raise ValueError(f"withdrawal rate {rate:.2%} was not part of the sweep")
+        return index
+
+    def success(self, rate):
+        """Fraction of paths that last at ``rate``, swept or not, down to the lowest swept rate"""
+        if rate < self.rates.min() and not np.isclose(rate, self.rates.min()):
+            raise ValueError(f"withdrawal rate {rate:.2%} is below the sweep")
+        return float((self.spent < 1 / rate).mean())
+
+    def median_depletion(self, rate):
+        """Median month of depletion among the paths that run out at ``rate``, or None"""
+        months = self.depletion[:, self._column(rate)]
+        months = months[months != NOT_DEPLETED]
+        return float(np.median(months)) if len(months) else None
+
+    def max_safe_rate(self, target=SUCCESS_TARGET):
+        """Highest swept rate whose success rate is at least ``target``, or None"""
+        safe = self.rates[self.success_rates >= target]
+        return float(safe.max()) if len(safe) else None
+
+
+def withdrawal_schedule(months, inflation=INFLATION):
+    """Withdrawal in months 1..months per dollar of first-year annual withdrawal"""
+    return (1 + inflation) ** (np.arange(months) // 12) / 12
+
+
+def decumulate(growth, n_paths, months, rates=SWEEP_RATES, inflation=INFLATION, source=''):
+    """Depletion months for ``n_paths`` paths at every rate in one batched pass
+
+    ``growth(rows, start, stop)`` returns the monthly growth factors
+    (1 + return) of the given path rows for months ``start..stop - 1``.
+    """
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))
+    if np.any(rates <= 0):
+        raise ValueError("withdrawal rates must be positive")
+    thresholds = 1 / rates
+    schedule = withdrawal_schedule(months, inflation)
+    depletion = np.full((n_paths, len(rates)), NOT_DEPLETED, dtype=np.int64)
+    alive = np.arange(n_paths)
+    carry_growth = np.ones(n_paths)
+    carry_sum = np.zeros(n_paths)
+    spent = np.zeros(n_paths)
+    computed = 0
+    for start in range(0, months, CHUNK_MONTHS):
+        if not len(alive):
+            break
+        stop = min(start + CHUNK_MONTHS, months)
+        path_growth = np.maximum(growth(alive, start, stop), 1 + WORST_MONTH)
+        np.cumprod(path_growth, axis=1, out=path_growth)
+        path_growth *= carry_growth[:, None]
+        withdrawn = schedule[start:stop] / path_growth
+        np.cumsum(withdrawn, axis=1, out=withdrawn)
+        withdrawn += carry_sum[:, None]
+        computed += withdrawn.size
+
+        # D is increasing, so only (path, rate) pairs whose threshold falls
+        # inside this chunk cross here, and the months still below it locate when
+        rows, columns = np.nonzero((carry_sum[:, None] < thresholds) & (withdrawn[:, -1:] >= thresholds))
+        below = (withdrawn[rows] < thresholds[columns, None]).sum(axis=1)
+        depletion[alive[rows], columns] = start + below + 1
+
+        carry_growth = path_growth[:, -1]
+        carry_sum = withdrawn[:, -1]
+        spent[alive] = carry_sum
+        # Out of money at every rate: nothing left to compute for this path
+        keep = carry_sum < thresholds.max()
+        alive, carry_growth, carry_sum = alive[keep], carry_growth[keep], carry_sum[keep]
+    return DecumulationResult(rates, depletion, spent, months, inflation, source, computed)
+
+
+def stochastic(returns, volatilities, allocations, years=RETIREMENT_YEARS, n_paths=10000, seed=None,
+               correlation_factor=None, rates=SWEEP_RATES, inflation=INFLATION):
+    """Decumulation over random monthly returns of the blended mix
+
+    Takes the Monte Carlo parameters (annual % per strategy, weights and an
+    optional Cholesky factor). With monthly rebalancing the blended return
+    is normal with the blended mean and the norm of the Monte Carlo
+    loadings as its deviation, so one draw per path-month is enough. Each
+    chunk of months is seeded on its own and drawn for every path, so a
+    path's returns do not depend on which other paths are still alive.
+    """
+    from monte_carlo import MonteCarloSimulation
+    simulation = MonteCarloSimulation(0, 0, years, 0, returns, volatilities, allocations, n_paths=n_paths,
+                                      seed=seed, correlation_factor=correlation_factor)
+    mean = 1 + simulation.weights @ simulation.monthly_means
+    deviation = float(np.linalg.norm(simulation.loadings))
+
+    def growth(rows, start, stop):
+        rng = np.random.default_rng(np.random.SeedSequence(simulation.seed, spawn_key=(start,)))
+        draws = rng.standard_normal((simulation.n_paths, stop - start))[rows]
+        draws *= deviation
+        draws += mean
+        return draws
+
+    return decumulate(growth, simulation.n_paths, simulation.months, rates, inflation,
+                      f"{simulation.n_paths:,} random paths")
+
+
+def historical(history, allocations, accumulation_years, years=RETIREMENT_YEARS, rates=SWEEP_RATES,
+               inflation=INFLATION):
+    """Decumulation over the months that follow every accumulation window of a ReturnHistory
+
+    Window ``t`` of ``backtest`` accumulates over months ``t`` onwards, so
+    its retirement replays the ``years * 12`` months after that. Raises
+    ValueError if the history is too short for both phases.
+    """
+    accumulation, months = int(accumulation_years) * 12, int(years) * 12
+    if accumulation + months > len(history):
+        raise ValueError(f"{accumulation_years} + {years} years needs {accumulation + months} months of history; "
+                         f"{history.source} has {len(history)}")
+    paths = sliding_window_view(1 + history.portfolio_returns(allocations), months)[accumulation:]
+
+    def growth(rows, start, stop):
+        return paths[rows, start:stop]
+
+    return decumulate(growth, len(paths), months, rates, inflation,
+                      f"{len(paths):,} historical start dates ({history.source})")
@@ -0,0 +1,176 @@
+"""Goal seek: the contribution, yearly increase or horizon that reaches a target.
+
+Everything here works on the closed form of the projection engine, so a
+solve never re-simulates month by month. The final value after ``months``
+months is linear in the monthly contribution:
+
+    V = initial * G**months + monthly * A(annual_increase, months, G)
+
+where ``G = 1 + weighted_return / 1200`` and ``A`` is the value of a unit
+deposit schedule, a sum of geometric series evaluated in O(1). Solving for
+the contribution is then a division. Years and the yearly increase are
+found by bracketing and then bisecting or using regula falsi on that
+closed form, which takes a few dozen O(1) evaluations per solve.
+
+Pure Python (no NumPy), so the GUI can import it at startup. Inputs follow
+projection_engine: ``annual_increase`` is a fraction and ``weighted_return``
+an annual percentage. Unreachable goals return None.
+"""
+import math
+
+SOLVE_FOR = ('monthly', 'annual_increase', 'years')
+
+
+def _geometric(rate, count):
+    """sum((1 + rate) ** i for i in range(count)), stable for small rates"""
+    if count <= 0:
+        return 0.0
+    if rate == 0:
+        return float(count)
+    return math.expm1(count * math.log1p(rate)) / rate
+
+
+def annuity_factor(annual_increase, months, weighted_return):
+    """Value after ``months`` of depositing $1/month, raised by ``annual_increase`` yearly
+
+    Matches projection_engine: the deposit is bumped on every 12th month
+    before that month's deposit, so month m pays
+    ``(1 + annual_increase) ** (m // 12)``.
+    """
+    if months <= 0:
+        return 0.0
+    rate = weighted_return / 1200
+    growth = 1 + rate
+    last_year = months // 12
+
+    # Year 0 pays months 1..11; years 1..last_year-1 pay 12 months each
+    first = min(11, months)
+    total = growth ** (months - first) * _geometric(rate, first)
+    if last_year >= 1:
+        full_years = last_year - 1
+        block = _geometric(rate, 12)
+        ratio = (1 + annual_increase) / growth ** 12
+        # sum over k = 1..full_years of (1 + inc)^k * G^(months - 12k - 11) * block
+        total += block * growth ** (months - 11) * ratio * _geometric(ratio - 1, full_years)
+        # The final year is cut short at ``months``
+        tail = months - 12 * last_year + 1
+        total += (1 + annual_increase) ** last_year * _geometric(rate, tail)
+    return total
+
+
+def final_value(monthly, annual_increase, months, initial, weighted_return):
+    """Portfolio value after ``months`` months, without simulating them"""
+    growth = (1 + weighted_return / 1200) ** months
+    return initial * growth + monthly * annuity_factor(annual_increase, months, weighted_return)
+
+
+def target_value(monthly_income, withdrawal_rate):
+    """Portfolio that pays ``monthly_income`` at a withdrawal rate (fraction)"""
+    if withdrawal_rate <= 0:
+        raise ValueError("withdrawal rate must be positive")
+    return monthly_income * 12 / withdrawal_rate
+
+
+def solve_monthly(target, annual_increase, years, initial, weighted_return):
+    """Monthly contribution that reaches ``target`` in ``years``; 0 if ``initial`` alone does"""
+    months = int(years) * 12
+    shortfall = target - initial * (1 + weighted_return / 1200) ** months
+    if shortfall <= 0:
+        return 0.0
+    factor = annuity_factor(annual_increase, months, weighted_return)
+    return shortfall / factor if factor > 0 else None
+
+
+def solve_months(target, monthly, annual_increase, initial, weighted_return, max_years=100):
+    """First month at or above ``target``, or None if not within ``max_years``
+
+    Without a yearly increase this is a logarithm. Otherwise the month is
+    bracketed by doubling and then bisected. That gives the first crossing
+    as long as the value grows month over month, which is always true for
+    non-negative returns.
+    """
+    if initial >= target:
+        return 0
+    limit = int(max_years) * 12
+    if monthly <= 0 and weighted_return <= 0:
+        return None
+    if annual_increase == 0 and weighted_return > 0 and monthly + initial > 0:
+        # Closed form: G^m = (target + c/r) / (initial + c/r)
+        rate = weighted_return / 1200
+        months = math.log((target + monthly / rate) / (initial + monthly / rate)) / math.log1p(rate)
+        month = max(1, math.ceil(months - 1e-9))
+        # Guard the float log against landing one month early or late
+        while month > 1 and final_value(monthly, 0, month - 1, initial, weighted_return) >= target:
+            month -= 1
+        while month <= limit and final_value(monthly, 0, month, initial, weighted_return) < target:
+            month += 1
+        return month if month <= limit else None
+
+    value = lambda month: final_value(monthly, annual_increase, month, initial, weighted_return)
+    low, high = 0, 12
+    while value(high) < target:
+        if high >= limit:
+            return None
+        low, high = high, min(2 * high, limit)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if value(middle) >= target:
+            high = middle
+        else:
+            low = middle
+    return high
+
+
+def solve_years(target, monthly, annual_increase, initial, weighted_return, max_years=100):
+    """Whole years needed to reach ``target`` (the period the GUI form takes), or None"""
+    months = solve_months(target, monthly, annual_increase, initial, weighted_return, max_years)
+    return None if months is None else -(-months // 12)
+
+
+def solve_increase(target, monthly, years, initial, weighted_return, max_increase=1.0, tolerance=1e-9):
+    """Yearly contribution increase (fraction) that reaches ``target`` in ``years``
+
+    Returns 0 if no increase is needed and None if even ``max_increase``
+    (100% a year by default) falls short. The value is increasing in the
+    increase, so the root is bracketed and refined with the Illinois
+    variant of regula falsi until the value is within ``tolerance`` of the
+    target, relative to the target.
+    """
+    months = int(years) * 12
+    if monthly <= 0 or months == 0:
+        return 0.0 if initial * (1 + weighted_return / 1200) ** months >= target else None
+    excess = lambda increase: final_value(monthly, increase, months, initial, weighted_return) - target
+    low, high = 0.0, max_increase
+    f_low, f_high = excess(low), excess(high)
+    if f_low >= 0:
+        return 0.0
+    if f_high < 0:
+        return None
+    side = 0
+    for _ in range(100):
+        guess = (low * f_high - high * f_low) / (f_high - f_low)
+        f_guess = excess(guess)
+        if abs(f_guess) <= tolerance * target or high - low < tolerance:
+            return guess
+        if f_guess > 0:
+            high, f_high = guess, f_guess
+            if side == 1:
+                f_low /= 2
+            side = 1
+        else:
+            low, f_low = guess, f_guess
+            if side == -1:
+                f_high /= 2
+            side = -1
+    return high
+
+
+def solve(solve_for, target, monthly, annual_increase, years, initial, weighted_return):
+    """Dispatch on ``solve_for`` (one of SOLVE_FOR); returns the solved value or None"""
+    if solve_for == 'monthly':
+        return solve_monthly(target, annual_increase, years, initial, weighted_return)
+    if solve_for == 'annual_increase':
+        return solve_increase(target, monthly, years, initial, weighted_return)
+    if solve_for == 'years':
+        return solve_years(target, monthly, annual_increase, initial, weighted_return)
+    raise ValueError(f"cannot solve for {solve_for!r} (use one of {', '.join(SOLVE_FOR)})")
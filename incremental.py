@@ -0,0 +1,111 @@
+"""Dependency-aware incremental evaluation of the calculate pipeline."""
+from milestones import MILESTONE_TARGETS, MilestoneIndex
+from projection_cache import ProjectionCache
+from projection_engine import extend_projection
+
+# Stage -> the inputs and upstream stages it depends on, in evaluation order.
+# Backtest output is appended to the report and drawn on the portfolio panel,
+# so it has to be redone whenever either of those is redrawn; so is the
+# retirement check, which is appended to the report. The Monte Carlo run only
+# depends on its own inputs: when just the report or chart is redrawn, its
+# finished bands and outlook are shown again from the last run.
+STAGES = {
+    'simulation': ('monthly', 'annual_increase', 'years', 'initial', 'allocations', 'rates_version',
+                   'precision', 'rebalance'),
+    'milestones': ('simulation',),
+    # Backtest and retirement sections are appended, so switching them off (or
+    # changing the correlations the retirement paths use) rewrites the report
+    'report': ('simulation', 'milestones', 'withdrawal_rate', 'history', 'retirement', 'correlations_version'),
+    'chart_portfolio': ('simulation', 'milestones'),
+    'chart_income': ('simulation', 'withdrawal_rate'),
+    'chart_gains': ('simulation',),
+    'chart_contributions': ('monthly', 'annual_increase', 'years'),
+    'chart_roi': ('simulation', 'initial'),
+    'monte_carlo': ('simulation', 'mc_paths', 'correlations_version'),
+    'monte_carlo_view': ('monte_carlo', 'report', 'chart_portfolio'),
+    'backtest': ('report', 'chart_portfolio', 'history'),
+    'decumulation': ('report', 'retirement'),
+}
+
+CHART_STAGES = tuple(stage for stage in STAGES if stage.startswith('chart_'))
+
+
+def stage_inputs(stage):
+    """Names of the inputs ``stage`` depends on, directly or through upstream stages"""
+    names = []
+    for dep in STAGES[stage]:
+        for name in stage_inputs(dep) if dep in STAGES else (dep,):
+            if name not in names:
+                names.append(name)
+    return tuple(names)
+
+
+def dirty_stages(previous, inputs):
+    """Stages invalidated by moving from ``previous`` inputs to ``inputs``
+
+    ``previous`` may be None (nothing computed yet), which dirties every stage.
+    """
+    if previous is None:
+        return set(STAGES)
+    changed = {name for name, value in inputs.items() if previous.get(name) != value}
+    dirty = set()
+    for stage, dependencies in STAGES.items():
+        if any(dep in changed or dep in dirty for dep in dependencies):
+            dirty.add(stage)
+    return dirty
+
+
+class IncrementalProjection:
+    """Keeps the last evaluated inputs and re-runs only invalidated stages
+
+    ``update`` diffs the new inputs against the previous call and returns
+    the set of stages that must be recomputed. Simulation and milestones
+    are evaluated here; the report, chart panels and Monte Carlo run are
+    redrawn by the caller. When only ``years`` changed, the simulation is
+    extended from the cached final month (or sliced) instead of re-run.
+    ``precision`` ('float' or 'cents', see projection_engine) defaults to float.
+    ``rebalance`` defaults to None, one blended balance; any of
+    projection_engine.REBALANCE_MODES tracks each strategy separately.
+    """
+
+    def __init__(self, return_rates, cache=None, milestone_targets=MILESTONE_TARGETS):
+        self.return_rates = return_rates
+        self.cache = cache if cache is not None else ProjectionCache()
+        self.milestone_targets = milestone_targets
+        self.inputs = None
+        self.projection = None
+        self.milestones = None
+
+    def update(self, **inputs):
+        """Evaluate the pipeline for new inputs and return the dirty stage names
+
+        ``allocations`` must be a hashable tuple of (strategy, weight) pairs.
+        """
+        inputs.setdefault('precision', 'float')
+        inputs.setdefault('rebalance', None)
+        dirty = dirty_stages(self.inputs, inputs)
+        if 'simulation' in dirty:
+            self.projection = self._simulate(inputs)
+        if 'milestones' in dirty:
+            self.milestones = MilestoneIndex(self.projection.portfolio_values, self.milestone_targets)
+        self.inputs = dict(inputs)
+        return dirty
+
+    def invalidate(self):
+        """Forget the previous inputs so the next update recomputes everything"""
+        self.inputs = None
+
+    def _simulate(self, inputs):
+        compute = None
+        if self.inputs is not None and self.projection is not None:
+            changed = {name for name in STAGES['simulation'] if self.inputs.get(name) != inputs[name]}
+            # Only blended float runs are extended: cent-exact runs are cheap to
+            # redo, and per-strategy balances do not compound at one rate
+            if changed == {'years'} and inputs['precision'] == 'float' and inputs['rebalance'] is None:
+                previous = self.projection
+                compute = lambda: extend_projection(previous, inputs['monthly'],
+                                                    inputs['annual_increase'], inputs['years'])
+        return self.cache.projection(inputs['monthly'], inputs['annual_increase'], inputs['years'],
+                                     inputs['initial'], dict(inputs['allocations']),
+                                     self.return_rates, inputs['rates_version'], compute=compute,
+                                     precision=inputs['precision'], rebalance=inputs['rebalance'])
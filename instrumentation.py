@@ -0,0 +1,154 @@
+"""Lightweight timers and counters for the stages of a calculation.
+
+    metrics = Instrumentation(enabled=True)
+    with metrics.timer('simulation'):
+        ...
+    metrics.count('requests')
+    print(metrics.to_prometheus())
+
+While disabled, ``timer`` hands back one shared no-op context manager and
+``count`` returns immediately, so instrumented code costs a method call and
+an attribute check. Stages are recorded from both the Tk thread and the
+background worker, hence the lock.
+"""
+import collections
+import contextlib
+import json
+import threading
+import time
+
+# Samples kept per stage for the p95; older samples only count towards the average
+WINDOW = 256
+
+_DISABLED = contextlib.nullcontext()
+
+
+class StageStats:
+    """Running count, total and last duration of one stage, plus a recent window"""
+
+    def __init__(self, window=WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.recent = collections.deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.recent.append(seconds)
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """Nearest-rank percentile (0-100) over the recent window"""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, max(0, -(-len(ordered) * q // 100) - 1))]
+
+    def summary(self):
+        return {'count': self.count, 'total_seconds': self.total, 'last_seconds': self.last,
+                'avg_seconds': self.average, 'p95_seconds': self.percentile(95)}
+
+
+class _Timer:
+    __slots__ = ('_metrics', '_stage', '_start')
+
+    def __init__(self, metrics, stage):
+        self._metrics = metrics
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.record(self._stage, time.perf_counter() - self._start)
+        return False
+
+
+class Instrumentation:
+    """Per-stage timings and named counters, exportable as JSON or Prometheus text"""
+
+    def __init__(self, enabled=False, window=WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}
+        self.counters = collections.Counter()
+        self._lock = threading.Lock()
+
+    def timer(self, stage):
+        """Context manager recording the duration of ``stage``"""
+        if not self.enabled:
+            return _DISABLED
+        return _Timer(self, stage)
+
+    def record(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats(self.window)
+            stats.add(seconds)
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] += amount
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = collections.Counter()
+
+    def snapshot(self):
+        """{'stages': {stage: summary}, 'counters': {name: value}}"""
+        with self._lock:
+            return {'stages': {stage: stats.summary() for stage, stats in self.stages.items()},
+                    'counters': dict(self.counters)}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent, sort_keys=True)
+
+    def to_prometheus(self, prefix='wealth_builder'):
+        """Prometheus text exposition: a summary per stage and a counter per name"""
+        snapshot = self.snapshot()
+        lines = [f'# HELP {prefix}_stage_seconds Duration of each calculation stage',
+                 f'# TYPE {prefix}_stage_seconds summary']
+        stages = sorted(snapshot['stages'].items())
+        for stage, summary in stages:
+            label = f'stage="{stage}"'
+            lines.append(f'{prefix}_stage_seconds{{{label},quantile="0.95"}} {summary["p95_seconds"]!r}')
+            lines.append(f'{prefix}_stage_seconds_sum{{{label}}} {summary["total_seconds"]!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{{label}}} {summary["count"]}')
+        lines.append(f'# HELP {prefix}_stage_last_seconds Duration of the latest run of each stage')
+        lines.append(f'# TYPE {prefix}_stage_last_seconds gauge')
+        for stage, summary in stages:
+            lines.append(f'{prefix}_stage_last_seconds{{stage="{stage}"}} {summary["last_seconds"]!r}')
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f'# TYPE {prefix}_{name}_total counter')
+            lines.append(f'{prefix}_{name}_total {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Save a snapshot; ``.prom``/``.txt`` files get Prometheus text, anything else JSON"""
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json() + '\n'
+        with open(path, 'w') as target:
+            target.write(text)
+
+    def table(self, stages=None):
+        """Fixed-width last/avg/p95 lines (milliseconds) for the overlay"""
+        with self._lock:
+            rows = [(stage, self.stages[stage]) for stage in (stages or self.stages) if stage in self.stages]
+            lines = [f"{'stage':<14}{'last':>9}{'avg':>9}{'p95':>9}  ms"]
+            for stage, stats in rows:
+                lines.append(f"{stage:<14}{stats.last * 1000:>9.1f}{stats.average * 1000:>9.1f}"
+                             f"{stats.percentile(95) * 1000:>9.1f}")
+            if self.counters:
+                lines.append('  '.join(f"{name}={value}" for name, value in sorted(self.counters.items())))
+        return '\n'.join(lines)
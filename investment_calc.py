@@ -1,40 +1,87 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog, simpledialog
+import importlib
+import importlib.util
+import math
 import sys
+import threading
+import time
 
-# Test if imports work
-print("Python version:", sys.version)
-print("Tkinter imported successfully!")
+REQUIRED_PACKAGES = ('matplotlib', 'numpy')
 
-try:
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    print("Matplotlib imported successfully!")
-except ImportError as e:
-    print("ERROR: Matplotlib not found!")
-    print("Please install it with: pip install matplotlib")
-    input("Press Enter to exit...")
-    sys.exit(1)
 
-try:
-    import numpy as np
-    print("Numpy imported successfully!")
-except ImportError as e:
-    print("ERROR: Numpy not found!")
-    print("Please install it with: pip install numpy")
-    input("Press Enter to exit...")
+def check_dependencies():
+    """Exit with install instructions if a required package is missing"""
+    missing = [name for name in REQUIRED_PACKAGES if importlib.util.find_spec(name) is None]
+    if not missing:
+        return
+    for name in missing:
+        print(f"ERROR: {name.capitalize()} not found!")
+        print(f"Please install it with: pip install {name}")
+    # Keep the console open when launched by double-click, never block scripts
+    if sys.stdin is not None and sys.stdin.isatty():
+        input("Press Enter to exit...")
     sys.exit(1)
 
-print("\nAll imports successful! Starting application...\n")
+
+if __name__ == "__main__":
+    check_dependencies()
+
+# NumPy, Matplotlib and the modules built on them are imported on first use
+# (or by the background warm-up) so that the window appears immediately
+from goal_seek import solve, target_value
+from instrumentation import Instrumentation
+from report import (backtest_section, monte_carlo_section, optimizer_section, projection_sections,
+                    retirement_section)
+from report_view import ReportView
+from strategy_catalog import CORRELATIONS, RETURN_RATES, RISK_LEVELS, VOLATILITIES, correlation
+from worker import BackgroundWorker
+
+# Live mode waits this long after the last edit before recalculating
+LIVE_DEBOUNCE_MS = 150
+# How often finished background work is collected on the Tk thread
+POLL_INTERVAL_MS = 15
+# Seed of the GUI's Monte Carlo runs, so the same inputs always draw the same bands
+MONTE_CARLO_SEED = 0
+# Delay before the heavy imports are warmed up in the background
+WARM_UP_DELAY_MS = 200
+WARM_UP_MODULES = ('numpy', 'incremental', 'monte_carlo', 'correlated_shocks', 'backtest', 'decumulation',
+                   'optimizer', 'chart_panel', 'matplotlib.backends.backend_tkagg')
+
+# Rebalancing menu -> pipeline 'rebalance' input (projection_engine.REBALANCE_MODES);
+# None keeps the single blended balance
+REBALANCE_CHOICES = {
+    'Blended (one balance)': None,
+    'Never rebalance': 'none',
+    'Rebalance monthly': 'monthly',
+    'Rebalance quarterly': 'quarterly',
+    'Rebalance yearly': 'annual',
+    'Rebalance at 5% drift': 'threshold',
+}
+
+# Optimizer menu -> optimizer objective
+OPTIMIZER_OBJECTIVES = {
+    'Highest median': 'median',
+    'Lowest shortfall vs goal': 'shortfall',
+}
+
+# Rows of the timing overlay; latency runs from the request to the applied result
+OVERLAY_STAGES = ('parse', 'simulation', 'backtest', 'decumulation', 'report', 'chart_create', 'chart_update',
+                  'chart_blit', 'chart_redraw', 'monte_carlo', 'latency')
+
+
+def warm_up():
+    """Import the numeric and plotting stack ahead of the first calculation"""
+    for name in WARM_UP_MODULES:
+        importlib.import_module(name)
+
 
 class InvestmentCalculator:
     def __init__(self, root):
-        print("  -> Setting up window properties...")
         self.root = root
         self.root.title("Investment Strategy Calculator - Path to Financial Freedom")
         self.root.geometry("1400x900")
         
-        print("  -> Defining color scheme...")
         # Dark theme colors
         self.bg_dark = "#1a1a2e"
         self.bg_medium = "#16213e"
@@ -47,7 +94,6 @@ class InvestmentCalculator:
         
         self.root.configure(bg=self.bg_dark)
         
-        print("  -> Configuring styles...")
         # Configure dark theme style
         self.style = ttk.Style()
         self.style.theme_use('clam')
@@ -82,7 +128,6 @@ class InvestmentCalculator:
                            lightcolor=self.accent_green,
                            darkcolor=self.accent_green)
         
-        print("  -> Setting up tooltips...")
         # Tooltips dictionary with detailed explanations
         self.tooltips = {
             "monthly": (
@@ -134,7 +179,6 @@ class InvestmentCalculator:
             )
         }
         
-        print("  -> Setting up investment strategies...")
         # Investment strategy variables
         self.strategies = {
             'High-Yield Savings': tk.BooleanVar(value=True),
@@ -148,31 +192,36 @@ class InvestmentCalculator:
             'Real Estate Crowdfund': tk.BooleanVar()
         }
         
-        # Return rates for each strategy (annual %)
-        self.return_rates = {
-            'High-Yield Savings': 4.5,
-            'Roth IRA': 8.0,
-            'Index Funds (S&P500)': 8.0,
-            'Robo-Advisor': 7.5,
-            'Round-Up Apps': 7.5,
-            'Certificates of Deposit': 5.0,
-            'Treasury Bonds': 4.0,
-            'Crypto (High Risk)': 15.0,
-            'Real Estate Crowdfund': 9.0
-        }
+        # Return rates (annual %), risk levels, volatilities (annual %) and
+        # pairwise correlations of the Monte Carlo draws
+        self.return_rates = dict(RETURN_RATES)
+        self.risk_levels = dict(RISK_LEVELS)
+        self.volatilities = dict(VOLATILITIES)
+        self.correlations = dict(CORRELATIONS)
+        self.return_rates_version = 0
+        self.correlations_version = 0
         
-        # Risk levels
-        self.risk_levels = {
-            'High-Yield Savings': 'Very Low',
-            'Roth IRA': 'Medium',
-            'Index Funds (S&P500)': 'Medium',
-            'Robo-Advisor': 'Medium',
-            'Round-Up Apps': 'Medium',
-            'Certificates of Deposit': 'Very Low',
-            'Treasury Bonds': 'Very Low',
-            'Crypto (High Risk)': 'Very High',
-            'Real Estate Crowdfund': 'Medium-High'
-        }
+        # Projections for recently calculated inputs, and the stages built from
+        # them; created by the first calculation, as is the chart
+        self.projection_cache = None
+        self.pipeline = None
+        self.chart = None
+        self.cholesky_cache = None
+        # Last backtest: (key, result) or None, stored by the Tk thread like the retirement check
+        self.backtest_run = None
+        # Last retirement check per kind of path: {kind: (key, result)}; the
+        # worker gets a copy and the Tk thread stores what it sends back
+        self.decumulation_runs = {}
+        # Last Monte Carlo run: (inputs key, final snapshot or None while running)
+        self.monte_carlo_run = None
+        
+        # Calculations run on a background thread; results come back through root.after
+        self.worker = BackgroundWorker()
+        # The optimizer gets its own worker, so a search and a recalculation never cancel each other
+        self.optimizer_worker = BackgroundWorker("optimizer-worker")
+        self.displayed_inputs = None
+        self.poll_job = None
+        self.live_job = None
         
         # Strategy tooltips
         self.strategy_tooltips = {
@@ -311,9 +360,14 @@ class InvestmentCalculator:
             )
         }
         
-        print("  -> Creating widgets...")
+        # Stage timers only run while the timing overlay is shown
+        self.metrics = Instrumentation()
+        
         self.create_widgets()
-        print("  -> Setup complete!")
+        self.root.after(WARM_UP_DELAY_MS, self.start_warm_up)
+    
+    def start_warm_up(self):
+        threading.Thread(target=warm_up, name='import-warm-up', daemon=True).start()
     
     def create_tooltip(self, widget, text):
         """Create a tooltip that shows on hover"""
@@ -371,6 +425,41 @@ class InvestmentCalculator:
                           fg=self.text_dim)
         subtitle.pack()
         
+        self.metrics_var = tk.BooleanVar(value=False)
+        metrics_check = tk.Checkbutton(header,
+                                       text="Show timings",
+                                       variable=self.metrics_var,
+                                       command=self.toggle_metrics,
+                                       font=('Arial', 9),
+                                       bg=self.bg_medium,
+                                       fg=self.text_dim,
+                                       selectcolor=self.bg_light,
+                                       activebackground=self.bg_medium,
+                                       activeforeground=self.accent_green,
+                                       bd=0,
+                                       highlightthickness=0,
+                                       cursor='hand2')
+        metrics_check.place(relx=1.0, x=-12, y=8, anchor='ne')
+        
+        # Timing overlay, packed into the header by toggle_metrics
+        self.metrics_frame = tk.Frame(header, bg=self.bg_medium)
+        self.metrics_label = tk.Label(self.metrics_frame,
+                                      font=('Consolas', 9),
+                                      justify='left',
+                                      bg=self.bg_medium,
+                                      fg=self.accent_blue)
+        self.metrics_label.pack(side=tk.LEFT)
+        tk.Button(self.metrics_frame,
+                  text="Export...",
+                  command=self.save_metrics,
+                  font=('Arial', 9),
+                  bg=self.bg_light,
+                  fg=self.text_color,
+                  activebackground=self.accent_blue,
+                  bd=0,
+                  padx=8,
+                  cursor='hand2').pack(side=tk.LEFT, padx=(12, 0), anchor='s')
+        
         # Create main container
         main_frame = ttk.Frame(self.root)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
@@ -463,6 +552,7 @@ class InvestmentCalculator:
         # Strategy checkboxes with allocation sliders
         self.allocation_sliders = {}
         self.allocation_labels = {}
+        self.return_labels = {}
         
         for i, (strategy, var) in enumerate(self.strategies.items()):
             # Strategy container
@@ -503,8 +593,11 @@ class InvestmentCalculator:
                                   text=f"Return: {self.return_rates[strategy]}%",
                                   font=('Arial', 8),
                                   bg=self.bg_medium,
-                                  fg=self.accent_green)
+                                  fg=self.accent_green,
+                                  cursor='hand2')
             return_label.pack(side='right')
+            return_label.bind('<Button-1>', lambda e, s=strategy: self.edit_return_rate(s))
+            self.return_labels[strategy] = return_label
             
             # Allocation slider with percentage
             slider_container = tk.Frame(strategy_frame, bg=self.bg_medium)
@@ -535,13 +628,60 @@ class InvestmentCalculator:
             self.allocation_sliders[strategy] = slider
             self.allocation_labels[strategy] = pct_label
             
-            slider.config(command=lambda v, lbl=pct_label: lbl.config(text=f"{int(float(v))}%"))
+            slider.config(command=lambda v, lbl=pct_label: self.on_slider_moved(v, lbl))
         
         left_frame.rowconfigure(len(inputs)+2, weight=1)
         
+        # Monte Carlo mode toggle and path count
+        mc_frame = tk.Frame(left_frame, bg=self.bg_dark)
+        mc_frame.grid(row=len(inputs)+3, column=0, columnspan=2, pady=(15, 0), sticky='ew')
+        
+        self.monte_carlo_var = tk.BooleanVar(value=False)
+        mc_check = tk.Checkbutton(mc_frame,
+                                  text="Monte Carlo bands (P5/P50/P95)",
+                                  variable=self.monte_carlo_var,
+                                  font=('Arial', 10, 'bold'),
+                                  bg=self.bg_dark,
+                                  fg=self.text_color,
+                                  selectcolor=self.bg_light,
+                                  activebackground=self.bg_dark,
+                                  activeforeground=self.accent_green,
+                                  bd=0,
+                                  highlightthickness=0,
+                                  cursor='hand2')
+        mc_check.pack(side='left')
+        tk.Button(mc_frame,
+                  text="Correlations...",
+                  command=self.edit_correlation,
+                  font=('Arial', 8),
+                  bg=self.bg_light,
+                  fg=self.text_color,
+                  activebackground=self.accent_blue,
+                  activeforeground='white',
+                  relief='flat',
+                  bd=0,
+                  padx=6,
+                  cursor='hand2').pack(side='left', padx=(8, 0))
+        
+        self.paths_var = tk.StringVar(value="10000")
+        paths_entry = tk.Entry(mc_frame,
+                               textvariable=self.paths_var,
+                               width=9,
+                               font=('Arial', 10, 'bold'),
+                               bg=self.bg_light,
+                               fg=self.text_color,
+                               insertbackground=self.accent_green,
+                               relief='flat',
+                               highlightthickness=2,
+                               highlightbackground=self.accent_blue,
+                               highlightcolor=self.accent_green)
+        paths_entry.pack(side='right')
+        tk.Label(mc_frame, text="Paths:", font=('Arial', 10, 'bold'),
+                 bg=self.bg_dark, fg=self.accent_blue).pack(side='right', padx=(0, 5))
+        
         # Calculate button with glow effect
         button_frame = tk.Frame(left_frame, bg=self.bg_dark)
-        button_frame.grid(row=len(inputs)+3, column=0, columnspan=2, pady=20, sticky='ew')
+        button_frame.grid(row=len(inputs)+4, column=0, columnspan=2, pady=20, sticky='ew')
         
         calc_button = tk.Button(button_frame,
                                text="CALCULATE MY WEALTH PATH",
@@ -558,6 +698,246 @@ class InvestmentCalculator:
                                cursor='hand2')
         calc_button.pack(fill='x')
         
+        # Goal seek: solve one form field for a target passive income
+        goal_frame = tk.Frame(left_frame, bg=self.bg_medium, highlightthickness=1,
+                              highlightbackground=self.accent_blue)
+        goal_frame.grid(row=len(inputs)+5, column=0, columnspan=2, sticky='ew')
+        
+        goal_row = tk.Frame(goal_frame, bg=self.bg_medium)
+        goal_row.pack(fill='x', padx=10, pady=(8, 4))
+        tk.Label(goal_row, text="GOAL: $", font=('Arial', 10, 'bold'),
+                 bg=self.bg_medium, fg=self.accent_gold).pack(side='left')
+        self.goal_income_var = tk.StringVar(value="2000")
+        tk.Entry(goal_row,
+                 textvariable=self.goal_income_var,
+                 width=8,
+                 font=('Arial', 10, 'bold'),
+                 bg=self.bg_light,
+                 fg=self.text_color,
+                 insertbackground=self.accent_green,
+                 relief='flat',
+                 highlightthickness=2,
+                 highlightbackground=self.accent_blue,
+                 highlightcolor=self.accent_green).pack(side='left')
+        tk.Label(goal_row, text="/month passive income. Solve for:", font=('Arial', 10),
+                 bg=self.bg_medium, fg=self.text_color).pack(side='left', padx=(4, 0))
+        
+        solve_row = tk.Frame(goal_frame, bg=self.bg_medium)
+        solve_row.pack(fill='x', padx=10, pady=4)
+        for text, solve_for in (("Contribution", 'monthly'), ("Increase", 'annual_increase'),
+                                ("Years", 'years')):
+            tk.Button(solve_row,
+                      text=text,
+                      command=lambda s=solve_for: self.solve_goal(s),
+                      font=('Arial', 9, 'bold'),
+                      bg=self.bg_light,
+                      fg=self.text_color,
+                      activebackground=self.accent_blue,
+                      relief='flat',
+                      bd=0,
+                      padx=10,
+                      pady=4,
+                      cursor='hand2').pack(side='left', padx=(0, 6))
+        self.goal_apply_button = tk.Button(solve_row,
+                                           text="Apply",
+                                           command=self.apply_goal,
+                                           state='disabled',
+                                           font=('Arial', 9, 'bold'),
+                                           bg=self.accent_gold,
+                                           fg=self.bg_dark,
+                                           activebackground=self.accent_blue,
+                                           relief='flat',
+                                           bd=0,
+                                           padx=10,
+                                           pady=4,
+                                           cursor='hand2')
+        self.goal_apply_button.pack(side='right')
+        
+        self.goal_label = tk.Label(goal_frame, text="", font=('Arial', 9), justify='left', anchor='w',
+                                   wraplength=400, bg=self.bg_medium, fg=self.accent_green)
+        self.goal_label.pack(fill='x', padx=10, pady=(0, 8))
+        self.goal_solve_for = None
+        self.goal_result = None
+        
+        # Allocation optimizer: search the checked strategies' weights, then snap the sliders
+        optimizer_frame = tk.Frame(left_frame, bg=self.bg_medium, highlightthickness=1,
+                                   highlightbackground=self.accent_blue)
+        optimizer_frame.grid(row=len(inputs)+6, column=0, columnspan=2, sticky='ew', pady=(10, 0))
+        
+        optimizer_row = tk.Frame(optimizer_frame, bg=self.bg_medium)
+        optimizer_row.pack(fill='x', padx=10, pady=(8, 4))
+        tk.Label(optimizer_row, text="OPTIMIZE MIX:", font=('Arial', 10, 'bold'),
+                 bg=self.bg_medium, fg=self.accent_gold).pack(side='left')
+        self.objective_var = tk.StringVar(value=next(iter(OPTIMIZER_OBJECTIVES)))
+        objective_menu = tk.OptionMenu(optimizer_row, self.objective_var, *OPTIMIZER_OBJECTIVES)
+        objective_menu.configure(font=('Arial', 9, 'bold'),
+                                 bg=self.bg_light,
+                                 fg=self.text_color,
+                                 activebackground=self.accent_blue,
+                                 relief='flat',
+                                 bd=0,
+                                 highlightthickness=0,
+                                 cursor='hand2')
+        objective_menu['menu'].configure(bg=self.bg_light, fg=self.text_color, activebackground=self.accent_blue)
+        objective_menu.pack(side='left', padx=(6, 0))
+        self.create_tooltip(optimizer_row,
+                            "Allocation Optimizer\n\n"
+                            "Scores thousands of mixes of the checked strategies and picks\n"
+                            "the one with the highest median outcome, or the lowest chance\n"
+                            "of ending below the goal above. Crypto is capped at 10% of the\n"
+                            "portfolio. The report lists the efficient frontier: mixes\n"
+                            "with the highest median for their volatility.")
+        
+        optimize_row = tk.Frame(optimizer_frame, bg=self.bg_medium)
+        optimize_row.pack(fill='x', padx=10, pady=4)
+        tk.Button(optimize_row,
+                  text="Optimize",
+                  command=self.optimize_allocation,
+                  font=('Arial', 9, 'bold'),
+                  bg=self.bg_light,
+                  fg=self.text_color,
+                  activebackground=self.accent_blue,
+                  relief='flat',
+                  bd=0,
+                  padx=10,
+                  pady=4,
+                  cursor='hand2').pack(side='left')
+        self.snap_button = tk.Button(optimize_row,
+                                     text="Snap Sliders to Optimum",
+                                     command=self.snap_to_optimum,
+                                     state='disabled',
+                                     font=('Arial', 9, 'bold'),
+                                     bg=self.accent_gold,
+                                     fg=self.bg_dark,
+                                     activebackground=self.accent_blue,
+                                     relief='flat',
+                                     bd=0,
+                                     padx=10,
+                                     pady=4,
+                                     cursor='hand2')
+        self.snap_button.pack(side='right')
+        
+        self.optimizer_label = tk.Label(optimizer_frame, text="", font=('Arial', 9), justify='left', anchor='w',
+                                        wraplength=400, bg=self.bg_medium, fg=self.accent_green)
+        self.optimizer_label.pack(fill='x', padx=10, pady=(0, 8))
+        self.optimization = None
+        # The optimizer section currently in the report, replaced by the next result
+        self.optimizer_report = None
+        
+        self.live_var = tk.BooleanVar(value=False)
+        live_check = tk.Checkbutton(button_frame,
+                                    text="Live update as you type",
+                                    variable=self.live_var,
+                                    command=self.schedule_live_update,
+                                    font=('Arial', 10, 'bold'),
+                                    bg=self.bg_dark,
+                                    fg=self.text_color,
+                                    selectcolor=self.bg_light,
+                                    activebackground=self.bg_dark,
+                                    activeforeground=self.accent_green,
+                                    bd=0,
+                                    highlightthickness=0,
+                                    cursor='hand2')
+        live_check.pack(anchor='w', pady=(10, 0))
+        
+        self.exact_var = tk.BooleanVar(value=False)
+        exact_check = tk.Checkbutton(button_frame,
+                                     text="Cent-exact statement math",
+                                     variable=self.exact_var,
+                                     font=('Arial', 10, 'bold'),
+                                     bg=self.bg_dark,
+                                     fg=self.text_color,
+                                     selectcolor=self.bg_light,
+                                     activebackground=self.bg_dark,
+                                     activeforeground=self.accent_green,
+                                     bd=0,
+                                     highlightthickness=0,
+                                     cursor='hand2')
+        exact_check.pack(anchor='w', pady=(4, 0))
+        self.create_tooltip(exact_check,
+                            "Cent-Exact Mode\n\n"
+                            "Keeps the balance in whole cents and rounds each month's\n"
+                            "interest to the cent with banker's rounding (half to even),\n"
+                            "like a brokerage statement. Slightly slower than the default\n"
+                            "floating-point projection, which can drift by a few cents\n"
+                            "over decades.")
+        
+        rebalance_row = tk.Frame(button_frame, bg=self.bg_dark)
+        rebalance_row.pack(anchor='w', pady=(6, 0))
+        tk.Label(rebalance_row, text="Accounts:", font=('Arial', 10, 'bold'),
+                 bg=self.bg_dark, fg=self.text_color).pack(side='left')
+        self.rebalance_var = tk.StringVar(value=next(iter(REBALANCE_CHOICES)))
+        rebalance_menu = tk.OptionMenu(rebalance_row, self.rebalance_var, *REBALANCE_CHOICES)
+        rebalance_menu.configure(font=('Arial', 9, 'bold'),
+                                 bg=self.bg_light,
+                                 fg=self.text_color,
+                                 activebackground=self.accent_blue,
+                                 relief='flat',
+                                 bd=0,
+                                 highlightthickness=0,
+                                 cursor='hand2')
+        rebalance_menu['menu'].configure(bg=self.bg_light, fg=self.text_color, activebackground=self.accent_blue)
+        rebalance_menu.pack(side='left', padx=(6, 0))
+        self.create_tooltip(rebalance_row,
+                            "Per-Strategy Accounts\n\n"
+                            "Blended treats your mix as one balance earning the weighted\n"
+                            "return. The other options keep each strategy as its own\n"
+                            "account: contributions are split by your allocation, each\n"
+                            "account grows at its own rate, and the weights drift until\n"
+                            "they are rebalanced on schedule or once any strategy is 5%\n"
+                            "off target. Per-strategy accounts use floating-point math.")
+        
+        self.history_var = tk.BooleanVar(value=False)
+        history_check = tk.Checkbutton(button_frame,
+                                       text="Historical backtest (every start date)",
+                                       variable=self.history_var,
+                                       font=('Arial', 10, 'bold'),
+                                       bg=self.bg_dark,
+                                       fg=self.text_color,
+                                       selectcolor=self.bg_light,
+                                       activebackground=self.bg_dark,
+                                       activeforeground=self.accent_green,
+                                       bd=0,
+                                       highlightthickness=0,
+                                       cursor='hand2')
+        history_check.pack(anchor='w', pady=(4, 0))
+        self.create_tooltip(history_check,
+                            "Historical Backtest\n\n"
+                            "Replays a monthly return history for your mix from every\n"
+                            "possible start month and shows the worst-to-best range and\n"
+                            "the median on the portfolio chart. Uses data/return_history.csv\n"
+                            "if you add one; the bundled sample is SYNTHETIC, generated\n"
+                            "from the strategy assumptions, not real market returns.")
+        
+        self.retirement_var = tk.BooleanVar(value=False)
+        retirement_check = tk.Checkbutton(button_frame,
+                                          text="Retirement check (30 years of withdrawals)",
+                                          variable=self.retirement_var,
+                                          font=('Arial', 10, 'bold'),
+                                          bg=self.bg_dark,
+                                          fg=self.text_color,
+                                          selectcolor=self.bg_light,
+                                          activebackground=self.bg_dark,
+                                          activeforeground=self.accent_green,
+                                          bd=0,
+                                          highlightthickness=0,
+                                          cursor='hand2')
+        retirement_check.pack(anchor='w', pady=(4, 0))
+        self.create_tooltip(retirement_check,
+                            "Retirement Check\n\n"
+                            "Continues past the projection: withdraws your safe withdrawal\n"
+                            "rate of the final balance in the first year, raised 2.5% a\n"
+                            "year for inflation, for 30 years. Reports how often the money\n"
+                            "lasts on 10,000 random return paths (and on the return history\n"
+                            "when the backtest is on), and the highest rate from 2% to 8%\n"
+                            "that lasts in 95% of them.")
+        
+        # Live mode: any edit schedules a debounced recalculation
+        for var in (self.monthly_var, self.increase_var, self.years_var, self.initial_var,
+                    self.withdrawal_var, self.paths_var, self.monte_carlo_var, self.exact_var,
+                    self.rebalance_var, self.history_var, self.retirement_var, self.goal_income_var):
+            var.trace_add('write', self.schedule_live_update)
+        
         # === RIGHT PANEL ===
         
         # Results section
@@ -583,7 +963,7 @@ class InvestmentCalculator:
         
         scrollbar = tk.Scrollbar(text_frame, command=self.results_text.yview, bg=self.bg_dark)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.results_text.config(yscrollcommand=scrollbar.set)
+        self.report_view = ReportView(self.results_text, scrollbar)
         
         # Configure text tags for colored output
         self.results_text.tag_configure('header', foreground=self.accent_green, font=('Consolas', 10, 'bold'))
@@ -595,470 +975,623 @@ class InvestmentCalculator:
         self.graph_frame = ttk.LabelFrame(right_frame, text="WEALTH VISUALIZATION", padding=12)
         self.graph_frame.pack(fill=tk.BOTH, expand=True)
         
+    def set_return_rate(self, strategy, rate):
+        """Change a strategy's annual return and drop projections built on the old table"""
+        self.return_rates[strategy] = rate
+        if self.projection_cache is not None:
+            self.projection_cache.invalidate()
+        self.return_rates_version += 1
+    
+    def set_correlation(self, a, b, rho):
+        """Change the correlation between two strategies and drop factors built on the old matrix"""
+        self.correlations.pop((b, a), None)
+        self.correlations[(a, b)] = rho
+        if self.cholesky_cache is not None:
+            self.cholesky_cache.invalidate(self.correlations_version)
+        self.correlations_version += 1
+    
+    def edit_return_rate(self, strategy):
+        """Ask for a strategy's annual return and recalculate with it"""
+        rate = simpledialog.askfloat("Return Rate", f"Annual return for {strategy} (%):",
+                                     initialvalue=self.return_rates[strategy],
+                                     minvalue=-50, maxvalue=100, parent=self.root)
+        if rate is None or rate == self.return_rates[strategy]:
+            return
+        self.set_return_rate(strategy, rate)
+        self.return_labels[strategy].config(text=f"Return: {rate}%")
+        self.refresh_after_edit()
+    
+    def edit_correlation(self):
+        """Dialog for the correlation between two strategies"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Correlation")
+        dialog.configure(bg=self.bg_dark)
+        dialog.transient(self.root)
+        names = list(self.strategies)
+        first = tk.StringVar(value=names[1])
+        second = tk.StringVar(value=names[2])
+        rho_var = tk.StringVar()
+        
+        def show_current(*args):
+            rho_var.set(f"{correlation(first.get(), second.get(), self.correlations):g}")
+        
+        def apply():
+            a, b = first.get(), second.get()
+            try:
+                rho = float(rho_var.get())
+                if a == b or not -1 <= rho <= 1:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Input Error", "Pick two different strategies and a correlation "
+                                     "between -1 and 1!", parent=dialog)
+                return
+            if rho != correlation(a, b, self.correlations):
+                self.set_correlation(a, b, rho)
+                self.refresh_after_edit()
+            dialog.destroy()
+        
+        for row, var in enumerate((first, second)):
+            box = ttk.Combobox(dialog, textvariable=var, values=names, state='readonly', width=26)
+            box.grid(row=row, column=0, columnspan=2, padx=10, pady=(10 if row == 0 else 4, 0))
+            box.bind('<<ComboboxSelected>>', show_current)
+        tk.Label(dialog, text="Correlation (-1 to 1):", font=('Arial', 10),
+                 bg=self.bg_dark, fg=self.text_color).grid(row=2, column=0, padx=10, pady=10, sticky='w')
+        tk.Entry(dialog, textvariable=rho_var, width=8, font=('Arial', 10, 'bold'),
+                 bg=self.bg_light, fg=self.text_color, insertbackground=self.accent_green,
+                 relief='flat').grid(row=2, column=1, padx=10, pady=10)
+        tk.Button(dialog, text="Apply", command=apply, font=('Arial', 10, 'bold'),
+                  bg=self.accent_green, fg=self.bg_dark, relief='flat', bd=0, padx=12,
+                  cursor='hand2').grid(row=3, column=0, columnspan=2, pady=(0, 10))
+        show_current()
+    
+    def refresh_after_edit(self):
+        """Recalculate what is on screen after a return or correlation edit"""
+        if self.displayed_inputs is not None:
+            self.request_calculation(interactive=False)
+        
     def update_allocations(self):
         """Update allocation display"""
-        pass
+        self.schedule_live_update()
+    
+    def on_slider_moved(self, value, label):
+        label.config(text=f"{int(float(value))}%")
+        self.schedule_live_update()
+        
+    def toggle_metrics(self):
+        """Show or hide the timing overlay; stages are only timed while it is shown"""
+        self.metrics.enabled = self.metrics_var.get()
+        if self.metrics.enabled:
+            self.metrics_frame.pack(pady=(4, 8))
+            self.refresh_metrics()
+        else:
+            self.metrics_frame.pack_forget()
+    
+    def refresh_metrics(self):
+        """Redraw the overlay with the latest last/avg/p95 timings"""
+        if self.metrics.enabled:
+            self.metrics_label.config(text=self.metrics.table(OVERLAY_STAGES))
+    
+    def save_metrics(self):
+        """Export the collected timings as JSON or Prometheus text"""
+        path = filedialog.asksaveasfilename(defaultextension='.json',
+                                            filetypes=[('JSON', '*.json'), ('Prometheus text', '*.prom')])
+        if not path:
+            return
+        try:
+            self.metrics.write(path)
+        except OSError as exc:
+            messagebox.showerror("Export Error", str(exc))
+    
+    def solve_goal(self, solve_for):
+        """Solve one form field for the goal income and remember it for live updates"""
+        self.goal_solve_for = solve_for
+        inputs = self.read_inputs(interactive=True)
+        if inputs is not None:
+            self.update_goal(inputs, interactive=True)
+    
+    def update_goal(self, inputs, interactive=False):
+        """Re-solve the selected goal for ``inputs``; closed form, so cheap on every recalculation"""
+        if self.goal_solve_for is None:
+            return
+        try:
+            income = float(self.goal_income_var.get())
+            target = target_value(income, inputs['withdrawal_rate'])
+        except ValueError:
+            if interactive:
+                messagebox.showerror("Input Error", "Please enter a valid goal income and withdrawal rate!")
+            return
+        weighted_return = sum(self.return_rates[s] * a for s, a in inputs['allocations'])
+        years = inputs['years']
+        value = solve(self.goal_solve_for, target, inputs['monthly'], inputs['annual_increase'],
+                      years, inputs['initial'], weighted_return)
+        # Round up to what the form can hold, so applying the answer still reaches the goal
+        if value is not None and self.goal_solve_for == 'monthly':
+            value = math.ceil(value * 100 - 1e-9) / 100
+        elif value is not None and self.goal_solve_for == 'annual_increase':
+            value = math.ceil(value * 10000 - 1e-9) / 10000
+        self.goal_result = value
+        goal = f"${income:,.0f}/month needs ${target:,.0f}"
+        if value is None:
+            text = f"{goal}: not reachable by changing only this field."
+        elif self.goal_solve_for == 'monthly':
+            text = f"{goal}: invest ${value:,.2f}/month for {years} years."
+        elif self.goal_solve_for == 'annual_increase':
+            text = f"{goal}: raise contributions {value * 100:.2f}% a year for {years} years."
+        else:
+            text = f"{goal}: reached in {value} years at ${inputs['monthly']:,.2f}/month."
+        self.goal_label.config(text=text)
+        self.goal_apply_button.config(state='disabled' if value is None else 'normal')
+    
+    def apply_goal(self):
+        """Copy the solved value into the form and recalculate"""
+        if self.goal_result is None:
+            return
+        if self.goal_solve_for == 'monthly':
+            self.monthly_var.set(f"{self.goal_result:.2f}")
+        elif self.goal_solve_for == 'annual_increase':
+            self.increase_var.set(f"{self.goal_result * 100:.2f}")
+        else:
+            self.years_var.set(str(self.goal_result))
+        self.calculate()
+    
+    def optimize_allocation(self):
+        """Search the checked strategies' weights on the optimizer worker; a newer press supersedes it"""
+        from correlated_shocks import CholeskyCache
+        inputs = self.read_inputs(interactive=True)
+        if inputs is None:
+            return
+        objective = OPTIMIZER_OBJECTIVES[self.objective_var.get()]
+        target = None
+        if objective == 'shortfall':
+            try:
+                target = target_value(float(self.goal_income_var.get()), inputs['withdrawal_rate'])
+            except ValueError:
+                messagebox.showerror("Input Error", "Please enter a valid goal income and withdrawal rate!")
+                return
+        strategies = [s for s, var in self.strategies.items() if var.get()]
+        if self.cholesky_cache is None:
+            self.cholesky_cache = CholeskyCache()
+        factor = self.cholesky_cache.factor(strategies, self.correlations, inputs['correlations_version'])
+        self.optimizer_label.config(text="Optimizing...")
+        self.optimizer_worker.submit(self.run_optimizer, strategies, inputs, objective, target, factor,
+                                     dict(self.return_rates), dict(self.volatilities),
+                                     handler=self.apply_optimization)
+        self.start_polling()
+    
+    def run_optimizer(self, job, strategies, inputs, objective, target, factor, return_rates, volatilities):
+        """Worker-thread half of an optimizer run; an error message if it cannot run"""
+        from optimizer import optimize
+        with self.metrics.timer('optimize'):
+            try:
+                return optimize(strategies, inputs['monthly'], inputs['annual_increase'], inputs['years'],
+                                inputs['initial'], objective, target, return_rates, volatilities,
+                                correlation_factor=factor, seed=0, current=dict(inputs['allocations']))
+            except ValueError as exc:
+                return str(exc)
+    
+    def apply_optimization(self, result, done):
+        """Show the optimum and replace the previous optimizer section of the report"""
+        if isinstance(result, str):
+            self.optimizer_label.config(text="")
+            messagebox.showerror("Optimizer Error", result)
+            return
+        self.optimization = result
+        median, _, shortfall = result.outcome()
+        mix = ", ".join(f"{percent}% {strategy}" for strategy, percent in result.slider_percentages().items()
+                        if percent)
+        if shortfall is None:
+            text = f"Optimum: {mix}. Median ${median:,.0f}"
+        else:
+            text = f"Optimum: {mix}. {shortfall:.1%} chance of ending below ${result.target:,.0f}"
+        if result.current is not None:
+            current_median, _, current_shortfall = result.outcome(result.current)
+            text += f" (yours: ${current_median:,.0f})" if shortfall is None else f" (yours: {current_shortfall:.1%})"
+        text += "."
+        self.optimizer_label.config(text=text)
+        self.snap_button.config(state='normal')
         
+        section = optimizer_section(result)
+        shown = [i for i, existing in enumerate(self.report_view.sections) if existing is self.optimizer_report]
+        if shown:
+            self.report_view.replace(shown[0], section)
+        else:
+            self.report_view.append([section])
+        self.optimizer_report = section
+    
+    def snap_to_optimum(self):
+        """Move the allocation sliders to the optimum and recalculate"""
+        if self.optimization is None:
+            return
+        for strategy, percent in self.optimization.slider_percentages().items():
+            self.strategies[strategy].set(True)
+            self.allocation_sliders[strategy].set(percent)
+            self.allocation_labels[strategy].config(text=f"{percent}%")
+        self.calculate()
+    
     def calculate(self):
+        """Validate the form and recalculate on the background worker"""
+        self.request_calculation(interactive=True)
+    
+    def schedule_live_update(self, *args):
+        """Debounce form edits in live mode into a single background recalculation"""
+        if not self.live_var.get():
+            return
+        if self.live_job is not None:
+            self.root.after_cancel(self.live_job)
+        self.live_job = self.root.after(LIVE_DEBOUNCE_MS, self.live_update)
+    
+    def live_update(self):
+        self.live_job = None
+        self.request_calculation(interactive=False)
+    
+    def read_inputs(self, interactive):
+        """Parse the form into pipeline inputs; None if the form is invalid
+        
+        Problems are reported in dialogs only when ``interactive`` is set, so
+        half-typed values in live mode are silently skipped.
+        """
         try:
             monthly = float(self.monthly_var.get())
             annual_increase = float(self.increase_var.get()) / 100
             years = int(self.years_var.get())
             initial = float(self.initial_var.get())
             withdrawal_rate = float(self.withdrawal_var.get()) / 100
-            
-            selected_strategies = []
-            allocations = []
-            
-            for strategy, var in self.strategies.items():
-                if var.get():
-                    allocation = self.allocation_sliders[strategy].get()
-                    if allocation > 0:
-                        selected_strategies.append(strategy)
-                        allocations.append(allocation)
-            
-            if not selected_strategies:
+            mc_paths = int(self.paths_var.get()) if self.monte_carlo_var.get() else 0
+        except ValueError:
+            if interactive:
+                messagebox.showerror("Input Error", "Please enter valid numbers for all fields!")
+            return None
+        
+        selected_strategies = []
+        allocations = []
+        
+        for strategy, var in self.strategies.items():
+            if var.get():
+                allocation = self.allocation_sliders[strategy].get()
+                if allocation > 0:
+                    selected_strategies.append(strategy)
+                    allocations.append(allocation)
+        
+        if not selected_strategies:
+            if interactive:
                 messagebox.showwarning("No Strategies", "Please select at least one investment strategy!")
-                return
-            
-            total_allocation = sum(allocations)
-            if total_allocation == 0:
+            return None
+        
+        total_allocation = sum(allocations)
+        if total_allocation == 0:
+            if interactive:
                 messagebox.showwarning("Zero Allocation", "Please set allocation percentages!")
-                return
-                
-            allocations = [a / total_allocation for a in allocations]
-            
-            weighted_return = sum(self.return_rates[s] * a for s, a in zip(selected_strategies, allocations))
-            monthly_rate = weighted_return / 100 / 12
-            
-            months = years * 12
-            portfolio_values = [initial]
-            contributions_total = [0]
-            monthly_contribution = monthly
-            
-            for month in range(1, months + 1):
-                if month % 12 == 0:
-                    monthly_contribution *= (1 + annual_increase)
-                
-                previous_value = portfolio_values[-1]
-                new_value = previous_value * (1 + monthly_rate) + monthly_contribution
-                portfolio_values.append(new_value)
-                contributions_total.append(contributions_total[-1] + monthly_contribution)
-            
-            final_value = portfolio_values[-1]
-            total_contributed = contributions_total[-1] + initial
-            total_gains = final_value - total_contributed
-            annual_income = final_value * withdrawal_rate
-            monthly_income = annual_income / 12
-            
-            # Display results with colored tags
-            self.results_text.delete(1.0, tk.END)
-            
-            self.insert_colored(f"\n{'='*70}\n", 'header')
-            self.insert_colored(f"  YOUR PATH TO FINANCIAL FREEDOM - {years} YEAR PROJECTION\n", 'header')
-            self.insert_colored(f"{'='*70}\n\n", 'header')
-            
-            self.insert_colored("IMPORTANT NOTE:\n", 'highlight')
-            self.results_text.insert(tk.END, "These projections assume all dividends and gains are REINVESTED\n")
-            self.results_text.insert(tk.END, "automatically. This is the power of compound growth!\n\n")
-            
-            self.insert_colored("INVESTMENT CONFIGURATION\n", 'subheader')
-            self.insert_colored("-" * 70 + "\n", 'subheader')
-            self.results_text.insert(tk.END, f"Starting Monthly Investment:    ${monthly:,.2f}\n")
-            self.results_text.insert(tk.END, f"Annual Contribution Increase:   {annual_increase*100:.1f}%\n")
-            self.results_text.insert(tk.END, f"Initial Investment:             ${initial:,.2f}\n")
-            self.results_text.insert(tk.END, f"Investment Period:              {years} years\n")
-            self.insert_colored(f"Weighted Average Return:        {weighted_return:.2f}% per year\n\n", 'success')
-            
-            self.insert_colored("SELECTED STRATEGIES\n", 'subheader')
-            self.insert_colored("-" * 70 + "\n", 'subheader')
-            for strategy, allocation in zip(selected_strategies, allocations):
-                self.results_text.insert(tk.END, f"  {strategy}\n")
-                self.insert_colored(f"    -> Allocation: {allocation*100:.1f}%  |  ", 'highlight')
-                self.results_text.insert(tk.END, f"Return: {self.return_rates[strategy]}%  |  ")
-                self.results_text.insert(tk.END, f"Risk: {self.risk_levels[strategy]}\n")
-            
-            self.insert_colored(f"\n{'='*70}\n", 'header')
-            self.insert_colored(f"FINAL RESULTS AFTER {years} YEARS\n", 'header')
-            self.insert_colored(f"{'='*70}\n", 'header')
-            self.results_text.insert(tk.END, f"Total Contributed:              ${total_contributed:,.2f}\n")
-            self.insert_colored(f"Final Portfolio Value:          ${final_value:,.2f}\n", 'success')
-            self.insert_colored(f"Total Investment Gains:         ${total_gains:,.2f}\n", 'success')
-            self.insert_colored(f"Return on Investment:           {(total_gains/total_contributed)*100:.1f}%\n\n", 'highlight')
-            
-            self.insert_colored(f"PASSIVE INCOME (at {withdrawal_rate*100:.0f}% withdrawal rate)\n", 'header')
-            self.insert_colored("=" * 70 + "\n", 'header')
-            self.insert_colored(f"Annual Passive Income:          ${annual_income:,.2f}\n", 'success')
-            self.insert_colored(f"Monthly Passive Income:         ${monthly_income:,.2f}\n\n", 'success')
-            
-            self.insert_colored("="*70 + "\n", 'header')
-            self.insert_colored("STEP-BY-STEP ACTION PLAN FOR YOUR JOURNEY\n", 'header')
-            self.insert_colored("="*70 + "\n\n", 'header')
-            
-            # Generate personalized action plan
-            self.insert_colored("PHASE 1: Foundation (Months 1-6)\n", 'subheader')
-            self.results_text.insert(tk.END, f"Month 1-3:\n")
-            if 'High-Yield Savings' in selected_strategies:
-                self.insert_colored(f"  1. Open a High-Yield Savings Account (you selected this!)\n", 'success')
-                self.results_text.insert(tk.END, f"     - Deposit ${monthly:,.2f}/month\n")
-                self.results_text.insert(tk.END, f"     - Build emergency fund to $500-1000\n")
-            else:
-                self.results_text.insert(tk.END, f"  1. Consider opening a High-Yield Savings Account first\n")
-                self.results_text.insert(tk.END, f"     - Build a small safety net before investing\n")
-            
-            self.results_text.insert(tk.END, f"\nMonth 4-6:\n")
-            if initial > 0:
-                self.insert_colored(f"  2. You're starting with ${initial:,.2f} - great head start!\n", 'success')
-                self.results_text.insert(tk.END, f"     - Invest this lump sum immediately\n")
-            else:
-                self.results_text.insert(tk.END, f"  2. Start your investment accounts\n")
-            
-            # Account opening recommendations
-            self.results_text.insert(tk.END, f"  3. Open these accounts based on your selections:\n")
-            account_providers = {
-                'Roth IRA': 'Fidelity, Vanguard, or Schwab',
-                'Index Funds (S&P500)': 'Vanguard (VFIAX), Fidelity (FXAIX), or Schwab (SWPPX)',
-                'Robo-Advisor': 'Betterment or Wealthfront',
-                'Round-Up Apps': 'Acorns or Robinhood',
-                'Certificates of Deposit': 'Your bank or Ally Bank',
-                'Treasury Bonds': 'TreasuryDirect.gov',
-                'Crypto (High Risk)': 'Coinbase or Kraken (5-10% of portfolio MAX!)',
-                'Real Estate Crowdfund': 'Fundrise or RealtyMogul'
-            }
-            
-            for strategy in selected_strategies:
-                if strategy in account_providers:
-                    allocation_pct = allocations[selected_strategies.index(strategy)] * 100
-                    self.insert_colored(f"     - {strategy} ({allocation_pct:.0f}%): ", 'highlight')
-                    self.results_text.insert(tk.END, f"{account_providers[strategy]}\n")
-            
-            self.results_text.insert(tk.END, f"\n")
-            self.insert_colored("PHASE 2: Automation (Months 6-12)\n", 'subheader')
-            self.results_text.insert(tk.END, f"Month 6:\n")
-            self.insert_colored(f"  1. Set up automatic investments of ${monthly:,.2f}/month\n", 'success')
-            self.results_text.insert(tk.END, f"     - Choose the same day each month (e.g., payday)\n")
-            self.results_text.insert(tk.END, f"     - Split across your strategies:\n")
+            return None
             
-            for strategy, allocation in zip(selected_strategies, allocations):
-                monthly_amount = monthly * allocation
-                self.results_text.insert(tk.END, f"       * {strategy}: ${monthly_amount:.2f}/month\n")
-            
-            self.results_text.insert(tk.END, f"\nMonth 7-12:\n")
-            self.results_text.insert(tk.END, f"  2. DO NOT check your accounts daily!\n")
-            self.results_text.insert(tk.END, f"     - Markets go up and down - this is normal\n")
-            self.results_text.insert(tk.END, f"     - Review quarterly, not daily\n")
-            self.results_text.insert(tk.END, f"  3. Focus on increasing your income\n")
-            self.results_text.insert(tk.END, f"     - Side hustles, skills, promotions\n")
-            
-            self.results_text.insert(tk.END, f"\n")
-            self.insert_colored("PHASE 3: Growth (Years 1-5)\n", 'subheader')
-            
-            if annual_increase > 0:
-                year1_contribution = monthly * (1 + annual_increase)
-                self.insert_colored(f"  With your {annual_increase*100:.0f}% annual increase:\n", 'highlight')
-                self.results_text.insert(tk.END, f"  - Year 1: ${monthly:,.2f}/month\n")
-                self.results_text.insert(tk.END, f"  - Year 2: ${year1_contribution:.2f}/month\n")
-                self.results_text.insert(tk.END, f"  - Year 3: ${year1_contribution * (1+annual_increase):.2f}/month\n")
-                self.results_text.insert(tk.END, f"  - Year 4: ${year1_contribution * (1+annual_increase)**2:.2f}/month\n")
-                self.results_text.insert(tk.END, f"  - Year 5: ${year1_contribution * (1+annual_increase)**3:.2f}/month\n\n")
-            else:
-                self.results_text.insert(tk.END, f"  Goal: Increase your monthly contribution over time\n")
-                self.results_text.insert(tk.END, f"  - Even adding $10-20 more per year makes a huge difference!\n\n")
-            
-            self.results_text.insert(tk.END, f"  Action items:\n")
-            self.insert_colored(f"  - Invest any bonuses or tax refunds\n", 'success')
-            self.insert_colored(f"  - Increase contribution with every raise\n", 'success')
-            self.insert_colored(f"  - Build additional income streams\n", 'success')
-            
-            self.results_text.insert(tk.END, f"\n")
-            self.insert_colored("PHASE 4: Milestone Celebrations\n", 'subheader')
-            
-            # Calculate key milestones - FIXED VERSION
-            milestones_to_show = []
-            milestone_targets = [1000, 5000, 10000, 25000, 50000, 100000, 250000, 500000, 1000000]
-            
-            for target in milestone_targets:
-                found = False
-                for month_idx in range(len(portfolio_values)):
-                    if portfolio_values[month_idx] >= target and not found:
-                        years_to_milestone = month_idx / 12.0
-                        if years_to_milestone <= years:
-                            milestones_to_show.append((target, years_to_milestone))
-                            found = True
-                        break
-            
-            if milestones_to_show:
-                self.results_text.insert(tk.END, f"  Here's when you'll hit major milestones:\n\n")
-                for target, years_to in milestones_to_show[:7]:  # Show first 7 milestones
-                    if years_to <= years:
-                        passive_at_milestone = (target * withdrawal_rate) / 12
-                        
-                        # Format years more precisely
-                        if years_to < 1:
-                            months_to = int(years_to * 12)
-                            self.insert_colored(f"  ${target:,.0f} ", 'highlight')
-                            self.results_text.insert(tk.END, f"in ~{months_to} months")
-                        else:
-                            years_whole = int(years_to)
-                            months_remainder = int((years_to - years_whole) * 12)
-                            self.insert_colored(f"  ${target:,.0f} ", 'highlight')
-                            if months_remainder > 0:
-                                self.results_text.insert(tk.END, f"in ~{years_whole} years {months_remainder} months")
-                            else:
-                                self.results_text.insert(tk.END, f"in ~{years_whole} years")
-                        
-                        if passive_at_milestone >= 100:
-                            self.insert_colored(f" -> ${passive_at_milestone:.0f}/month passive\n", 'success')
-                        else:
-                            self.results_text.insert(tk.END, "\n")
-            else:
-                self.results_text.insert(tk.END, f"  Keep investing! Your milestones will come with time.\n")
-                self.results_text.insert(tk.END, f"  First target: ${milestone_targets[0]:,.0f}\n")
-            
-            self.results_text.insert(tk.END, f"\n")
-            self.insert_colored("PHASE 5: Stay The Course (Years 5+)\n", 'subheader')
-            self.results_text.insert(tk.END, f"  The hardest part: PATIENCE\n\n")
-            self.results_text.insert(tk.END, f"  DO:\n")
-            self.insert_colored(f"  - Keep investing every single month\n", 'success')
-            self.insert_colored(f"  - Reinvest all dividends automatically\n", 'success')
-            self.insert_colored(f"  - Increase contributions when possible\n", 'success')
-            self.insert_colored(f"  - Rebalance once or twice a year\n", 'success')
-            
-            self.results_text.insert(tk.END, f"\n  DON'T:\n")
-            self.results_text.insert(tk.END, f"  - Panic sell during market crashes\n")
-            self.results_text.insert(tk.END, f"  - Try to time the market\n")
-            self.results_text.insert(tk.END, f"  - Stop investing during downturns\n")
-            self.results_text.insert(tk.END, f"  - Touch the money before your goal\n\n")
-            
-            self.insert_colored("="*70 + "\n", 'header')
-            self.insert_colored("YOUR FIRST WEEK ACTION CHECKLIST\n", 'header')
-            self.insert_colored("="*70 + "\n", 'header')
-            self.results_text.insert(tk.END, f"[ ] Day 1: Research and compare account providers\n")
-            self.results_text.insert(tk.END, f"[ ] Day 2-3: Open your selected accounts\n")
-            self.results_text.insert(tk.END, f"[ ] Day 4: Link your bank account\n")
-            self.results_text.insert(tk.END, f"[ ] Day 5: Set up automatic transfers\n")
-            if initial > 0:
-                self.results_text.insert(tk.END, f"[ ] Day 6: Make initial ${initial:,.2f} investment\n")
-            else:
-                self.results_text.insert(tk.END, f"[ ] Day 6: Make your first ${monthly:,.2f} deposit\n")
-            self.results_text.insert(tk.END, f"[ ] Day 7: Enable dividend reinvestment (DRIP)\n")
-            self.results_text.insert(tk.END, f"[ ] Ongoing: Track progress monthly, stay consistent!\n\n")
-            
-            self.insert_colored("MILESTONE CHECKPOINTS\n", 'subheader')
-            self.insert_colored("-" * 70 + "\n", 'subheader')
-            
-            # Show detailed milestone breakdown every 5 years, plus intermediate years
-            milestones_years = []
-            if years >= 5:
-                milestones_years.extend([1, 3, 5])
-            if years >= 10:
-                milestones_years.extend([7, 10])
-            if years >= 15:
-                milestones_years.extend([12, 15])
-            if years >= 20:
-                milestones_years.extend([17, 20])
-            if years >= 25:
-                milestones_years.extend([22, 25])
-            if years >= 30:
-                milestones_years.extend([27, 30])
-            if years >= 40:
-                milestones_years.extend([35, 40])
-            
-            for milestone in sorted(set(milestones_years)):
-                if milestone <= years:
-                    milestone_months = milestone * 12
-                    milestone_value = portfolio_values[milestone_months]
-                    milestone_contributed = contributions_total[milestone_months] + initial
-                    milestone_gains = milestone_value - milestone_contributed
-                    milestone_income = milestone_value * withdrawal_rate / 12
-                    milestone_annual_income = milestone_value * withdrawal_rate
-                    roi = (milestone_gains / milestone_contributed * 100) if milestone_contributed > 0 else 0
-                    
-                    self.insert_colored(f"\n=== Year {milestone} ===\n", 'highlight')
-                    self.results_text.insert(tk.END, f"  Portfolio Value:        ${milestone_value:,.2f}\n")
-                    self.results_text.insert(tk.END, f"  Total Contributed:      ${milestone_contributed:,.2f}\n")
-                    self.insert_colored(f"  Investment Gains:       ${milestone_gains:,.2f}\n", 'success')
-                    self.results_text.insert(tk.END, f"  ROI:                    {roi:.1f}%\n")
-                    self.insert_colored(f"  Monthly Passive Income: ${milestone_income:,.2f}\n", 'success')
-                    self.results_text.insert(tk.END, f"  Annual Passive Income:  ${milestone_annual_income:,.2f}\n")
-                    
-                    # Show contribution rate at this point
-                    if milestone > 0:
-                        monthly_at_milestone = monthly * ((1 + annual_increase) ** milestone)
-                        self.results_text.insert(tk.END, f"  Your Monthly Investment: ${monthly_at_milestone:,.2f}\n")
-            
-            if monthly_income < 2000:
-                self.insert_colored(f"\n{'='*70}\n", 'header')
-                self.insert_colored("ACCELERATE YOUR JOURNEY\n", 'header')
-                self.insert_colored(f"{'='*70}\n", 'header')
-                self.results_text.insert(tk.END, f"Current monthly passive income: ${monthly_income:,.2f}\n\n")
-                self.insert_colored(f"To reach $2,000/month passive income:\n", 'highlight')
-                self.results_text.insert(tk.END, f"  Portfolio needed: ${2000*12/withdrawal_rate:,.2f}\n\n")
-                self.results_text.insert(tk.END, "STRATEGIES TO GET THERE FASTER:\n")
-                self.insert_colored("  - Increase contributions as income grows\n", 'success')
-                self.insert_colored("  - Invest windfalls (bonuses, tax returns)\n", 'success')
-                self.insert_colored("  - Build additional income streams\n", 'success')
-                self.insert_colored("  - Consider lower cost-of-living locations\n\n", 'success')
-                self.insert_colored("Remember: Consistency beats perfection!\n", 'highlight')
-            else:
-                self.insert_colored(f"\n{'='*70}\n", 'header')
-                self.insert_colored("CONGRATULATIONS!\n", 'header')
-                self.insert_colored(f"{'='*70}\n", 'header')
-                self.insert_colored(f"You're on track for ${monthly_income:,.2f}/month in passive income!\n\n", 'success')
-                self.results_text.insert(tk.END, "This could support a comfortable lifestyle in many parts\n")
-                self.results_text.insert(tk.END, "of the world. Keep building your empire!\n")
-            
-            self.create_graph(portfolio_values, contributions_total, years, withdrawal_rate)
-            
-        except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid numbers for all fields!")
+        allocations = [a / total_allocation for a in allocations]
+        
+        return {
+            'monthly': monthly,
+            'annual_increase': annual_increase,
+            'years': years,
+            'initial': initial,
+            'allocations': tuple(zip(selected_strategies, allocations)),
+            'rates_version': self.return_rates_version,
+            'correlations_version': self.correlations_version,
+            'withdrawal_rate': withdrawal_rate,
+            'mc_paths': mc_paths,
+            'precision': 'cents' if self.exact_var.get() else 'float',
+            'rebalance': REBALANCE_CHOICES[self.rebalance_var.get()],
+            'history': self.history_var.get(),
+            'retirement': self.retirement_var.get()
+        }
+    
+    def request_calculation(self, interactive):
+        """Hand the current form to the worker; newer requests supersede older ones"""
+        with self.metrics.timer('parse'):
+            inputs = self.read_inputs(interactive)
+        if inputs is None:
+            return
+        self.metrics.count('requests')
+        # The worker gets its own copies of the rates and correlations: edits on
+        # this thread bump their versions, so the copies always match ``inputs``
+        retirement = None
+        if inputs['retirement']:
+            from correlated_shocks import CholeskyCache
+            strategies = [s for s, _ in inputs['allocations']]
+            if self.cholesky_cache is None:
+                self.cholesky_cache = CholeskyCache()
+            factor = self.cholesky_cache.factor(strategies, self.correlations, inputs['correlations_version'])
+            retirement = (dict(self.volatilities), factor, dict(self.decumulation_runs))
+        self.worker.submit(self.compute_projection, inputs, dict(self.return_rates), self.backtest_run, retirement,
+                           time.perf_counter(), handler=self.apply_projection)
+        self.start_polling()
     
-    def insert_colored(self, text, tag):
-        """Helper to insert colored text"""
-        self.results_text.insert(tk.END, text, tag)
+    def compute_projection(self, job, inputs, return_rates, backtest, retirement, requested_at):
+        """Worker-thread half of a calculation: simulation, milestones, backtest and retirement check"""
+        if self.pipeline is None:
+            from incremental import IncrementalProjection
+            from projection_cache import ProjectionCache
+            self.projection_cache = ProjectionCache()
+            self.pipeline = IncrementalProjection(return_rates, self.projection_cache)
+        self.pipeline.return_rates = return_rates
+        with self.metrics.timer('simulation'):
+            self.pipeline.update(**inputs)
+        backtest = self.run_backtest(inputs, backtest) if inputs['history'] else None
+        if retirement is not None:
+            retirement = self.run_decumulation(inputs, return_rates, *retirement)
+        return (inputs, return_rates, self.pipeline.projection, self.pipeline.milestones, backtest, retirement,
+                requested_at)
     
-    def create_graph(self, portfolio_values, contributions_total, years, withdrawal_rate):
-        for widget in self.graph_frame.winfo_children():
-            widget.destroy()
-        
-        # Set dark theme for matplotlib
-        plt.style.use('dark_background')
-        
-        fig = plt.figure(figsize=(10, 9))
-        gs = fig.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
-        fig.patch.set_facecolor(self.bg_light)
-        
-        months = len(portfolio_values) - 1
-        time_array = np.arange(0, months + 1) / 12
-        
-        # Main portfolio growth (larger, top)
-        ax1 = fig.add_subplot(gs[0, :])
-        ax1.set_facecolor(self.bg_light)
-        ax1.plot(time_array, portfolio_values, label='Portfolio Value', color='#00ff88', linewidth=2.5, zorder=3)
-        ax1.plot(time_array, contributions_total, label='Total Contributed', color='#00d4ff', linewidth=2, linestyle='--', zorder=2)
-        ax1.fill_between(time_array, contributions_total, portfolio_values, alpha=0.3, color='#00ff88', label='Investment Gains', zorder=1)
-        
-        # Add milestone markers
-        milestone_targets = [10000, 25000, 50000, 100000, 250000, 500000, 1000000]
-        for target in milestone_targets:
-            for idx, val in enumerate(portfolio_values):
-                if val >= target and (idx == 0 or portfolio_values[idx-1] < target):
-                    year_at = idx / 12
-                    if year_at <= years:
-                        ax1.axvline(x=year_at, color='#ffd700', linestyle=':', alpha=0.3, linewidth=1)
-                        ax1.text(year_at, val, f'${target/1000:.0f}K', 
-                                fontsize=7, color='#ffd700', rotation=90, 
-                                verticalalignment='bottom', horizontalalignment='right')
-                    break
-        
-        ax1.set_xlabel('Years', fontsize=11, color=self.text_color, fontweight='bold')
-        ax1.set_ylabel('Portfolio Value ($)', fontsize=11, color=self.text_color, fontweight='bold')
-        ax1.set_title('Portfolio Growth Over Time (with Milestones)', fontsize=13, fontweight='bold', color=self.accent_gold, pad=15)
-        ax1.legend(loc='upper left', fontsize=9, framealpha=0.9, facecolor=self.bg_medium, edgecolor=self.accent_blue)
-        ax1.grid(True, alpha=0.2, color=self.text_dim)
-        ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1000:.0f}K' if x >= 1000 else f'${x:.0f}'))
-        ax1.tick_params(colors=self.text_dim)
-        for spine in ax1.spines.values():
-            spine.set_color(self.accent_blue)
-        
-        # Passive income growth (middle left)
-        ax2 = fig.add_subplot(gs[1, 0])
-        ax2.set_facecolor(self.bg_light)
-        monthly_income = [v * withdrawal_rate / 12 for v in portfolio_values]
-        ax2.plot(time_array, monthly_income, label='Monthly Passive Income', color='#ffd700', linewidth=2.5, zorder=3)
-        ax2.axhline(y=1000, color='#ff6b6b', linestyle='--', linewidth=1.5, label='$1K/month', zorder=2, alpha=0.7)
-        ax2.axhline(y=2000, color='#ff6b6b', linestyle='--', linewidth=2, label='$2K/month', zorder=2)
-        ax2.axhline(y=3000, color='#ff6b6b', linestyle='--', linewidth=1.5, label='$3K/month', zorder=2, alpha=0.7)
-        ax2.set_xlabel('Years', fontsize=10, color=self.text_color, fontweight='bold')
-        ax2.set_ylabel('Monthly Income ($)', fontsize=10, color=self.text_color, fontweight='bold')
-        ax2.set_title('Passive Income Growth', fontsize=11, fontweight='bold', color=self.accent_gold, pad=10)
-        ax2.legend(loc='upper left', fontsize=7, framealpha=0.9, facecolor=self.bg_medium, edgecolor=self.accent_blue)
-        ax2.grid(True, alpha=0.2, color=self.text_dim)
-        ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
-        ax2.tick_params(colors=self.text_dim, labelsize=8)
-        for spine in ax2.spines.values():
-            spine.set_color(self.accent_blue)
-        
-        # Gains vs Contributions breakdown (middle right)
-        ax3 = fig.add_subplot(gs[1, 1])
-        ax3.set_facecolor(self.bg_light)
-        gains = [portfolio_values[i] - contributions_total[i] for i in range(len(portfolio_values))]
-        ax3.plot(time_array, contributions_total, label='Your Money', color='#00d4ff', linewidth=2, zorder=2)
-        ax3.plot(time_array, gains, label='Investment Gains', color='#00ff88', linewidth=2.5, zorder=3)
-        ax3.set_xlabel('Years', fontsize=10, color=self.text_color, fontweight='bold')
-        ax3.set_ylabel('Value ($)', fontsize=10, color=self.text_color, fontweight='bold')
-        ax3.set_title('Your Money vs. Compound Gains', fontsize=11, fontweight='bold', color=self.accent_gold, pad=10)
-        ax3.legend(loc='upper left', fontsize=7, framealpha=0.9, facecolor=self.bg_medium, edgecolor=self.accent_blue)
-        ax3.grid(True, alpha=0.2, color=self.text_dim)
-        ax3.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1000:.0f}K' if x >= 1000 else f'${x:.0f}'))
-        ax3.tick_params(colors=self.text_dim, labelsize=8)
-        for spine in ax3.spines.values():
-            spine.set_color(self.accent_blue)
-        
-        # Annual contribution growth (bottom left)
-        ax4 = fig.add_subplot(gs[2, 0])
-        ax4.set_facecolor(self.bg_light)
-        annual_increase = float(self.increase_var.get()) / 100
-        monthly_start = float(self.monthly_var.get())
-        yearly_contributions = [monthly_start * 12 * ((1 + annual_increase) ** year) for year in range(years + 1)]
-        year_markers = list(range(years + 1))
-        ax4.bar(year_markers, yearly_contributions, color='#00d4ff', alpha=0.7, edgecolor=self.accent_blue, linewidth=1.5)
-        ax4.set_xlabel('Year', fontsize=10, color=self.text_color, fontweight='bold')
-        ax4.set_ylabel('Annual Contribution ($)', fontsize=10, color=self.text_color, fontweight='bold')
-        ax4.set_title('How Your Contributions Grow', fontsize=11, fontweight='bold', color=self.accent_gold, pad=10)
-        ax4.grid(True, alpha=0.2, color=self.text_dim, axis='y')
-        ax4.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
-        ax4.tick_params(colors=self.text_dim, labelsize=8)
-        for spine in ax4.spines.values():
-            spine.set_color(self.accent_blue)
-        
-        # ROI over time (bottom right)
-        ax5 = fig.add_subplot(gs[2, 1])
-        ax5.set_facecolor(self.bg_light)
-        roi_values = []
-        for i in range(len(portfolio_values)):
-            contributed = contributions_total[i] + float(self.initial_var.get())
-            if contributed > 0:
-                roi = ((portfolio_values[i] - contributed) / contributed) * 100
-                roi_values.append(roi)
-            else:
-                roi_values.append(0)
-        ax5.plot(time_array, roi_values, color='#ffd700', linewidth=2.5)
-        ax5.axhline(y=0, color='#ff6b6b', linestyle='-', linewidth=1, alpha=0.5)
-        ax5.fill_between(time_array, 0, roi_values, where=[r >= 0 for r in roi_values], 
-                        alpha=0.3, color='#00ff88', interpolate=True)
-        ax5.set_xlabel('Years', fontsize=10, color=self.text_color, fontweight='bold')
-        ax5.set_ylabel('ROI (%)', fontsize=10, color=self.text_color, fontweight='bold')
-        ax5.set_title('Return on Investment Over Time', fontsize=11, fontweight='bold', color=self.accent_gold, pad=10)
-        ax5.grid(True, alpha=0.2, color=self.text_dim)
-        ax5.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:.0f}%'))
-        ax5.tick_params(colors=self.text_dim, labelsize=8)
-        for spine in ax5.spines.values():
-            spine.set_color(self.accent_blue)
-        
-        canvas = FigureCanvasTkAgg(fig, self.graph_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    def run_backtest(self, inputs, previous):
+        """Backtest over every window of the return history, as (key, result or error message)
 
-print("About to check if __name__ == '__main__'...")
-print(f"__name__ is: {__name__}")
+        ``previous`` is the last run's pair; it is returned as is when the key matches.
+        """
+        from backtest import backtest, default_history
+        key = tuple(inputs[name] for name in ('monthly', 'annual_increase', 'years', 'initial', 'allocations'))
+        if previous is not None and previous[0] == key:
+            return previous
+        with self.metrics.timer('backtest'):
+            try:
+                return key, backtest(default_history(), inputs['monthly'], inputs['annual_increase'],
+                                     inputs['years'], inputs['initial'], dict(inputs['allocations']))
+            except (OSError, ValueError) as exc:
+                return key, str(exc)
+    
+    def run_decumulation(self, inputs, return_rates, volatilities, factor, previous_runs):
+        """Retirement check on random paths, and on the return history when the backtest is on
 
-if __name__ == "__main__":
-    print("YES! We're in main!")
+        Success rates do not depend on the final balance, so each kind of
+        path is only re-run when the mix (or, for history, the years) changes;
+        otherwise its entry in ``previous_runs`` is reused. Returns
+        {kind: (key, result or error message)} for the Tk thread to keep.
+        """
+        import decumulation
+        from backtest import default_history
+        strategies = [s for s, _ in inputs['allocations']]
+        
+        def stochastic():
+            return decumulation.stochastic([return_rates[s] for s in strategies],
+                                           [volatilities[s] for s in strategies],
+                                           [a for _, a in inputs['allocations']], seed=0,
+                                           correlation_factor=factor)
+        
+        def historical():
+            return decumulation.historical(default_history(), dict(inputs['allocations']), inputs['years'])
+        
+        runs = {'stochastic': ((inputs['allocations'], inputs['rates_version'], inputs['correlations_version']),
+                               stochastic)}
+        if inputs['history']:
+            runs['historical'] = ((inputs['allocations'], inputs['years']), historical)
+        results = {}
+        for kind, (key, run) in runs.items():
+            previous = previous_runs.get(kind)
+            if previous is None or previous[0] != key:
+                with self.metrics.timer('decumulation'):
+                    try:
+                        previous = (key, run())
+                    except (OSError, ValueError) as exc:
+                        previous = (key, str(exc))
+            results[kind] = previous
+        return results
+    
+    def apply_projection(self, result, done):
+        """Tk-thread half of a calculation: redraw the stages the new inputs invalidated"""
+        from incremental import CHART_STAGES, dirty_stages
+        inputs, return_rates, projection, milestones, backtest, retirement, requested_at = result
+        # Diff against what is on screen, not the last computed inputs: stale
+        # worker results are dropped without ever being displayed
+        dirty = dirty_stages(self.displayed_inputs, inputs)
+        self.displayed_inputs = inputs
+        
+        monthly = inputs['monthly']
+        annual_increase = inputs['annual_increase']
+        years = inputs['years']
+        initial = inputs['initial']
+        withdrawal_rate = inputs['withdrawal_rate']
+        selected_strategies = [s for s, _ in inputs['allocations']]
+        allocations = [a for _, a in inputs['allocations']]
+        weighted_return = sum(return_rates[s] * a for s, a in inputs['allocations'])
+        portfolio_values = projection.portfolio_values
+        contributions_total = projection.contributions_total
+        
+        if 'report' in dirty:
+            with self.metrics.timer('report'):
+                self.write_report(monthly, annual_increase, years, initial, withdrawal_rate,
+                                  selected_strategies, allocations, weighted_return,
+                                  portfolio_values, contributions_total, milestones, return_rates,
+                                  getattr(projection, 'strategy_values', None))
+        
+        chart_panels = [stage for stage in CHART_STAGES if stage in dirty]
+        if chart_panels:
+            self.create_graph(portfolio_values, contributions_total, years, withdrawal_rate, milestones,
+                              monthly, annual_increase, initial, chart_panels,
+                              getattr(projection, 'strategies', ()), getattr(projection, 'strategy_values', None))
+        
+        if backtest is not None:
+            self.backtest_run = backtest
+        if 'backtest' in dirty:
+            self.chart.clear_bands('history')
+            if backtest is not None:
+                self.show_backtest(backtest[1], years, withdrawal_rate)
+        
+        if retirement is not None:
+            self.decumulation_runs.update(retirement)
+            if 'decumulation' in dirty:
+                self.report_view.append([retirement_section([result for _, result in retirement.values()],
+                                                            portfolio_values[-1], withdrawal_rate)])
+        
+        if inputs['mc_paths'] == 0:
+            if 'monte_carlo' in dirty:
+                self.stop_monte_carlo()
+        elif self.finished_monte_carlo(inputs) is not None:
+            if 'monte_carlo_view' in dirty:
+                self.apply_monte_carlo(self.finished_monte_carlo(inputs), True)
+        else:
+            # New Monte Carlo inputs, or this calculation superseded an unfinished run
+            self.stop_monte_carlo()
+            self.start_monte_carlo(inputs)
+        
+        self.update_goal(inputs)
+        
+        self.metrics.record('latency', time.perf_counter() - requested_at)
+        self.metrics.count('applied')
+        if self.metrics.enabled:
+            # Queued behind the chart's idle redraw, so its timing is included
+            self.root.after_idle(self.refresh_metrics)
+    
+    def start_polling(self):
+        if self.poll_job is None:
+            self.poll_job = self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+    
+    def poll_worker(self):
+        """Apply finished background work on the Tk thread"""
+        self.poll_job = None
+        for worker in (self.worker, self.optimizer_worker):
+            results = worker.poll()
+            for i, (handler, value, error, done) in enumerate(results):
+                if error is not None:
+                    messagebox.showerror("Calculation Error", str(error))
+                elif done or i == len(results) - 1:
+                    # Intermediate progress is only worth drawing if nothing newer arrived
+                    handler(value, done)
+        if self.worker.busy or self.optimizer_worker.busy:
+            self.poll_job = self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+    
+    def write_report(self, monthly, annual_increase, years, initial, withdrawal_rate,
+                     selected_strategies, allocations, weighted_return,
+                     portfolio_values, contributions_total, milestones, return_rates, strategy_values=None):
+        """Write the projection report into the results panel"""
+        self.report_view.show(projection_sections(monthly, annual_increase, years, initial, withdrawal_rate,
+                                                  selected_strategies, allocations, weighted_return,
+                                                  portfolio_values, contributions_total, milestones,
+                                                  return_rates, self.risk_levels, strategy_values))
+    
+    def show_backtest(self, backtest, years, withdrawal_rate):
+        """Draw the backtest range on the portfolio chart and append its outcomes to the report"""
+        if not isinstance(backtest, str):
+            self.chart.set_bands(*backtest.band(), live=self.live_var.get(), kind='history')
+        self.report_view.append([backtest_section(backtest, years, withdrawal_rate)])
+    
+    def stop_monte_carlo(self):
+        """Remove Monte Carlo bands left over from a previous run"""
+        if self.chart is not None:
+            self.chart.clear_bands()
+    
+    def monte_carlo_key(self, inputs):
+        from incremental import stage_inputs
+        return tuple(inputs[name] for name in stage_inputs('monte_carlo'))
+    
+    def finished_monte_carlo(self, inputs):
+        """Final snapshot of the last Monte Carlo run if it finished for these inputs, else None"""
+        if self.monte_carlo_run is None or self.monte_carlo_run[0] != self.monte_carlo_key(inputs):
+            return None
+        return self.monte_carlo_run[1]
+    
+    def start_monte_carlo(self, inputs):
+        """Run Monte Carlo on the worker, streaming bands into the portfolio chart"""
+        from correlated_shocks import CholeskyCache
+        from monte_carlo import MonteCarloSimulation
+        strategies = [s for s, _ in inputs['allocations']]
+        if self.cholesky_cache is None:
+            self.cholesky_cache = CholeskyCache()
+        factor = self.cholesky_cache.factor(strategies, self.correlations, inputs['correlations_version'])
+        simulation = MonteCarloSimulation(inputs['monthly'], inputs['annual_increase'],
+                                          inputs['years'], inputs['initial'],
+                                          [self.return_rates[s] for s in strategies],
+                                          [self.volatilities[s] for s in strategies],
+                                          [a for _, a in inputs['allocations']],
+                                          n_paths=inputs['mc_paths'], seed=MONTE_CARLO_SEED,
+                                          correlation_factor=factor)
+        self.monte_carlo_run = (self.monte_carlo_key(inputs), None)
+        self.worker.submit(self.run_monte_carlo, simulation, handler=self.apply_monte_carlo)
+        self.start_polling()
+    
+    def run_monte_carlo(self, job, simulation):
+        """Worker-thread half of a Monte Carlo run: publish bands after every block"""
+        start = time.perf_counter()
+        snapshot = None
+        for bands in simulation.iter_bands():
+            if job.cancelled():
+                return None
+            snapshot = (bands.percentiles(), bands.paths)
+            job.publish(snapshot)
+        self.metrics.record('monte_carlo', time.perf_counter() - start)
+        return snapshot
+    
+    def apply_monte_carlo(self, snapshot, done):
+        """Draw the latest Monte Carlo bands; append the outlook once every path is in"""
+        if snapshot is None:
+            return
+        (low, median, high), paths = snapshot
+        self.chart.set_bands(low, median, high, live=self.live_var.get())
+        
+        if done:
+            self.monte_carlo_run = (self.monte_carlo_run[0], snapshot)
+            self.report_monte_carlo(low[-1], median[-1], high[-1], paths, self.displayed_inputs['withdrawal_rate'])
+            self.refresh_metrics()
+    
+    def report_monte_carlo(self, low, median, high, paths, withdrawal_rate):
+        """Append the Monte Carlo outlook to the results once every path is in"""
+        self.report_view.append([monte_carlo_section(low, median, high, paths, withdrawal_rate)])
+    
+    def create_graph(self, portfolio_values, contributions_total, years, withdrawal_rate, milestones,
+                     monthly, annual_increase, initial, panels=None,
+                     strategies=(), strategy_values=None):
+        """Update the requested chart panels in place; the other panels keep their content
+        
+        ``strategy_values`` (per-strategy accounts) are stacked on the
+        portfolio panel. The chart (and Matplotlib) is only loaded by the
+        first calculation.
+        """
+        import numpy as np
+        from chart_panel import PANELS, WealthChart
+        if panels is None or self.chart is None:
+            panels = PANELS
+        if self.chart is None:
+            with self.metrics.timer('chart_create'):
+                self.chart = WealthChart({
+                    'bg_light': self.bg_light,
+                    'bg_medium': self.bg_medium,
+                    'accent_blue': self.accent_blue,
+                    'accent_gold': self.accent_gold,
+                    'text_color': self.text_color,
+                    'text_dim': self.text_dim
+                }, self.metrics)
+                self.chart.attach(self.graph_frame).pack(fill=tk.BOTH, expand=True)
+        
+        with self.metrics.timer('chart_update'):
+            self.chart.update({
+                'time_array': np.arange(len(portfolio_values)) / 12,
+                'portfolio_values': portfolio_values,
+                'contributions_total': contributions_total,
+                'years': years,
+                'withdrawal_rate': withdrawal_rate,
+                'milestones': milestones,
+                'monthly': monthly,
+                'annual_increase': annual_increase,
+                'initial': initial,
+                'strategies': strategies,
+                'strategy_values': strategy_values
+            }, panels, live=self.live_var.get())
+
+def main(argv=None):
+    """Launch the GUI, or the headless batch runner with --batch"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['--batch']:
+        from batch_runner import main as run_batch
+        return run_batch(argv[1:])
+    
     try:
-        print("Creating main window...")
         root = tk.Tk()
-        print("Main window created!")
-        
-        print("Initializing calculator...")
         app = InvestmentCalculator(root)
-        print("Calculator initialized!")
-        
-        print("Starting main loop...")
         root.mainloop()
     except Exception as e:
         import traceback
         print("\n=== ERROR OCCURRED ===")
         print(traceback.format_exc())
         print("======================\n")
-        input("Press Enter to exit...")
\ No newline at end of file
+        if sys.stdin is not None and sys.stdin.isatty():
+            input("Press Enter to exit...")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""First-crossing search for portfolio milestone targets."""
+import numpy as np
+
+# Targets listed in the report; the chart marks the ones from $10K up
+MILESTONE_TARGETS = (1000, 5000, 10000, 25000, 50000, 100000, 250000, 500000, 1000000)
+CHART_MILESTONE_TARGETS = (10000, 25000, 50000, 100000, 250000, 500000, 1000000)
+
+# Month index reported for targets a series never reaches
+NOT_REACHED = -1
+
+
+def first_crossings(values, targets):
+    """Index of the first month whose value is >= each target
+
+    ``values`` is a single series of shape (months + 1,) or a stack of
+    series shaped (paths, months + 1); the result has shape (targets,) or
+    (paths, targets). A non-decreasing single series (any deterministic
+    projection with non-negative returns) is searched with searchsorted in
+    O(T log M). Anything else, such as Monte Carlo paths or NaN-padded batch
+    rows, falls back to a vectorized first-true scan per target.
+    """
+    values = np.asarray(values, dtype=float)
+    targets = np.asarray(targets, dtype=float)
+
+    if values.ndim == 1 and np.all(values[1:] >= values[:-1]):
+        index = np.searchsorted(values, targets, side='left')
+        index[index == len(values)] = NOT_REACHED
+        return index
+
+    index = np.empty(values.shape[:-1] + targets.shape, dtype=np.intp)
+    for i, target in enumerate(targets):
+        reached = values >= target
+        first = reached.argmax(axis=-1)
+        index[..., i] = np.where(reached.any(axis=-1), first, NOT_REACHED)
+    return index
+
+
+class MilestoneIndex:
+    """First-crossing months for a list of targets, shared by report and chart"""
+
+    def __init__(self, values, targets=MILESTONE_TARGETS):
+        self.targets = tuple(targets)
+        self.months = first_crossings(values, self.targets)
+
+    def reached(self, targets=None):
+        """(target, month) pairs for reached targets, in target order
+
+        ``targets`` optionally restricts the result to a subset.
+        """
+        return [(target, int(month)) for target, month in zip(self.targets, self.months)
+                if month != NOT_REACHED and (targets is None or target in targets)]
+
+    def month_of(self, target):
+        """First month at or above ``target``, or None if it is never reached"""
+        month = self.months[self.targets.index(target)]
+        return None if month == NOT_REACHED else int(month)
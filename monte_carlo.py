@@ -0,0 +1,201 @@
+"""Monte Carlo projections with random per-strategy monthly returns.
+
+Paths are generated in fixed-size blocks. Each block is seeded from
+``SeedSequence(seed, spawn_key=(block,))``, so the result depends only on
+the seed and never on how the blocks are scheduled. Percentile bands are
+accumulated in a per-month histogram, which keeps memory bounded no matter
+how many paths are simulated.
+"""
+import numpy as np
+
+from projection_engine import contribution_schedule
+
+BAND_PERCENTILES = (5, 50, 95)
+
+# Upper bound on the random draws held in memory for one block
+BLOCK_BYTES = 32 * 2 ** 20
+
+# Values are binned on a log scale; anything below a cent shares the first bin
+VALUE_FLOOR = 0.01
+
+
+class PercentileBands:
+    """Streaming per-month percentile estimates over simulated paths
+
+    Every month keeps a histogram of log(value) between fixed bounds, so
+    adding paths costs O(paths * months) and memory stays O(months * bins).
+    Values outside the bounds are clamped into the edge bins, and the exact
+    per-month minimum and maximum are tracked to keep estimates in range.
+    """
+
+    def __init__(self, log_lower, log_upper, bins=1024):
+        self.log_lower = np.asarray(log_lower, dtype=float)
+        self.log_upper = np.asarray(log_upper, dtype=float)
+        self.scale = bins / (self.log_upper - self.log_lower)
+        self.bins = bins
+        self.counts = np.zeros((len(self.log_lower), bins), dtype=np.int64)
+        self.value_sums = np.zeros(len(self.log_lower))
+        self.minimum = np.full(len(self.log_lower), np.inf)
+        self.maximum = np.full(len(self.log_lower), -np.inf)
+        self.paths = 0
+
+    @classmethod
+    def from_pilot(cls, values, bins=1024, margin=1.0):
+        """Size the histogram bounds from a first block of paths
+
+        ``margin`` widens the observed log range on both sides (1.0 = a
+        factor of e), leaving room for the tails of later blocks.
+        """
+        logs = np.log(np.maximum(values, VALUE_FLOOR))
+        return cls(logs.min(axis=0) - margin, logs.max(axis=0) + margin, bins)
+
+    @property
+    def months(self):
+        return len(self.log_lower) - 1
+
+    def add(self, values):
+        """Accumulate a (paths, months + 1) block of portfolio values"""
+        index = np.log(np.maximum(values, VALUE_FLOOR))
+        index -= self.log_lower
+        index *= self.scale
+        np.clip(index, 0, self.bins - 1, out=index)
+        index = index.astype(np.int64)
+        index += np.arange(values.shape[1]) * self.bins
+        self.counts += np.bincount(index.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+        self.value_sums += values.sum(axis=0)
+        np.minimum(self.minimum, values.min(axis=0), out=self.minimum)
+        np.maximum(self.maximum, values.max(axis=0), out=self.maximum)
+        self.paths += len(values)
+
+    def percentiles(self, percentiles=BAND_PERCENTILES):
+        """Array of shape (len(percentiles), months + 1)"""
+        cumulative = np.cumsum(self.counts, axis=1)
+        rows = np.arange(len(cumulative))
+        bands = np.empty((len(percentiles), len(cumulative)))
+        for i, percentile in enumerate(percentiles):
+            target = percentile / 100 * self.paths
+            bin_index = np.minimum((cumulative < target).sum(axis=1), self.bins - 1)
+            inside = self.counts[rows, bin_index]
+            below = cumulative[rows, bin_index] - inside
+            fraction = np.clip((target - below) / np.maximum(inside, 1), 0, 1)
+            bands[i] = np.exp(self.log_lower + (bin_index + fraction) / self.scale[rows])
+        return np.clip(bands, self.minimum, self.maximum)
+
+    def mean(self):
+        return self.value_sums / self.paths
+
+
+class MonteCarloSimulation:
+    """Stochastic projection where every strategy draws its own monthly returns
+
+    ``returns`` and ``volatilities`` are annual percentages per strategy and
+    ``allocations`` their weights (normalized like the GUI sliders), all in
+    the same order. Monthly strategy returns are normal with mean
+    ``return / 12`` and standard deviation ``volatility / sqrt(12)``; the
+    portfolio is rebalanced to the target weights every month.
+
+    Strategies are independent unless ``correlation_factor``, the Cholesky
+    factor ``L`` of their correlation matrix (see
+    ``correlated_shocks.CholeskyCache``), is given. Correlating the draws as
+    ``z @ L.T`` and then blending them by weight is folded into a single
+    loading vector, so a correlated block costs the same one matmul.
+    """
+
+    def __init__(self, monthly, annual_increase, years, initial, returns,
+                 volatilities, allocations, n_paths=10000, seed=None,
+                 block_paths=None, bins=1024, correlation_factor=None):
+        allocations = np.asarray(allocations, dtype=float)
+        if allocations.sum() <= 0:
+            raise ValueError("allocations must sum to a positive value")
+        self.weights = allocations / allocations.sum()
+        self.monthly_means = np.asarray(returns, dtype=float) / 100 / 12
+        self.monthly_vols = np.asarray(volatilities, dtype=float) / 100 / np.sqrt(12)
+        self.loadings = self.weights * self.monthly_vols
+        if correlation_factor is not None:
+            self.loadings = np.asarray(correlation_factor, dtype=float).T @ self.loadings
+
+        self.months = int(years) * 12
+        self.initial = float(initial)
+        self.contributions = contribution_schedule(float(monthly), float(annual_increase), self.months)
+
+        self.n_paths = int(n_paths)
+        self.seed = np.random.SeedSequence(seed).entropy
+        if block_paths is None:
+            path_bytes = max(self.months, 1) * len(self.weights) * 8
+            block_paths = int(np.clip(BLOCK_BYTES // path_bytes, 64, 16384))
+        self.block_paths = int(block_paths)
+        self.bins = bins
+
+    @property
+    def block_count(self):
+        return -(-self.n_paths // self.block_paths)
+
+    def block_size(self, index):
+        return min(self.block_paths, self.n_paths - index * self.block_paths)
+
+    def simulate_block(self, index):
+        """Portfolio values of shape (paths, months + 1) for one seeded block"""
+        size = self.block_size(index)
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(index,)))
+        shocks = rng.standard_normal((size, self.months, len(self.weights)))
+
+        # Blend the per-strategy draws in one matmul: sum_s w_s * (mu_s + sigma_s * (z @ L.T)_s)
+        monthly_returns = shocks @ self.loadings
+        monthly_returns += self.weights @ self.monthly_means
+        np.maximum(monthly_returns, -0.99, out=monthly_returns)
+        monthly_returns += 1
+
+        growth = np.empty((size, self.months + 1))
+        growth[:, 0] = 1.0
+        np.cumprod(monthly_returns, axis=1, out=growth[:, 1:])
+
+        values = np.divide(self.contributions, growth)
+        np.cumsum(values, axis=1, out=values)
+        values += self.initial
+        values *= growth
+        return values
+
+    def paths(self, dtype=np.float64, out=None):
+        """Every path as one (n_paths, months + 1) array, instead of percentile bands
+
+        ``run`` and ``iter_bands`` reduce each block to histograms as it is
+        generated; this keeps all n_paths * (months + 1) values. Blocks are
+        simulated in float64 and rounded once when stored, so
+        ``dtype=np.float32`` halves the memory at float32 precision.
+        ``out`` may be any preallocated array of that shape.
+        """
+        if out is None:
+            out = np.empty((self.n_paths, self.months + 1), dtype)
+        for index in range(self.block_count):
+            start = index * self.block_paths
+            out[start:start + self.block_size(index)] = self.simulate_block(index)
+        return out
+
+    def iter_bands(self):
+        """Yield the running PercentileBands after every simulated block
+
+        The same object is updated in place, so consumers can redraw from
+        it as paths stream in.
+        """
+        bands = None
+        for index in range(self.block_count):
+            values = self.simulate_block(index)
+            if bands is None:
+                bands = PercentileBands.from_pilot(values, self.bins)
+            bands.add(values)
+            yield bands
+
+    def run(self, workers=1):
+        """Simulate every path and return the final PercentileBands
+
+        With ``workers > 1`` the blocks are sharded across a process pool
+        (see ``parallel.run_monte_carlo``); the result is identical.
+        """
+        if workers != 1:
+            from parallel import run_monte_carlo
+            return run_monte_carlo(self, workers)
+        bands = None
+        for bands in self.iter_bands():
+            pass
+        return bands
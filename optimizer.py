@@ -0,0 +1,337 @@
+"""Allocation optimizer: search the weights of the selected strategies.
+
+Candidate weight vectors are drawn uniformly from the simplex (a flat
+Dirichlet), pushed under the per-strategy caps of
+``strategy_catalog.ALLOCATION_CAPS``, and scored in batches. Two further
+rounds draw candidates around the best one found so far. The result keeps
+every candidate, the optimum for the chosen objective and the efficient
+frontier: the mixes no other candidate beats on both median outcome and
+volatility.
+
+Scoring uses the Monte Carlo model: normal monthly strategy returns,
+correlated through a Cholesky factor and rebalanced monthly. A mix then
+earns a normal monthly return with mean ``m = w @ mu`` and deviation ``s``,
+the norm of its Monte Carlo loadings. To screen thousands of candidates per
+second, each one is projected once at its median growth rate
+``g = exp(log(1 + m) - s**2 / (2 * (1 + m)**2)) - 1``, with every candidate
+in one ``project_batch`` call. To first order the log of the final value is
+normal around the log of that projection, with deviation
+
+    s / (1 + m) * sqrt(sum(P[k]**2 for k < T)) / (P[T] * (1 + g))
+
+where ``P[k]`` is the value after ``k`` months divided by the growth up to
+then. That estimate runs a little low for volatile mixes (the median of a
+sum of contributions beats the sum of their medians), so a shortlist (the
+leading candidates, the frontier points shown and the current mix) is
+confirmed by Monte Carlo with common random numbers: every mix replays the
+same draws, so their differences are not sampling noise. The optimum and
+every reported outcome come from that simulation.
+``benchmarks/bench_optimizer.py`` measures both stages.
+
+Usage:
+    python optimizer.py [--objective median|shortfall] [--target 600000] [--monthly 500]
+                        [--annual-increase 5] [--years 30] [--initial 0] [--strategies "Roth IRA; Treasury Bonds"]
+"""
+import argparse
+import math
+import sys
+
+import numpy as np
+
+from monte_carlo import BLOCK_BYTES
+from projection_engine import CHUNK_BYTES, contribution_schedule, project_batch
+from strategy_catalog import ALLOCATION_CAPS, RETURN_RATES, VOLATILITIES
+
+OBJECTIVES = ('median', 'shortfall')
+CANDIDATES = 4000
+# Later rounds draw around the best mix so far, each more tightly than the last
+REFINE_CONCENTRATIONS = (50, 400)
+# Leading candidates re-scored by Monte Carlo, and the paths each one replays
+SHORTLIST = 16
+CONFIRM_PATHS = 2000
+# z-score of the pessimistic outcome, as in Monte Carlo's P5 band
+P5_Z = -1.6448536269514722
+
+
+class Optimization:
+    """Every scored candidate, the optimum and the efficient frontier
+
+    ``weights`` is ``(candidates, strategies)``; ``medians``, ``lows`` (P5)
+    and ``shortfalls`` are the batch estimates, and ``shortfalls`` is None
+    unless a target was given. ``frontier`` lists candidate indices by
+    rising volatility. ``caps`` are the caps that applied to these
+    strategies. ``confirm`` replaces the estimates of some candidates
+    with simulated outcomes and picks the optimum among those.
+    """
+
+    def __init__(self, strategies, weights, medians, lows, volatilities, shortfalls, objective, target,
+                 current=None, caps=None):
+        self.strategies = list(strategies)
+        self.weights = weights
+        self.medians = medians
+        self.lows = lows
+        self.volatilities = volatilities
+        self.shortfalls = shortfalls
+        self.objective = objective
+        self.target = target
+        self.current = current
+        self.caps = {s: caps[s] for s in self.strategies if s in caps} if caps else {}
+        self.simulated = {}
+        self.best = int(ranking(medians, shortfalls, objective)[0])
+        self.frontier = pareto_frontier(medians, volatilities)
+
+    def __len__(self):
+        return len(self.weights)
+
+    @property
+    def optimum(self):
+        """The best mix as {strategy: weight}"""
+        return dict(zip(self.strategies, self.weights[self.best].tolist()))
+
+    def shortlist(self, count=SHORTLIST):
+        """The leading candidates by estimate, the frontier points and the current mix"""
+        indices = [*ranking(self.medians, self.shortfalls, self.objective)[:count].tolist(),
+                   *self.frontier_points()]
+        if self.current is not None:
+            indices.append(self.current)
+        return list(dict.fromkeys(int(i) for i in indices))
+
+    def confirm(self, indices, finals):
+        """Use simulated final values, shaped (len(indices), paths), for those candidates"""
+        medians = np.median(finals, axis=1)
+        lows = np.percentile(finals, 5, axis=1)
+        shortfalls = None if self.target is None else (finals < self.target).mean(axis=1)
+        for row, index in enumerate(indices):
+            self.simulated[index] = (float(medians[row]), float(lows[row]),
+                                     None if shortfalls is None else float(shortfalls[row]))
+        self.best = int(indices[ranking(medians, shortfalls, self.objective)[0]])
+
+    def outcome(self, index=None):
+        """(median, P5, shortfall or None) of a candidate, the optimum by default, simulated if it was"""
+        index = self.best if index is None else index
+        if index in self.simulated:
+            return self.simulated[index]
+        return (float(self.medians[index]), float(self.lows[index]),
+                None if self.shortfalls is None else float(self.shortfalls[index]))
+
+    def slider_percentages(self, index=None):
+        """Whole percentages of a candidate (the optimum by default) that add up to 100"""
+        weights = self.weights[self.best if index is None else index] * 100
+        percentages = np.floor(weights + 1e-9).astype(int)
+        # Largest remainders get the leftover points
+        for column in np.argsort(percentages - weights, kind='stable')[:100 - percentages.sum()]:
+            percentages[column] += 1
+        return dict(zip(self.strategies, percentages.tolist()))
+
+    def frontier_points(self, count=10):
+        """Up to ``count`` frontier indices spread evenly over its volatility range"""
+        if len(self.frontier) <= count:
+            return [int(i) for i in self.frontier]
+        wanted = np.linspace(self.volatilities[self.frontier[0]], self.volatilities[self.frontier[-1]], count)
+        positions = np.searchsorted(self.volatilities[self.frontier], wanted).clip(0, len(self.frontier) - 1)
+        return [int(self.frontier[p]) for p in dict.fromkeys(positions.tolist())]
+
+
+def ranking(medians, shortfalls, objective):
+    """Candidate indices best first: highest median, or lowest shortfall (ties to 1e-6 by median)"""
+    if objective == 'shortfall':
+        return np.lexsort((-medians, np.round(shortfalls, 6)))
+    return np.argsort(-medians, kind='stable')
+
+
+def pareto_frontier(medians, volatilities):
+    """Indices no other candidate beats on both a higher median and a lower volatility"""
+    order = np.lexsort((-medians, volatilities))
+    best_so_far = np.maximum.accumulate(medians[order])
+    keep = np.empty(len(order), dtype=bool)
+    keep[0] = True
+    keep[1:] = medians[order[1:]] > best_so_far[:-1]
+    return order[keep]
+
+
+def capped(weights, caps):
+    """Rows of ``weights`` rescaled to sum to 1 with no column above its cap
+
+    Weight over a cap is handed to the uncapped columns in proportion to
+    what they hold. Raises ValueError if the caps add up to less than 1.
+    """
+    caps = np.asarray(caps, dtype=float)
+    if caps.sum() < 1 - 1e-9:
+        raise ValueError("the selected strategies are capped below 100% in total")
+    weights = weights / weights.sum(axis=1, keepdims=True)
+    for _ in range(len(caps)):
+        over = weights > caps
+        if not over.any():
+            break
+        excess = np.where(over, weights - caps, 0).sum(axis=1, keepdims=True)
+        weights = np.minimum(weights, caps)
+        room = np.where(weights < caps, weights, 0)
+        room_total = room.sum(axis=1, keepdims=True)
+        # Rows whose free columns are all empty share the excess evenly instead
+        even = np.where(weights < caps, 1.0, 0.0)
+        room = np.where(room_total > 0, room, even)
+        weights += excess * room / room.sum(axis=1, keepdims=True)
+    return weights
+
+
+def _normal_cdf(z):
+    return 0.5 * np.vectorize(math.erfc, otypes=[float])(-z / math.sqrt(2))
+
+
+def score(weights, returns, volatilities, monthly, annual_increase, years, initial, target=None,
+          correlation_factor=None):
+    """(medians, P5s, annual volatilities %, shortfall probabilities or None) per row of ``weights``
+
+    ``returns`` and ``volatilities`` are annual percentages per column.
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    means = weights @ (np.asarray(returns, dtype=float) / 100 / 12)
+    loadings = weights * (np.asarray(volatilities, dtype=float) / 100 / np.sqrt(12))
+    if correlation_factor is not None:
+        loadings = loadings @ np.asarray(correlation_factor, dtype=float)
+    deviations = np.linalg.norm(loadings, axis=1)
+    median_rates = np.expm1(np.log1p(means) - deviations ** 2 / (2 * (1 + means) ** 2))
+
+    months = int(years) * 12
+    medians = np.empty(len(weights))
+    spreads = np.empty(len(weights))
+    step = max(1, CHUNK_BYTES // (16 * (months + 1)))
+    for start in range(0, len(weights), step):
+        rows = slice(start, start + step)
+        batch = project_batch(monthly, annual_increase, years, initial, median_rates[rows] * 1200)
+        growth = (1 + median_rates[rows, None]) ** np.arange(months + 1)
+        discounted = batch.portfolio_values / growth
+        medians[rows] = batch.portfolio_values[:, -1]
+        spreads[rows] = (np.sqrt(np.einsum('ij,ij->i', discounted[:, :-1], discounted[:, :-1]))
+                         / (discounted[:, -1] * (1 + median_rates[rows])))
+    if not np.all(medians > 0):
+        raise ValueError("nothing is invested: enter a contribution or an initial amount")
+    spreads *= deviations / (1 + means)
+    lows = medians * np.exp(P5_Z * spreads)
+    shortfalls = None
+    if target is not None:
+        shortfalls = _normal_cdf(np.log(target / medians) / np.maximum(spreads, 1e-300))
+    return medians, lows, deviations * np.sqrt(12) * 100, shortfalls
+
+
+def simulate(weights, returns, volatilities, monthly, annual_increase, years, initial, correlation_factor=None,
+             n_paths=CONFIRM_PATHS, seed=0):
+    """Monte Carlo final values, shaped (rows of ``weights``, n_paths), from one shared set of draws
+
+    Every mix replays the same seeded blocks of strategy shocks (common
+    random numbers); a block's shocks are blended for all mixes in one matmul.
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    means = weights @ (np.asarray(returns, dtype=float) / 100 / 12)
+    vols = np.asarray(volatilities, dtype=float) / 100 / np.sqrt(12)
+    months = int(years) * 12
+    contributions = contribution_schedule(float(monthly), float(annual_increase), months)[1:]
+    seed = np.random.SeedSequence(seed).entropy
+    block = max(1, BLOCK_BYTES // (8 * max(months, 1) * max(len(vols), len(weights))))
+    finals = np.empty((len(weights), n_paths))
+    for index, start in enumerate(range(0, n_paths, block)):
+        size = min(block, n_paths - start)
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+        shocks = rng.standard_normal((size * months, len(vols)))
+        if correlation_factor is not None:
+            shocks = shocks @ np.asarray(correlation_factor, dtype=float).T
+        shocks *= vols
+        growth = shocks @ weights.T
+        growth += means
+        np.maximum(growth, -0.99, out=growth)
+        growth += 1
+        growth = growth.reshape(size, months, len(weights))
+        np.cumprod(growth, axis=1, out=growth)
+        finals[:, start:start + size] = (growth[:, -1] * (initial + np.einsum('t,ptc->pc', contributions,
+                                                                               1 / growth))).T
+    return finals
+
+
+def optimize(strategies, monthly, annual_increase, years, initial, objective='median', target=None,
+             return_rates=RETURN_RATES, volatilities=VOLATILITIES, caps=ALLOCATION_CAPS, correlation_factor=None,
+             candidates=CANDIDATES, seed=None, current=None, confirm_paths=CONFIRM_PATHS):
+    """Search the weights of ``strategies`` for the best median or the lowest shortfall
+
+    ``objective='shortfall'`` needs a ``target`` final value. ``current``,
+    a {strategy: weight} mix, is scored and simulated alongside the
+    candidates so it can be compared with the optimum. ``correlation_factor``
+    is the Cholesky factor for ``strategies`` in order, as for Monte Carlo.
+    ``confirm_paths=0`` skips the Monte Carlo confirmation.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"unknown objective {objective!r} (use one of {', '.join(OBJECTIVES)})")
+    if objective == 'shortfall' and (target is None or target <= 0):
+        raise ValueError("minimizing the shortfall needs a positive target")
+    if not strategies:
+        raise ValueError("select at least one strategy")
+    if int(years) < 1:
+        raise ValueError("the optimizer needs a horizon of at least one year")
+    limits = [caps.get(s, 1.0) for s in strategies]
+    returns = [return_rates[s] for s in strategies]
+    vols = [volatilities[s] for s in strategies]
+    rng = np.random.default_rng(seed)
+    size = len(strategies)
+
+    # Round one: the whole simplex, every single-strategy corner and the current mix
+    pools = [rng.dirichlet(np.ones(size), candidates), np.eye(size)]
+    current_index = None
+    if current and sum(max(current.get(s, 0.0), 0.0) for s in strategies) > 0:
+        current_index = candidates + size
+        pools.append(np.array([[max(current.get(s, 0.0), 0.0) for s in strategies]]))
+    weights = capped(np.vstack(pools), limits)
+    scores = score(weights, returns, vols, monthly, annual_increase, years, initial, target, correlation_factor)
+
+    for concentration in REFINE_CONCENTRATIONS:
+        center = weights[ranking(scores[0], scores[3], objective)[0]]
+        local = capped(rng.dirichlet(0.05 + concentration * center, candidates // 2), limits)
+        local_scores = score(local, returns, vols, monthly, annual_increase, years, initial, target,
+                             correlation_factor)
+        weights = np.vstack([weights, local])
+        scores = [None if a is None else np.concatenate([a, b]) for a, b in zip(scores, local_scores)]
+    result = Optimization(strategies, weights, *scores, objective, target, current_index, caps)
+
+    if confirm_paths:
+        indices = result.shortlist()
+        result.confirm(indices, simulate(weights[indices], returns, vols, monthly, annual_increase, years, initial,
+                                         correlation_factor, confirm_paths, seed=0 if seed is None else seed))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--objective', choices=OBJECTIVES, default='median')
+    parser.add_argument('--target', type=float, help="final value the shortfall is measured against")
+    parser.add_argument('--monthly', type=float, default=500.0)
+    parser.add_argument('--annual-increase', type=float, default=5.0, help="yearly contribution increase (%%)")
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--initial', type=float, default=0.0)
+    parser.add_argument('--strategies', default='; '.join(RETURN_RATES),
+                        help='"Strategy; Strategy; ..." (default: the whole catalog)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    strategies = [name.strip() for name in args.strategies.split(';') if name.strip()]
+    unknown = [s for s in strategies if s not in RETURN_RATES]
+    if unknown:
+        parser.exit(2, f"error: unknown strategies: {', '.join(unknown)}\n")
+    from correlated_shocks import CholeskyCache
+    try:
+        result = optimize(strategies, args.monthly, args.annual_increase / 100, args.years, args.initial,
+                          args.objective, args.target, correlation_factor=CholeskyCache().factor(strategies),
+                          seed=args.seed)
+    except ValueError as exc:
+        parser.exit(2, f"error: {exc}\n")
+
+    print(f"{len(result):,} mixes scored, optimum for the {args.objective}:")
+    for strategy, percent in result.slider_percentages().items():
+        if percent:
+            print(f"  {percent:>3}%  {strategy}")
+    median, low, shortfall = result.outcome()
+    print(f"median ${median:,.2f}, P5 ${low:,.2f}, volatility {result.volatilities[result.best]:.1f}%/year")
+    if shortfall is not None:
+        print(f"chance of ending below ${args.target:,.2f}: {shortfall:.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
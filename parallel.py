@@ -0,0 +1,226 @@
+"""Process-pool execution for Monte Carlo runs and scenario sweeps.
+
+Workers never pickle result arrays back to the parent: every shard writes
+into a ``multiprocessing.shared_memory`` buffer that the parent allocated.
+Monte Carlo blocks keep their own ``SeedSequence`` spawn keys and the parent
+reduces per-block results in block order, so a run is bit-for-bit identical
+for any worker count.
+
+Starting a pool costs far more than projecting a small chunk, so callers
+that run many batches pass in their own ``executor``, and ``BatchPool``
+keeps one pool and one shared output buffer alive across calls.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from monte_carlo import PercentileBands
+from projection_engine import BatchProjection, project_batch
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+@contextmanager
+def shared_array(shape, dtype):
+    """Allocate a shared-memory ndarray; yields (name, array) and unlinks on exit"""
+    size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        yield shm.name, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@contextmanager
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        yield np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    finally:
+        shm.close()
+
+
+def _split(count, shards):
+    """Contiguous (start, stop) ranges covering range(count)"""
+    edges = np.linspace(0, count, shards + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def _monte_carlo_shard(simulation, log_lower, log_upper, layout, slot, blocks):
+    months = simulation.months + 1
+    shards, bins, block_count = layout['shards'], simulation.bins, simulation.block_count
+    with _attach(layout['counts'], (shards, months, bins), np.int64) as counts, \
+            _attach(layout['sums'], (block_count, months), np.float64) as sums, \
+            _attach(layout['extremes'], (shards, 2, months), np.float64) as extremes:
+        bands = PercentileBands(log_lower, log_upper, bins)
+        for index in range(*blocks):
+            values = simulation.simulate_block(index)
+            bands.add(values)
+            sums[index] = values.sum(axis=0)
+        counts[slot] = bands.counts
+        extremes[slot, 0] = bands.minimum
+        extremes[slot, 1] = bands.maximum
+
+
+def run_monte_carlo(simulation, workers=None, executor=None):
+    """Run a MonteCarloSimulation with its blocks sharded across a process pool
+
+    Returns the same PercentileBands as ``simulation.run()``. ``executor``
+    reuses a pool the caller owns instead of starting one for this run.
+    """
+    workers = workers or default_workers()
+    pilot = simulation.simulate_block(0)
+    bands = PercentileBands.from_pilot(pilot, simulation.bins)
+    bands.add(pilot)
+    if simulation.block_count == 1:
+        return bands
+
+    shards = _split(simulation.block_count - 1, workers)
+    shards = [(start + 1, stop + 1) for start, stop in shards]
+    months = simulation.months + 1
+    with shared_array((len(shards), months, simulation.bins), np.int64) as (counts_name, counts), \
+            shared_array((simulation.block_count, months), np.float64) as (sums_name, sums), \
+            shared_array((len(shards), 2, months), np.float64) as (extremes_name, extremes):
+        layout = {'shards': len(shards), 'counts': counts_name,
+                  'sums': sums_name, 'extremes': extremes_name}
+        with _pool(executor, min(workers, len(shards))) as pool:
+            futures = [pool.submit(_monte_carlo_shard, simulation, bands.log_lower,
+                                   bands.log_upper, layout, slot, blocks)
+                       for slot, blocks in enumerate(shards)]
+            for future in futures:
+                future.result()
+
+        bands.counts += counts.sum(axis=0)
+        # Sum in block order so the floating-point result matches a serial run
+        for index in range(1, simulation.block_count):
+            bands.value_sums += sums[index]
+        np.minimum(bands.minimum, extremes[:, 0].min(axis=0), out=bands.minimum)
+        np.maximum(bands.maximum, extremes[:, 1].max(axis=0), out=bands.maximum)
+    bands.paths = simulation.n_paths
+    return bands
+
+
+def _batch_shard(name, shape, dtype, rows, monthly, annual_increase, years, initial, weighted_return, horizon):
+    start, stop = rows
+    batch = project_batch(monthly, annual_increase, years, initial, weighted_return, dtype)
+    width = batch.portfolio_values.shape[1]
+    with _attach(name, shape, dtype) as out:
+        out[0, start:stop, :width] = batch.portfolio_values
+        out[0, start:stop, width:horizon + 1] = np.nan
+        out[1, start:stop, :width] = batch.contributions_total
+        out[1, start:stop, width:horizon + 1] = np.nan
+
+
+@contextmanager
+def _pool(executor, workers):
+    """The caller's executor, or a pool started (and shut down) for one call"""
+    if executor is not None:
+        yield executor
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield pool
+
+
+def project_batch_parallel(monthly, annual_increase, years, initial, weighted_return,
+                           workers=None, chunk_size=10000, dtype=np.float64, executor=None, out=None):
+    """project_batch with row chunks spread across a process pool
+
+    Accepts the same arguments as ``project_batch`` and returns an
+    equivalent BatchProjection. ``executor`` reuses a pool the caller owns.
+    ``out`` is a ``(name, array)`` pair from ``shared_array``, at least
+    ``(2, scenarios, horizon + 1)``: the workers write into it and the
+    result's matrices are views of it, valid while it stays allocated.
+    Without it a temporary block is used and copied out once.
+    """
+    workers = workers or default_workers()
+    monthly, annual_increase, years, initial, weighted_return = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(arg, dtype=float))
+          for arg in (monthly, annual_increase, years, initial, weighted_return)))
+    months = years.astype(np.int64) * 12
+    horizon = int(months.max()) if len(months) else 0
+    monthly_rates = weighted_return / 100 / 12
+
+    if out is None:
+        with shared_array((2, len(months), horizon + 1), dtype) as buffer:
+            batch = project_batch_parallel(monthly, annual_increase, years, initial, weighted_return, workers,
+                                           chunk_size, dtype, executor, buffer)
+            return BatchProjection(np.array(batch.portfolio_values), np.array(batch.contributions_total),
+                                   months, monthly_rates)
+
+    name, buffer = out
+    if buffer.dtype != np.dtype(dtype) or buffer.shape[0] != 2 or buffer.shape[1] < len(months) \
+            or buffer.shape[2] < horizon + 1:
+        raise ValueError(f"output buffer {buffer.shape} {buffer.dtype} cannot hold "
+                         f"(2, {len(months)}, {horizon + 1}) {np.dtype(dtype)}")
+    chunks = _split(len(months), max(workers, -(-len(months) // chunk_size)))
+    with _pool(executor, workers) as pool:
+        futures = [pool.submit(_batch_shard, name, buffer.shape, dtype, (start, stop),
+                               *(arg[start:stop] for arg in (monthly, annual_increase, years,
+                                                             initial, weighted_return)), horizon)
+                   for start, stop in chunks]
+        for future in futures:
+            future.result()
+    return BatchProjection(buffer[0, :len(months), :horizon + 1], buffer[1, :len(months), :horizon + 1],
+                           months, monthly_rates)
+
+
+class BatchPool:
+    """One process pool and one shared output buffer for many ``project_batch_parallel`` calls
+
+    The buffer grows to the largest batch seen. Each result is a view of
+    it, so it is only valid until the next ``project`` call (or ``close``).
+    """
+
+    def __init__(self, workers=None, dtype=np.float64):
+        self.workers = workers or default_workers()
+        self.dtype = np.dtype(dtype)
+        self._executor = None
+        self._shm = None
+        self._buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _output(self, rows, width):
+        if self._buffer is None or rows > self._buffer.shape[1] or width > self._buffer.shape[2]:
+            shape = (2, max(rows, 0 if self._buffer is None else self._buffer.shape[1]),
+                     max(width, 0 if self._buffer is None else self._buffer.shape[2]))
+            self._release()
+            self._shm = shared_memory.SharedMemory(create=True,
+                                                   size=max(int(np.prod(shape)) * self.dtype.itemsize, 1))
+            self._buffer = np.ndarray(shape, dtype=self.dtype, buffer=self._shm.buf)
+        return self._shm.name, self._buffer
+
+    def project(self, monthly, annual_increase, years, initial, weighted_return, chunk_size=None):
+        """project_batch_parallel on the shared pool; ``chunk_size`` defaults to one chunk per worker"""
+        years = np.atleast_1d(np.asarray(years, dtype=float))
+        rows = max(len(np.atleast_1d(arg)) for arg in (monthly, annual_increase, years, initial, weighted_return))
+        width = int(years.max()) * 12 + 1 if len(years) else 1
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return project_batch_parallel(monthly, annual_increase, years, initial, weighted_return, self.workers,
+                                      chunk_size or max(1, -(-rows // self.workers)), self.dtype,
+                                      self._executor, self._output(rows, width))
+
+    def _release(self):
+        if self._shm is not None:
+            self._buffer = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def close(self):
+        """Shut the pool down and free the buffer"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._release()
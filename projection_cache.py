@@ -0,0 +1,104 @@
+"""Memoized projections keyed on normalized inputs."""
+import threading
+from collections import OrderedDict
+
+from projection_engine import project, project_strategies, weighted_return
+
+
+class ProjectionCache:
+    """Bounded LRU cache in front of ``projection_engine.project``
+
+    Keys are built from the parsed numeric inputs, the normalized allocation
+    mix and the version of the return-rate table. Entries are evicted least
+    recently used once ``max_entries`` or ``max_bytes`` is exceeded. Cached
+    arrays are marked read-only because they are shared between callers,
+    and the cache may be used from a background worker thread.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 2 ** 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(monthly, annual_increase, years, initial, allocations, rates_version, precision='float',
+                 rebalance=None):
+        """Normalized cache key; allocations are scaled to sum to 1 and sorted by strategy"""
+        total = sum(allocations.values())
+        mix = tuple(sorted((strategy, round(weight / total, 12))
+                           for strategy, weight in allocations.items() if weight > 0))
+        return (float(monthly), float(annual_increase), int(years), float(initial), mix, precision, rebalance,
+                rates_version)
+
+    def projection(self, monthly, annual_increase, years, initial, allocations,
+                   return_rates, rates_version, compute=None, precision='float', rebalance=None):
+        """Cached ProjectionResult for a {strategy: weight} allocation mix
+
+        On a miss the result comes from ``compute()`` when given (e.g. an
+        incremental extension of a cached run), otherwise from ``project``,
+        or from ``project_strategies`` when a ``rebalance`` mode is given.
+        """
+        key = self.make_key(monthly, annual_increase, years, initial, allocations, rates_version, precision,
+                            rebalance)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        if compute is not None:
+            result = compute()
+        elif rebalance is not None:
+            result = project_strategies(monthly, annual_increase, years, initial, return_rates, allocations,
+                                        rebalance)
+        else:
+            result = project(monthly, annual_increase, years, initial,
+                             weighted_return(return_rates, allocations), precision)
+        result.portfolio_values.setflags(write=False)
+        result.contributions_total.setflags(write=False)
+        if hasattr(result, 'strategy_values'):
+            result.strategy_values.setflags(write=False)
+        self._store(key, result)
+        return result
+
+    def _store(self, key, result):
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._size(self._entries.pop(key))
+            self._entries[key] = result
+            self.bytes += self._size(result)
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= self._size(evicted)
+                self.evictions += 1
+
+    @staticmethod
+    def _size(result):
+        return (result.portfolio_values.nbytes + result.contributions_total.nbytes
+                + getattr(result, 'strategy_values', result.portfolio_values[:0]).nbytes)
+
+    def invalidate(self, rates_version=None):
+        """Drop every entry, or only those built from one return-rate table version"""
+        with self._lock:
+            if rates_version is None:
+                self._entries.clear()
+                self.bytes = 0
+                return
+            for key in [k for k in self._entries if k[-1] == rates_version]:
+                self.bytes -= self._size(self._entries.pop(key))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'entries': len(self._entries), 'bytes': self.bytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
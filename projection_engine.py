@@ -0,0 +1,477 @@
+"""Headless projection engine shared by the GUI and server-side jobs.
+
+Nothing in here imports tkinter, so it can be used from scripts, services and
+worker processes. All inputs follow the conventions of the GUI form:
+``annual_increase`` is a fraction (0.05 for 5%), ``weighted_return`` is an
+annual percentage (8.0 for 8%).
+
+Two precisions are available. ``float`` is the vectorized closed form.
+``cents`` keeps the balance in integer cents and rounds each month's
+interest half-to-even, the way a statement is produced, so results are
+reproducible to the cent.
+
+``project_strategies`` drops the blended return and keeps one balance per
+strategy, so weights drift between rebalances.
+"""
+import math
+from decimal import ROUND_HALF_EVEN, Decimal
+
+import numpy as np
+
+PRECISIONS = ('float', 'cents')
+
+# Rates are taken as decimals with this many places (of a percent or fraction)
+RATE_PLACES = 10
+
+# Per-strategy rebalancing (project_strategies): months between rebalances
+# for the periodic modes, and the default drift that triggers 'threshold'
+REBALANCE_MODES = ('none', 'monthly', 'quarterly', 'annual', 'threshold')
+REBALANCE_PERIODS = {'monthly': 1, 'quarterly': 3, 'annual': 12}
+REBALANCE_THRESHOLD = 0.05
+
+# Float64 working memory per pass when a batch is stored in a narrower dtype
+CHUNK_BYTES = 32 * 2 ** 20
+
+
+class ProjectionResult:
+    """Month-by-month portfolio values and cumulative contributions"""
+
+    precision = 'float'
+
+    def __init__(self, portfolio_values, contributions_total, monthly_rate):
+        self.portfolio_values = portfolio_values
+        self.contributions_total = contributions_total
+        self.monthly_rate = monthly_rate
+
+    @property
+    def months(self):
+        return len(self.portfolio_values) - 1
+
+    @property
+    def final_value(self):
+        return float(self.portfolio_values[-1])
+
+
+class CentsProjection(ProjectionResult):
+    """ProjectionResult from ``project_cents``, with the exact integer-cent series"""
+
+    precision = 'cents'
+
+    def __init__(self, portfolio_cents, contributions_cents, monthly_rate):
+        super().__init__(portfolio_cents / 100, contributions_cents / 100, monthly_rate)
+        self.portfolio_cents = portfolio_cents
+        self.contributions_cents = contributions_cents
+
+
+def weighted_return(return_rates, allocations):
+    """Allocation-weighted annual return (%) for a {strategy: weight} mapping"""
+    total = sum(allocations.values())
+    if total <= 0:
+        raise ValueError("allocations must sum to a positive value")
+    return sum(return_rates[s] * w / total for s, w in allocations.items())
+
+
+def contribution_schedule(monthly, annual_increase, horizon):
+    """Deposit made in each month 0..horizon (month 0 pays nothing)
+
+    The contribution is bumped on every 12th month, before that month's
+    deposit, so it is constant within each block of months ``m // 12``.
+    Scalars give a 1-D schedule; ``(N, 1)`` columns give ``(N, horizon + 1)``.
+    """
+    yearly = np.multiply(monthly, (1 + annual_increase) ** np.arange(horizon // 12 + 1))
+    schedule = np.repeat(yearly, 12, axis=-1)[..., :horizon + 1]
+    schedule[..., 0] = 0.0
+    return schedule
+
+
+def _compound(monthly, annual_increase, initial, monthly_rate, horizon):
+    """Closed-form compounding for column vectors of scenario parameters
+
+    Solves ``V[m] = V[m-1] * (1 + r) + c[m]`` as
+    ``V[m] = (1 + r)^m * (initial + sum(c[k] / (1 + r)^k for k <= m))``
+    and returns ``(portfolio_values, contributions_total)``, both shaped
+    ``(N, horizon + 1)``.
+    """
+    growth = (1 + monthly_rate) ** np.arange(horizon + 1)
+    contributions = contribution_schedule(monthly, annual_increase, horizon)
+
+    portfolio_values = np.divide(contributions, growth)
+    np.cumsum(portfolio_values, axis=1, out=portfolio_values)
+    portfolio_values += initial
+    portfolio_values *= growth
+
+    np.cumsum(contributions, axis=1, out=contributions)
+    return portfolio_values, contributions
+
+
+def project(monthly, annual_increase, years, initial, weighted_return, precision='float'):
+    """Project a single portfolio month by month without a Python loop
+
+    ``precision='cents'`` delegates to ``project_cents``.
+    """
+    if precision == 'cents':
+        return project_cents(monthly, annual_increase, years, initial, weighted_return)
+    if precision != 'float':
+        raise ValueError(f"unknown precision {precision!r} (use one of {', '.join(PRECISIONS)})")
+    months = int(years) * 12
+    monthly_rate = weighted_return / 100 / 12
+    portfolio_values, contributions_total = _compound(
+        np.full((1, 1), float(monthly)), np.full((1, 1), float(annual_increase)),
+        np.full((1, 1), float(initial)), np.full((1, 1), monthly_rate), months)
+    return ProjectionResult(portfolio_values[0], contributions_total[0], monthly_rate)
+
+
+def _decimal(value):
+    """Exact decimal for a number as typed: 6.83 means 6.83, not its binary float"""
+    return Decimal(repr(value) if isinstance(value, float) else str(value))
+
+
+def _ratio(value):
+    """(numerator, denominator) of a rate rounded to ``RATE_PLACES`` decimals"""
+    return _decimal(value).quantize(Decimal(1).scaleb(-RATE_PLACES), ROUND_HALF_EVEN).as_integer_ratio()
+
+
+def _round_half_even(numerator, denominator):
+    """numerator / denominator rounded to an integer, ties to even (denominator > 0)"""
+    quotient, remainder = divmod(2 * numerator + denominator, 2 * denominator)
+    if not remainder and quotient & 1:
+        quotient -= 1
+    return quotient
+
+
+def _tie_residue(numerator, offset, denominator):
+    """(modulus, residue) such that ``balance * numerator + offset`` is a multiple of
+    ``denominator`` exactly when ``balance % modulus == residue``; None if it never is"""
+    common = math.gcd(numerator, denominator)
+    if offset % common:
+        return None
+    modulus = denominator // common
+    return modulus, -offset // common * pow(numerator // common, -1, modulus) % modulus
+
+
+def project_cents(monthly, annual_increase, years, initial, weighted_return):
+    """Statement-exact projection in integer cents
+
+    Each month the interest ``balance * rate / 1200`` is rounded to the cent
+    with banker's rounding, then that month's deposit is added. Deposits are
+    ``monthly * (1 + annual_increase) ** year``, rounded to the cent once a
+    year. Rates are read as decimals (see ``RATE_PLACES``) and everything
+    else is exact rational arithmetic on Python ints.
+
+    Rounded half up, interest plus deposit folds into one floor division of
+    the balance. Half-even only differs on an exact tie, which needs the
+    opening balance to hit one residue modulo a constant. When that constant
+    is larger than the horizon, ties are rare: the months are compounded
+    half up and checked for ties in one vectorized pass, and only the months
+    after the first tie to fix are redone with the residue test in the loop.
+    """
+    months = int(years) * 12
+    rate_numerator, rate_denominator = _ratio(weighted_return)
+    growth_numerator, growth_denominator = _ratio(annual_increase)
+    growth_numerator += growth_denominator
+    deposit_numerator, deposit_denominator = _decimal(monthly).as_integer_ratio()
+    deposit_numerator *= 200
+    deposits = []
+    for _ in range(months // 12 + 1):
+        deposit, remainder = divmod(deposit_numerator + deposit_denominator, 2 * deposit_denominator)
+        deposits.append(deposit - 1 if not remainder and deposit & 1 else deposit)
+        deposit_numerator *= growth_numerator
+        deposit_denominator *= growth_denominator
+
+    # Half-up interest is (2 * balance * n + d) // (2 * d) for a rate of n / d, so
+    # balance + interest + deposit is (balance * (2d + 2n) + d + 2d * deposit) // 2d
+    numerator = 2 * rate_numerator
+    offset = 1200 * rate_denominator
+    denominator = 2 * offset
+    factor = denominator + numerator
+    carries = []
+    for deposit in deposits:
+        carries += [offset + deposit * denominator] * 12
+    tie = _tie_residue(numerator, offset, denominator)
+
+    balance = _round_half_even(*_decimal(initial).scaleb(2).as_integer_ratio())
+    values = [balance]
+    append = values.append
+    portfolio_cents = None
+    if tie is None or tie[0] > months:
+        for carry in carries[1:months + 1]:
+            balance = (balance * factor + carry) // denominator
+            append(balance)
+        portfolio_cents = np.array(values, dtype=np.int64)
+        if tie is not None:
+            ties = np.flatnonzero(portfolio_cents[:months] % tie[0] == tie[1]).tolist()
+            odd = [month for month in ties if (values[month] * numerator + offset) // denominator & 1]
+            if odd:
+                # Redo everything after the first tie that half-even rounds down
+                del values[odd[0] + 1:]
+                balance = values[-1]
+                portfolio_cents = None
+    if portfolio_cents is None:
+        modulus, residue = tie
+        for carry in carries[len(values):months + 1]:
+            if balance % modulus == residue and (balance * numerator + offset) // denominator & 1:
+                balance = (balance * factor + carry) // denominator - 1
+            else:
+                balance = (balance * factor + carry) // denominator
+            append(balance)
+        portfolio_cents = np.array(values, dtype=np.int64)
+
+    schedule = np.repeat(np.array(deposits, dtype=np.int64), 12)[:months + 1]
+    schedule[0] = 0
+    return CentsProjection(portfolio_cents, np.cumsum(schedule), rate_numerator / rate_denominator / 1200)
+
+
+def extend_projection(previous, monthly, annual_increase, years):
+    """Re-project to a new horizon, reusing the months already in ``previous``
+
+    A shorter horizon slices ``previous``; a longer one only simulates the
+    extra months, starting from the last known value. ``monthly`` and
+    ``annual_increase`` must be the inputs ``previous`` was projected with.
+    """
+    months = int(years) * 12
+    if months <= previous.months:
+        return ProjectionResult(previous.portfolio_values[:months + 1],
+                                previous.contributions_total[:months + 1],
+                                previous.monthly_rate)
+
+    start = previous.months
+    contributions = contribution_schedule(float(monthly), float(annual_increase), months)[start + 1:]
+    growth = (1 + previous.monthly_rate) ** np.arange(1, months - start + 1)
+
+    values = np.cumsum(contributions / growth)
+    values += previous.portfolio_values[-1]
+    values *= growth
+    np.cumsum(contributions, out=contributions)
+    contributions += previous.contributions_total[-1]
+
+    return ProjectionResult(np.concatenate([previous.portfolio_values, values]),
+                            np.concatenate([previous.contributions_total, contributions]),
+                            previous.monthly_rate)
+
+
+class StrategyProjection(ProjectionResult):
+    """ProjectionResult from ``project_strategies``, with one column per strategy
+
+    ``strategy_values`` is ``(months + 1, strategies)``; ``portfolio_values``
+    is its row sum. ``rebalance_months`` lists the months after which the
+    holdings were reset to the target weights.
+    """
+
+    def __init__(self, strategy_values, contributions_total, monthly_rate, strategies, rebalance,
+                 rebalance_months):
+        super().__init__(strategy_values.sum(axis=1), contributions_total, monthly_rate)
+        self.strategy_values = strategy_values
+        self.strategies = tuple(strategies)
+        self.rebalance = rebalance
+        self.rebalance_months = rebalance_months
+
+
+def _periodic(start, deposits, weights, growth, period):
+    """Strategy values for the months after ``start``, rebalanced every ``period`` months
+
+    Every block of ``period`` months starts from the target weights, so a
+    block is the closed form of ``_compound`` per strategy and the block
+    totals follow ``T[j + 1] = a * T[j] + b[j]``, another first-order
+    recurrence with the same closed form. Returns ``(len(deposits), S)``.
+    """
+    months = len(deposits)
+    blocks = -(-months // period)
+    padded = np.zeros(blocks * period)
+    padded[:months] = deposits
+    powers = growth ** np.arange(1, period + 1)[:, None]              # (period, S)
+    # Value at the end of each month of a block from deposits alone, before the start balance
+    inside = np.cumsum(padded.reshape(blocks, period)[:, :, None] / powers, axis=1)
+    inside *= weights * powers                                          # (blocks, period, S)
+    scale = weights @ powers[-1]
+    ends = inside[:, -1].sum(axis=1)
+    discount = scale ** -np.arange(1, blocks + 1)
+    totals = np.empty(blocks)
+    totals[0] = start
+    totals[1:] = scale ** np.arange(1, blocks) * (start + np.cumsum(ends[:-1] * discount[:-1]))
+    inside += totals[:, None, None] * weights * powers
+    return inside.reshape(blocks * period, -1)[:months]
+
+
+def _drift(start, deposits, weights, growth):
+    """Strategy values for the months after ``start`` (one balance per strategy), never rebalanced"""
+    powers = growth ** np.arange(1, len(deposits) + 1)[:, None]
+    values = np.cumsum(deposits[:, None] / powers, axis=0)
+    values *= weights
+    values += start
+    values *= powers
+    return values
+
+
+def _breach(values, weights, threshold):
+    """Index of the first row whose weights drift more than ``threshold`` from target, or None"""
+    totals = values.sum(axis=1, keepdims=True)
+    drift = np.abs(np.divide(values, totals, out=np.broadcast_to(weights, values.shape).copy(),
+                             where=totals > 0) - weights).max(axis=1)
+    breached = drift > threshold
+    return int(breached.argmax()) if breached.any() else None
+
+
+def project_strategies(monthly, annual_increase, years, initial, return_rates, allocations,
+                       rebalance='annual', threshold=REBALANCE_THRESHOLD):
+    """Project each strategy of a {strategy: weight} mix as its own sub-portfolio
+
+    Deposits and the initial balance are split by the weights (normalized
+    to sum to 1); each strategy compounds at its own annual rate (%) from
+    ``return_rates``. ``rebalance`` is one of REBALANCE_MODES: never, after every
+    monthly/quarterly/annual period, or once any weight drifts more than
+    ``threshold`` (a fraction) from its target. Monthly rebalancing gives the
+    same values as ``project`` with the weighted return.
+
+    Periodic modes are evaluated for all months and strategies at once.
+    Threshold rebalancing projects ahead in windows that double until the
+    drift is breached, so it loops a few times per rebalance, never per month.
+    """
+    if rebalance not in REBALANCE_MODES:
+        raise ValueError(f"unknown rebalance mode {rebalance!r} (use one of {', '.join(REBALANCE_MODES)})")
+    strategies = list(allocations)
+    weights = np.array([allocations[s] for s in strategies], dtype=float)
+    if weights.sum() <= 0:
+        raise ValueError("allocations must sum to a positive value")
+    weights /= weights.sum()
+    monthly_rates = np.array([return_rates[s] for s in strategies], dtype=float) / 100 / 12
+    growth = 1 + monthly_rates
+    months = int(years) * 12
+    contributions = contribution_schedule(float(monthly), float(annual_increase), months)
+
+    values = np.empty((months + 1, len(weights)))
+    values[0] = float(initial) * weights
+    rebalance_months = []
+    if rebalance == 'threshold':
+        month, start, window = 0, values[0], 12
+        while month < months:
+            stretch = _drift(start, contributions[month + 1:month + 1 + window], weights, growth)
+            breach = _breach(stretch, weights, threshold)
+            stop = len(stretch) if breach is None else breach + 1
+            values[month + 1:month + 1 + stop] = stretch[:stop]
+            month += stop
+            start = values[month]
+            if breach is None:
+                window *= 2
+            elif month < months:
+                rebalance_months.append(month)
+                start = start.sum() * weights
+                window = max(12, 2 * stop)
+    elif months:
+        period = REBALANCE_PERIODS.get(rebalance, months)
+        values[1:] = _periodic(values[0].sum(), contributions[1:], weights, growth, period)
+        rebalance_months = list(range(period, months, period)) if rebalance != 'none' else []
+
+    return StrategyProjection(values, np.cumsum(contributions), float(weights @ monthly_rates),
+                              strategies, rebalance, rebalance_months)
+
+
+class BatchProjection:
+    """Projections for N scenarios as ``(N, horizon + 1)`` matrices
+
+    Rows with a shorter ``years`` than the longest scenario are padded with
+    NaN past their own horizon; ``mask`` marks the valid entries. Only values
+    and contributions are stored; gains, ROI and income are derived on
+    demand, for a slice of rows if given, in the storage dtype.
+    """
+
+    def __init__(self, portfolio_values, contributions_total, months, monthly_rates):
+        self.portfolio_values = portfolio_values
+        self.contributions_total = contributions_total
+        self.months = months
+        self.monthly_rates = monthly_rates
+
+    def __len__(self):
+        return len(self.months)
+
+    @property
+    def mask(self):
+        return np.arange(self.portfolio_values.shape[1]) <= self.months[:, None]
+
+    @property
+    def final_values(self):
+        return self.portfolio_values[np.arange(len(self)), self.months]
+
+    @property
+    def final_contributions(self):
+        return self.contributions_total[np.arange(len(self)), self.months]
+
+    @property
+    def nbytes(self):
+        return self.portfolio_values.nbytes + self.contributions_total.nbytes
+
+    def gains(self, rows=slice(None)):
+        """Portfolio value minus cumulative contributions"""
+        return self.portfolio_values[rows] - self.contributions_total[rows]
+
+    def roi(self, initial, rows=slice(None)):
+        """Return on everything paid in (%), with ``initial`` per scenario or shared"""
+        initial = np.asarray(initial, dtype=self.contributions_total.dtype)[..., None]
+        contributed = self.contributions_total[rows] + initial
+        return np.divide((self.portfolio_values[rows] - contributed) * 100, contributed,
+                         out=np.zeros_like(contributed), where=contributed > 0)
+
+    def income(self, withdrawal_rate, rows=slice(None)):
+        """Monthly income at a withdrawal rate (fraction), per scenario or shared"""
+        rate = np.asarray(withdrawal_rate, dtype=self.portfolio_values.dtype)[..., None]
+        return self.portfolio_values[rows] * rate / 12
+
+    def row(self, index):
+        """Unpadded ProjectionResult for one scenario"""
+        end = self.months[index] + 1
+        return ProjectionResult(self.portfolio_values[index, :end],
+                                self.contributions_total[index, :end],
+                                float(self.monthly_rates[index]))
+
+
+def allocation_returns(allocations, return_rates):
+    """Weighted annual return (%) for each row of an (N, strategies) allocation matrix
+
+    Rows are normalized like the GUI sliders, so they need not sum to 1.
+    """
+    allocations = np.atleast_2d(np.asarray(allocations, dtype=float))
+    totals = allocations.sum(axis=1)
+    if np.any(totals <= 0):
+        raise ValueError("every allocation row must sum to a positive value")
+    return allocations @ np.asarray(return_rates, dtype=float) / totals
+
+
+def project_batch(monthly, annual_increase, years, initial, weighted_return, dtype=np.float64):
+    """Project N scenarios in one broadcasted pass
+
+    Every argument may be a scalar or a length-N array; scalars are shared
+    by all scenarios. Use ``allocation_returns`` to turn a grid of
+    allocation mixes into ``weighted_return`` values.
+
+    ``dtype=np.float32`` halves the memory of the result. Rows are still
+    projected in float64, a chunk at a time, and rounded once when stored,
+    so every value is within float32 rounding (6e-8 relative) of float64.
+    """
+    monthly, annual_increase, years, initial, weighted_return = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(arg, dtype=float))
+          for arg in (monthly, annual_increase, years, initial, weighted_return)))
+    if monthly.ndim != 1:
+        raise ValueError("batch inputs must be scalars or 1-D arrays")
+
+    months = years.astype(np.int64) * 12
+    monthly_rates = weighted_return / 100 / 12
+    horizon = int(months.max()) if len(months) else 0
+
+    if np.dtype(dtype) == np.float64:
+        portfolio_values, contributions_total = _compound(
+            monthly[:, None], annual_increase[:, None], initial[:, None],
+            monthly_rates[:, None], horizon)
+    else:
+        portfolio_values = np.empty((len(months), horizon + 1), dtype)
+        contributions_total = np.empty_like(portfolio_values)
+        step = max(1, CHUNK_BYTES // (16 * (horizon + 1)))
+        for start in range(0, len(months), step):
+            rows = slice(start, start + step)
+            portfolio_values[rows], contributions_total[rows] = _compound(
+                monthly[rows, None], annual_increase[rows, None], initial[rows, None],
+                monthly_rates[rows, None], horizon)
+
+    padding = np.arange(horizon + 1) > months[:, None]
+    if padding.any():
+        portfolio_values[padding] = np.nan
+        contributions_total[padding] = np.nan
+    return BatchProjection(portfolio_values, contributions_total, months, monthly_rates)
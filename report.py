@@ -0,0 +1,609 @@
+"""Report rendering: build the results text once, emit it anywhere.
+
+Reports are assembled in pure Python as a stream of (text, tag) segments,
+where the tag is one of the results panel's text tags (header, subheader,
+highlight, success) or None. The same stream can be applied to a Tk Text
+widget in one bulk insert, or rendered to plain text, HTML or Markdown
+without Tk. Projection reports are split into ReportSections whose bodies
+are only built when first shown, so collapsed sections cost nothing.
+"""
+import html
+
+from goal_seek import solve_monthly, solve_years, target_value
+
+# Styling of each tag, mirroring the results panel's tag configuration
+TAG_STYLES = {
+    'header': {'color': '#00ff88', 'bold': True},
+    'subheader': {'color': '#00d4ff', 'bold': True},
+    'highlight': {'color': '#ffd700', 'bold': True},
+    'success': {'color': '#00ff88', 'bold': False},
+}
+
+
+class ReportBuffer:
+    """Ordered (text, tag) segments; adjacent writes with the same tag are merged"""
+
+    def __init__(self):
+        self.segments = []
+
+    def write(self, text, tag=None):
+        if not text:
+            return
+        if self.segments and self.segments[-1][1] == tag:
+            self.segments[-1] = (self.segments[-1][0] + text, tag)
+        else:
+            self.segments.append((text, tag))
+
+    def extend(self, other):
+        for text, tag in other.segments:
+            self.write(text, tag)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    def text(self):
+        return render_plain(self.segments)
+
+
+class ReportSection:
+    """A titled part of a report whose body is built the first time it is needed
+
+    The heading is drawn as ``lead``, a rule of ``rule`` characters (unless
+    ``above`` is False), the title line, a second rule and ``trail``, all in
+    the ``tag`` style. ``expanded`` is the initial state in collapsible views.
+    """
+
+    def __init__(self, title, build, tag='header', lead='', trail='', rule='=', above=True, expanded=True):
+        self.title = title
+        self.tag = tag
+        self.lead = lead
+        self.trail = trail
+        self.rule = rule
+        self.above = above
+        self.expanded = expanded
+        self._build = build
+        self._body = None
+
+    def heading(self, marker=''):
+        """Heading segments, with ``marker`` placed in front of the title"""
+        out = ReportBuffer()
+        out.write(self.lead + (self.rule * 70 + '\n' if self.above else ''), self.tag)
+        out.write(f"{marker}{self.title}\n", self.tag)
+        out.write(self.rule * 70 + '\n' + self.trail, self.tag)
+        return out
+
+    @property
+    def built(self):
+        return self._body is not None
+
+    def body(self):
+        if self._body is None:
+            self._body = self._build()
+        return self._body
+
+
+def join_sections(sections):
+    """Every section, expanded or not, as one ReportBuffer"""
+    out = ReportBuffer()
+    for section in sections:
+        out.extend(section.heading())
+        out.extend(section.body())
+    return out
+
+
+def render_plain(segments):
+    return ''.join(text for text, _ in segments)
+
+
+def render_tk(widget, segments, replace=True):
+    """Apply segments to a Tk Text widget with one insert and one tag_add per tag
+
+    With ``replace`` the widget is cleared first, otherwise the segments
+    are appended.
+    """
+    if replace:
+        widget.delete('1.0', 'end')
+    insert_segments(widget, 'end-1c', segments)
+
+
+def insert_segments(widget, index, segments, tags=()):
+    """Insert segments at ``index`` in one operation; ``tags`` are applied to all of it"""
+    base = widget.index(index)
+    widget.insert(base, render_plain(segments), tags)
+
+    ranges = {}
+    offset = 0
+    for text, tag in segments:
+        if tag is not None:
+            ranges.setdefault(tag, []).extend((f'{base} + {offset} chars',
+                                               f'{base} + {offset + len(text)} chars'))
+        offset += len(text)
+    for tag, indices in ranges.items():
+        widget.tag_add(tag, *indices)
+
+
+def render_html(segments, styles=TAG_STYLES):
+    """Standalone <pre> block with the panel colors as inline styles"""
+    parts = ['<pre style="background:#0f3460;color:#e4e4e4;font-family:Consolas,monospace;padding:10px">']
+    for text, tag in segments:
+        if tag is None:
+            parts.append(html.escape(text))
+            continue
+        style = styles[tag]
+        css = f"color:{style['color']}" + (';font-weight:bold' if style['bold'] else '')
+        parts.append(f'<span class="{tag}" style="{css}">{html.escape(text)}</span>')
+    parts.append('</pre>')
+    return ''.join(parts)
+
+
+def render_markdown(segments):
+    """Markdown rendition: header lines become headings, highlights become bold
+
+    Rule lines made of '=' or '-' are dropped and every other line ends
+    with a hard break, so the report keeps its line structure.
+    """
+    lines = []
+    current = []
+    for text, tag in segments:
+        for i, piece in enumerate(text.split('\n')):
+            if i:
+                lines.append(current)
+                current = []
+            if piece:
+                current.append((piece, tag))
+    lines.append(current)
+
+    out = []
+    for line in lines:
+        raw = ''.join(piece for piece, _ in line)
+        stripped = raw.strip()
+        if stripped and set(stripped) <= set('=-'):
+            continue
+        if not stripped:
+            out.append('')
+            continue
+        tags = {tag for piece, tag in line if piece.strip()}
+        if tags == {'header'}:
+            out.append(f'## {stripped}')
+        elif tags == {'subheader'}:
+            out.append(f'### {stripped}')
+        else:
+            out.append(''.join(_markdown_piece(piece, tag) for piece, tag in line) + '  ')
+    return '\n'.join(out).strip() + '\n'
+
+
+def _markdown_piece(piece, tag):
+    if tag is None or not piece.strip():
+        return piece
+    stripped = piece.strip()
+    lead = piece[:len(piece) - len(piece.lstrip())]
+    trail = piece[len(piece.rstrip()):]
+    return f'{lead}**{stripped}**{trail}'
+
+
+def projection_sections(monthly, annual_increase, years, initial, withdrawal_rate,
+                        selected_strategies, allocations, weighted_return,
+                        portfolio_values, contributions_total, milestones,
+                        return_rates, risk_levels, strategy_values=None):
+    """Projection report as a list of ReportSections, in display order
+
+    ``strategy_values`` (months + 1, strategies) from per-strategy accounts
+    adds each account's final value and drifted weight to the results.
+    """
+    # Imported here so the GUI can load this module before NumPy
+    from milestones import MILESTONE_TARGETS
+
+    final_value = portfolio_values[-1]
+    total_contributed = contributions_total[-1] + initial
+    total_gains = final_value - total_contributed
+    annual_income = final_value * withdrawal_rate
+    monthly_income = annual_income / 12
+
+    def overview():
+        out = ReportBuffer()
+        out.write("IMPORTANT NOTE:\n", 'highlight')
+        out.write("These projections assume all dividends and gains are REINVESTED\n")
+        out.write("automatically. This is the power of compound growth!\n\n")
+
+        out.write("INVESTMENT CONFIGURATION\n", 'subheader')
+        out.write("-" * 70 + "\n", 'subheader')
+        out.write(f"Starting Monthly Investment:    ${monthly:,.2f}\n")
+        out.write(f"Annual Contribution Increase:   {annual_increase*100:.1f}%\n")
+        out.write(f"Initial Investment:             ${initial:,.2f}\n")
+        out.write(f"Investment Period:              {years} years\n")
+        out.write(f"Weighted Average Return:        {weighted_return:.2f}% per year\n\n", 'success')
+
+        out.write("SELECTED STRATEGIES\n", 'subheader')
+        out.write("-" * 70 + "\n", 'subheader')
+        for strategy, allocation in zip(selected_strategies, allocations):
+            out.write(f"  {strategy}\n")
+            out.write(f"    -> Allocation: {allocation*100:.1f}%  |  ", 'highlight')
+            out.write(f"Return: {return_rates[strategy]}%  |  ")
+            out.write(f"Risk: {risk_levels[strategy]}\n")
+        return out
+
+    def final_results():
+        out = ReportBuffer()
+        out.write(f"Total Contributed:              ${total_contributed:,.2f}\n")
+        out.write(f"Final Portfolio Value:          ${final_value:,.2f}\n", 'success')
+        out.write(f"Total Investment Gains:         ${total_gains:,.2f}\n", 'success')
+        out.write(f"Return on Investment:           {(total_gains/total_contributed)*100:.1f}%\n\n", 'highlight')
+
+        if strategy_values is not None:
+            out.write("BY ACCOUNT (final value, weight vs. target)\n", 'subheader')
+            out.write("-" * 70 + "\n", 'subheader')
+            for strategy, allocation, value in zip(selected_strategies, allocations, strategy_values[-1]):
+                weight = value / final_value * 100 if final_value else 0.0
+                out.write(f"  {strategy:<32}${value:>15,.2f}  {weight:5.1f}% vs {allocation*100:.1f}%\n")
+            out.write("\n")
+
+        out.write(f"PASSIVE INCOME (at {withdrawal_rate*100:.0f}% withdrawal rate)\n", 'header')
+        out.write("=" * 70 + "\n", 'header')
+        out.write(f"Annual Passive Income:          ${annual_income:,.2f}\n", 'success')
+        out.write(f"Monthly Passive Income:         ${monthly_income:,.2f}\n\n", 'success')
+        return out
+
+    def action_plan():
+        out = ReportBuffer()
+        # Generate personalized action plan
+        out.write("PHASE 1: Foundation (Months 1-6)\n", 'subheader')
+        out.write(f"Month 1-3:\n")
+        if 'High-Yield Savings' in selected_strategies:
+            out.write(f"  1. Open a High-Yield Savings Account (you selected this!)\n", 'success')
+            out.write(f"     - Deposit ${monthly:,.2f}/month\n")
+            out.write(f"     - Build emergency fund to $500-1000\n")
+        else:
+            out.write(f"  1. Consider opening a High-Yield Savings Account first\n")
+            out.write(f"     - Build a small safety net before investing\n")
+
+        out.write(f"\nMonth 4-6:\n")
+        if initial > 0:
+            out.write(f"  2. You're starting with ${initial:,.2f} - great head start!\n", 'success')
+            out.write(f"     - Invest this lump sum immediately\n")
+        else:
+            out.write(f"  2. Start your investment accounts\n")
+
+        # Account opening recommendations
+        out.write(f"  3. Open these accounts based on your selections:\n")
+        account_providers = {
+            'Roth IRA': 'Fidelity, Vanguard, or Schwab',
+            'Index Funds (S&P500)': 'Vanguard (VFIAX), Fidelity (FXAIX), or Schwab (SWPPX)',
+            'Robo-Advisor': 'Betterment or Wealthfront',
+            'Round-Up Apps': 'Acorns or Robinhood',
+            'Certificates of Deposit': 'Your bank or Ally Bank',
+            'Treasury Bonds': 'TreasuryDirect.gov',
+            'Crypto (High Risk)': 'Coinbase or Kraken (5-10% of portfolio MAX!)',
+            'Real Estate Crowdfund': 'Fundrise or RealtyMogul'
+        }
+
+        for strategy in selected_strategies:
+            if strategy in account_providers:
+                allocation_pct = allocations[selected_strategies.index(strategy)] * 100
+                out.write(f"     - {strategy} ({allocation_pct:.0f}%): ", 'highlight')
+                out.write(f"{account_providers[strategy]}\n")
+
+        out.write(f"\n")
+        out.write("PHASE 2: Automation (Months 6-12)\n", 'subheader')
+        out.write(f"Month 6:\n")
+        out.write(f"  1. Set up automatic investments of ${monthly:,.2f}/month\n", 'success')
+        out.write(f"     - Choose the same day each month (e.g., payday)\n")
+        out.write(f"     - Split across your strategies:\n")
+
+        for strategy, allocation in zip(selected_strategies, allocations):
+            monthly_amount = monthly * allocation
+            out.write(f"       * {strategy}: ${monthly_amount:.2f}/month\n")
+
+        out.write(f"\nMonth 7-12:\n")
+        out.write(f"  2. DO NOT check your accounts daily!\n")
+        out.write(f"     - Markets go up and down - this is normal\n")
+        out.write(f"     - Review quarterly, not daily\n")
+        out.write(f"  3. Focus on increasing your income\n")
+        out.write(f"     - Side hustles, skills, promotions\n")
+
+        out.write(f"\n")
+        out.write("PHASE 3: Growth (Years 1-5)\n", 'subheader')
+
+        if annual_increase > 0:
+            year1_contribution = monthly * (1 + annual_increase)
+            out.write(f"  With your {annual_increase*100:.0f}% annual increase:\n", 'highlight')
+            out.write(f"  - Year 1: ${monthly:,.2f}/month\n")
+            out.write(f"  - Year 2: ${year1_contribution:.2f}/month\n")
+            out.write(f"  - Year 3: ${year1_contribution * (1+annual_increase):.2f}/month\n")
+            out.write(f"  - Year 4: ${year1_contribution * (1+annual_increase)**2:.2f}/month\n")
+            out.write(f"  - Year 5: ${year1_contribution * (1+annual_increase)**3:.2f}/month\n\n")
+        else:
+            out.write(f"  Goal: Increase your monthly contribution over time\n")
+            out.write(f"  - Even adding $10-20 more per year makes a huge difference!\n\n")
+
+        out.write(f"  Action items:\n")
+        out.write(f"  - Invest any bonuses or tax refunds\n", 'success')
+        out.write(f"  - Increase contribution with every raise\n", 'success')
+        out.write(f"  - Build additional income streams\n", 'success')
+
+        out.write(f"\n")
+        out.write("PHASE 4: Milestone Celebrations\n", 'subheader')
+
+        # Key milestones from the shared milestone index
+        milestones_to_show = [(target, month / 12.0) for target, month in milestones.reached()]
+
+        if milestones_to_show:
+            out.write(f"  Here's when you'll hit major milestones:\n\n")
+            for target, years_to in milestones_to_show[:7]:  # Show first 7 milestones
+                if years_to <= years:
+                    passive_at_milestone = (target * withdrawal_rate) / 12
+
+                    # Format years more precisely
+                    if years_to < 1:
+                        months_to = int(years_to * 12)
+                        out.write(f"  ${target:,.0f} ", 'highlight')
+                        out.write(f"in ~{months_to} months")
+                    else:
+                        years_whole = int(years_to)
+                        months_remainder = int((years_to - years_whole) * 12)
+                        out.write(f"  ${target:,.0f} ", 'highlight')
+                        if months_remainder > 0:
+                            out.write(f"in ~{years_whole} years {months_remainder} months")
+                        else:
+                            out.write(f"in ~{years_whole} years")
+
+                    if passive_at_milestone >= 100:
+                        out.write(f" -> ${passive_at_milestone:.0f}/month passive\n", 'success')
+                    else:
+                        out.write("\n")
+        else:
+            out.write(f"  Keep investing! Your milestones will come with time.\n")
+            out.write(f"  First target: ${MILESTONE_TARGETS[0]:,.0f}\n")
+
+        out.write(f"\n")
+        out.write("PHASE 5: Stay The Course (Years 5+)\n", 'subheader')
+        out.write(f"  The hardest part: PATIENCE\n\n")
+        out.write(f"  DO:\n")
+        out.write(f"  - Keep investing every single month\n", 'success')
+        out.write(f"  - Reinvest all dividends automatically\n", 'success')
+        out.write(f"  - Increase contributions when possible\n", 'success')
+        out.write(f"  - Rebalance once or twice a year\n", 'success')
+
+        out.write(f"\n  DON'T:\n")
+        out.write(f"  - Panic sell during market crashes\n")
+        out.write(f"  - Try to time the market\n")
+        out.write(f"  - Stop investing during downturns\n")
+        out.write(f"  - Touch the money before your goal\n\n")
+        return out
+
+    def checklist():
+        out = ReportBuffer()
+        out.write(f"[ ] Day 1: Research and compare account providers\n")
+        out.write(f"[ ] Day 2-3: Open your selected accounts\n")
+        out.write(f"[ ] Day 4: Link your bank account\n")
+        out.write(f"[ ] Day 5: Set up automatic transfers\n")
+        if initial > 0:
+            out.write(f"[ ] Day 6: Make initial ${initial:,.2f} investment\n")
+        else:
+            out.write(f"[ ] Day 6: Make your first ${monthly:,.2f} deposit\n")
+        out.write(f"[ ] Day 7: Enable dividend reinvestment (DRIP)\n")
+        out.write(f"[ ] Ongoing: Track progress monthly, stay consistent!\n\n")
+        return out
+
+    def checkpoints():
+        out = ReportBuffer()
+        # Show detailed milestone breakdown every 5 years, plus intermediate years
+        milestones_years = []
+        if years >= 5:
+            milestones_years.extend([1, 3, 5])
+        if years >= 10:
+            milestones_years.extend([7, 10])
+        if years >= 15:
+            milestones_years.extend([12, 15])
+        if years >= 20:
+            milestones_years.extend([17, 20])
+        if years >= 25:
+            milestones_years.extend([22, 25])
+        if years >= 30:
+            milestones_years.extend([27, 30])
+        if years >= 40:
+            milestones_years.extend([35, 40])
+
+        for milestone in sorted(set(milestones_years)):
+            if milestone <= years:
+                milestone_months = milestone * 12
+                milestone_value = portfolio_values[milestone_months]
+                milestone_contributed = contributions_total[milestone_months] + initial
+                milestone_gains = milestone_value - milestone_contributed
+                milestone_income = milestone_value * withdrawal_rate / 12
+                milestone_annual_income = milestone_value * withdrawal_rate
+                roi = (milestone_gains / milestone_contributed * 100) if milestone_contributed > 0 else 0
+
+                out.write(f"\n=== Year {milestone} ===\n", 'highlight')
+                out.write(f"  Portfolio Value:        ${milestone_value:,.2f}\n")
+                out.write(f"  Total Contributed:      ${milestone_contributed:,.2f}\n")
+                out.write(f"  Investment Gains:       ${milestone_gains:,.2f}\n", 'success')
+                out.write(f"  ROI:                    {roi:.1f}%\n")
+                out.write(f"  Monthly Passive Income: ${milestone_income:,.2f}\n", 'success')
+                out.write(f"  Annual Passive Income:  ${milestone_annual_income:,.2f}\n")
+
+                # Show contribution rate at this point
+                if milestone > 0:
+                    monthly_at_milestone = monthly * ((1 + annual_increase) ** milestone)
+                    out.write(f"  Your Monthly Investment: ${monthly_at_milestone:,.2f}\n")
+        return out
+
+    def outlook():
+        out = ReportBuffer()
+        if monthly_income < 2000:
+            out.write(f"Current monthly passive income: ${monthly_income:,.2f}\n\n")
+            out.write(f"To reach $2,000/month passive income:\n", 'highlight')
+            needed = target_value(2000, withdrawal_rate)
+            out.write(f"  Portfolio needed: ${needed:,.2f}\n")
+            required = solve_monthly(needed, annual_increase, years, initial, weighted_return)
+            if required is not None:
+                out.write(f"  Monthly contribution to get there in {years} years: ${required:,.2f}\n")
+            years_needed = solve_years(needed, monthly, annual_increase, initial, weighted_return)
+            if years_needed is not None:
+                out.write(f"  Years needed at your current contribution: {years_needed}\n")
+            out.write("\n")
+            out.write("STRATEGIES TO GET THERE FASTER:\n")
+            out.write("  - Increase contributions as income grows\n", 'success')
+            out.write("  - Invest windfalls (bonuses, tax returns)\n", 'success')
+            out.write("  - Build additional income streams\n", 'success')
+            out.write("  - Consider lower cost-of-living locations\n\n", 'success')
+            out.write("Remember: Consistency beats perfection!\n", 'highlight')
+        else:
+            out.write(f"You're on track for ${monthly_income:,.2f}/month in passive income!\n\n", 'success')
+            out.write("This could support a comfortable lifestyle in many parts\n")
+            out.write("of the world. Keep building your empire!\n")
+        return out
+
+    def yearly_table():
+        out = ReportBuffer()
+        out.write(f"{'Year':>4}  {'Portfolio':>16}  {'Contributed':>16}  {'Gains':>16}  {'Income/mo':>12}\n", 'highlight')
+        for year in range(1, years + 1):
+            value = portfolio_values[year * 12]
+            contributed = contributions_total[year * 12] + initial
+            out.write(f"{year:>4}  ${value:>15,.2f}  ${contributed:>15,.2f}  "
+                      f"${value - contributed:>15,.2f}  ${value * withdrawal_rate / 12:>11,.2f}\n")
+        return out
+
+    return [
+        ReportSection(f"  YOUR PATH TO FINANCIAL FREEDOM - {years} YEAR PROJECTION", overview, lead='\n', trail='\n'),
+        ReportSection(f"FINAL RESULTS AFTER {years} YEARS", final_results, lead='\n'),
+        ReportSection("STEP-BY-STEP ACTION PLAN FOR YOUR JOURNEY", action_plan, trail='\n'),
+        ReportSection("YOUR FIRST WEEK ACTION CHECKLIST", checklist),
+        ReportSection("MILESTONE CHECKPOINTS", checkpoints, tag='subheader', rule='-', above=False),
+        ReportSection("ACCELERATE YOUR JOURNEY" if monthly_income < 2000 else "CONGRATULATIONS!", outlook, lead='\n'),
+        ReportSection("YEAR-BY-YEAR BREAKDOWN", yearly_table, tag='subheader', rule='-', above=False,
+                      lead='\n', expanded=False),
+    ]
+
+
+def projection_report(*args, **kwargs):
+    """Full projection report as a ReportBuffer; takes the same arguments as projection_sections"""
+    return join_sections(projection_sections(*args, **kwargs))
+
+
+def monte_carlo_section(low, median, high, paths, withdrawal_rate):
+    """Monte Carlo outlook appended to the report once every path is in"""
+    return ReportSection(f"MONTE CARLO OUTLOOK ({paths:,} simulated paths)", lambda: _monte_carlo_body(
+        low, median, high, withdrawal_rate), lead='\n')
+
+
+def monte_carlo_report(low, median, high, paths, withdrawal_rate):
+    return join_sections([monte_carlo_section(low, median, high, paths, withdrawal_rate)])
+
+
+def _monte_carlo_body(low, median, high, withdrawal_rate):
+    out = ReportBuffer()
+    out.write(f"Pessimistic (P5):  ${low:,.2f}  -> ${low * withdrawal_rate / 12:,.2f}/month passive\n")
+    out.write(f"Median (P50):      ${median:,.2f}  -> ${median * withdrawal_rate / 12:,.2f}/month passive\n", 'success')
+    out.write(f"Optimistic (P95):  ${high:,.2f}  -> ${high * withdrawal_rate / 12:,.2f}/month passive\n")
+    return out
+
+
+def backtest_section(backtest, years, withdrawal_rate):
+    """Historical backtest outcomes, or why there are none (``backtest`` may be an error message)"""
+    if isinstance(backtest, str):
+        title = "HISTORICAL BACKTEST"
+    else:
+        title = f"HISTORICAL BACKTEST ({len(backtest):,} rolling {years}-year windows)"
+    return ReportSection(title, lambda: _backtest_body(backtest, withdrawal_rate), lead='\n')
+
+
+def _backtest_body(backtest, withdrawal_rate):
+    out = ReportBuffer()
+    if isinstance(backtest, str):
+        out.write(f"Not available: {backtest}\n")
+        return out
+    out.write(f"History: {backtest.source}\n", 'highlight')
+    for label, which, tag in (("Worst start:", 'worst', None), ("Median start:", 'median', 'success'),
+                              ("Best start:", 'best', None)):
+        start, final = backtest.outcome(which)
+        out.write(f"{label:<15}${final:,.2f}  -> ${final * withdrawal_rate / 12:,.2f}/month passive"
+                  f"  (from {start})\n", tag)
+    return out
+
+
+def retirement_section(results, final_value, withdrawal_rate):
+    """Retirement check: how long withdrawals from ``final_value`` last on each set of paths
+
+    ``results`` holds DecumulationResults, or error messages for the ones that could not run.
+    """
+    first = next((result for result in results if not isinstance(result, str)), None)
+    title = "RETIREMENT CHECK"
+    if first is not None:
+        title += f" ({first.months // 12} years of withdrawals, +{first.inflation:.1%}/year for inflation)"
+    return ReportSection(title, lambda: _retirement_body(results, final_value, withdrawal_rate), lead='\n')
+
+
+def _retirement_body(results, final_value, withdrawal_rate):
+    from decumulation import SUCCESS_TARGET
+    out = ReportBuffer()
+    out.write(f"First-year withdrawal at {withdrawal_rate:.2%} of ${final_value:,.2f}: "
+              f"${final_value * withdrawal_rate:,.2f} (${final_value * withdrawal_rate / 12:,.2f}/month)\n")
+    for result in results:
+        out.write("\n")
+        if isinstance(result, str):
+            out.write(f"Not available: {result}\n")
+            continue
+        out.write(f"Paths: {result.source}\n", 'highlight')
+        if withdrawal_rate >= result.rates.min():
+            success = result.success(withdrawal_rate)
+            out.write(f"Lasts at {withdrawal_rate:.2%}:  {success:.1%} of paths\n",
+                      'success' if success >= SUCCESS_TARGET else None)
+        else:
+            out.write(f"{withdrawal_rate:.2%} is below the lowest rate checked ({result.rates.min():.2%})\n")
+        safe = result.max_safe_rate()
+        if safe is None:
+            out.write(f"No rate from {result.rates.min():.2%} up lasts in {SUCCESS_TARGET:.0%} of paths\n")
+        else:
+            out.write(f"Highest rate lasting in {SUCCESS_TARGET:.0%} of paths:  {safe:.2%}  "
+                      f"(${final_value * safe:,.2f} in the first year)\n", 'success')
+        out.write(f"{'Rate':>8}{'Lasts':>9}{'Median run-out':>17}\n")
+        # Every half point keeps the table short; the quarter points are in the sweep
+        for rate, success in zip(result.rates, result.success_rates):
+            if round(rate * 400) % 2:
+                continue
+            month = result.median_depletion(rate)
+            run_out = f"year {month / 12:.1f}" if month is not None else "-"
+            out.write(f"{rate:>8.2%}{success:>9.1%}{run_out:>17}\n")
+    return out
+
+
+def optimizer_section(result):
+    """Optimized allocation and efficient frontier from an optimizer.Optimization"""
+    goal = "highest median" if result.objective == 'median' else f"lowest chance of ending below ${result.target:,.0f}"
+    return ReportSection(f"OPTIMIZED ALLOCATION ({len(result):,} mixes scored, {goal})",
+                         lambda: _optimizer_body(result), lead='\n')
+
+
+def _optimizer_mix(result, index):
+    percentages = result.slider_percentages(index)
+    return ", ".join(f"{percent}% {strategy}" for strategy, percent in
+                     sorted(percentages.items(), key=lambda item: -item[1]) if percent)
+
+
+def _optimizer_outcome(result, index):
+    median, low, shortfall = result.outcome(index)
+    text = f"median ${median:,.2f}, P5 ${low:,.2f}, volatility {result.volatilities[index]:.1f}%/year"
+    if shortfall is not None:
+        text += f", {shortfall:.1%} below target"
+    return text
+
+
+def _optimizer_body(result):
+    out = ReportBuffer()
+    out.write(f"Optimum: {_optimizer_mix(result, result.best)}\n", 'highlight')
+    out.write(f"  {_optimizer_outcome(result, result.best)}\n", 'success')
+    if result.current is not None:
+        out.write(f"Your mix: {_optimizer_mix(result, result.current)}\n")
+        out.write(f"  {_optimizer_outcome(result, result.current)}\n")
+    if result.caps:
+        out.write("Caps: " + ", ".join(f"{strategy} at most {cap:.0%}" for strategy, cap in result.caps.items())
+                  + "\n")
+    out.write("\nEfficient frontier (no other mix has a higher median at lower volatility):\n", 'subheader')
+    below = result.shortfalls is not None
+    out.write(f"{'Volatility':>10}{'Median':>16}{'P5':>16}" + (f"{'Below':>8}" if below else "") + "  Mix\n")
+    for index in result.frontier_points():
+        median, low, shortfall = result.outcome(index)
+        out.write(f"{result.volatilities[index]:>9.1f}%{median:>16,.0f}{low:>16,.0f}"
+                  + (f"{shortfall:>8.1%}" if below else "") + f"  {_optimizer_mix(result, index)}\n")
+    out.write("Median, P5 and shortfall are simulated on the same Monte Carlo paths for every mix shown.\n")
+    return out
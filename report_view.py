@@ -0,0 +1,109 @@
+"""Virtualized results panel built on a Tk Text widget.
+
+Only section headings are inserted up front. The body of an expanded
+section is built and inserted once its heading scrolls within
+``lookahead_lines`` of the bottom of the view; collapsing a section deletes
+its body from the widget again. Sections are materialized strictly in
+order, so text above the visible region never moves while scrolling.
+"""
+from report import insert_segments
+
+EXPANDED_MARKER = '[-] '
+COLLAPSED_MARKER = '[+] '
+
+
+class ReportView:
+    """Collapsible, lazily materialized ReportSections in a Text widget"""
+
+    def __init__(self, text, scrollbar, lookahead_lines=60):
+        self.text = text
+        self.scrollbar = scrollbar
+        self.lookahead_lines = lookahead_lines
+        self.sections = []
+        self.materialized = set()
+        self._refresh_job = None
+        text.config(yscrollcommand=self._on_scroll)
+        text.bind('<Configure>', lambda event: self._schedule_refresh(), add='+')
+
+    def show(self, sections):
+        """Replace the report with ``sections``"""
+        self.text.delete('1.0', 'end')
+        for i in range(len(self.sections)):
+            self.text.tag_delete(self._heading_tag(i), self._body_tag(i))
+        self.sections = []
+        self.materialized = set()
+        self.append(sections)
+
+    def append(self, sections):
+        """Add sections after the existing ones"""
+        for section in sections:
+            self.sections.append(section)
+            index = len(self.sections) - 1
+            self._insert_heading(index, 'end-1c')
+            tag = self._heading_tag(index)
+            self.text.tag_bind(tag, '<Button-1>', lambda event, i=index: self.toggle(i))
+            self.text.tag_bind(tag, '<Enter>', lambda event: self.text.config(cursor='hand2'))
+            self.text.tag_bind(tag, '<Leave>', lambda event: self.text.config(cursor=''))
+        self._schedule_refresh()
+
+    def replace(self, index, section):
+        """Swap section ``index`` for ``section`` in place; the sections after it keep their positions"""
+        body = self.text.tag_ranges(self._body_tag(index))
+        if body:
+            self.text.delete(*body)
+        start, end = self.text.tag_ranges(self._heading_tag(index))
+        start = self.text.index(start)
+        self.text.delete(start, end)
+        self.sections[index] = section
+        self.materialized.discard(index)
+        self._insert_heading(index, start)
+        self._schedule_refresh()
+
+    def toggle(self, index):
+        """Expand or collapse a section; collapsed bodies are removed from the widget"""
+        section = self.sections[index]
+        section.expanded = not section.expanded
+        start, end = self.text.tag_ranges(self._heading_tag(index))
+        start = self.text.index(start)
+        self.text.delete(start, end)
+        self._insert_heading(index, start)
+        if not section.expanded and index in self.materialized:
+            body = self.text.tag_ranges(self._body_tag(index))
+            if body:
+                self.text.delete(*body)
+            self.materialized.discard(index)
+        self._schedule_refresh()
+
+    def _insert_heading(self, index, position):
+        section = self.sections[index]
+        marker = EXPANDED_MARKER if section.expanded else COLLAPSED_MARKER
+        insert_segments(self.text, position, section.heading(marker).segments, (self._heading_tag(index),))
+
+    @staticmethod
+    def _heading_tag(index):
+        return f'report-heading-{index}'
+
+    @staticmethod
+    def _body_tag(index):
+        return f'report-body-{index}'
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        if self._refresh_job is None:
+            self._refresh_job = self.text.after_idle(self.refresh)
+
+    def refresh(self):
+        """Materialize expanded sections whose headings are in or near the view"""
+        self._refresh_job = None
+        for index, section in enumerate(self.sections):
+            if not section.expanded or index in self.materialized:
+                continue
+            start, end = self.text.tag_ranges(self._heading_tag(index))
+            bottom = self.text.index(f'@0,{self.text.winfo_height()} + {self.lookahead_lines} lines')
+            if self.text.compare(start, '>', bottom):
+                break
+            insert_segments(self.text, end, section.body().segments, (self._body_tag(index),))
+            self.materialized.add(index)
@@ -0,0 +1,183 @@
+"""Memory-mapped on-disk store for projection matrices larger than RAM.
+
+A store is a directory holding
+
+    meta.json          format version, scenario count, horizon and dtype
+    values.npy         (scenarios, horizon + 1) portfolio values
+    contributions.npy  (scenarios, horizon + 1) cumulative contributions
+    inputs.npy         (scenarios, 5) monthly, annual_increase, years,
+                       initial, weighted_return
+
+The matrices are plain ``.npy`` files created with ``open_memmap`` and
+filled one chunk of rows at a time, so a sweep never holds more than a
+chunk in memory. Readers map them read-only: ``row`` and ``batch`` return
+views into the files, and only the pages a chart or report touches are
+read from disk. Rows are NaN-padded past their own horizon, like
+``project_batch``.
+
+Usage:
+    python result_store.py STORE [--scenario 0] [--withdrawal-rate 4] [--png chart.png]
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from projection_engine import BatchProjection, ProjectionResult, project_batch
+
+FORMAT_VERSION = 1
+INPUT_COLUMNS = ('monthly', 'annual_increase', 'years', 'initial', 'weighted_return')
+
+
+class ResultStore:
+    """Projection matrices in memory-mapped ``.npy`` files; see the module docstring"""
+
+    def __init__(self, path, meta, values, contributions, inputs):
+        self.path = path
+        self.meta = meta
+        self.values = values
+        self.contributions = contributions
+        self.inputs = inputs
+
+    @classmethod
+    def create(cls, path, scenarios, horizon, dtype=np.float64):
+        """Allocate an empty store for ``scenarios`` rows of ``horizon`` months"""
+        os.makedirs(path, exist_ok=True)
+        shape = (int(scenarios), int(horizon) + 1)
+        meta = {'format': FORMAT_VERSION, 'scenarios': shape[0], 'horizon': int(horizon),
+                'dtype': np.dtype(dtype).name, 'inputs': list(INPUT_COLUMNS), 'complete': False}
+        store = cls(path, meta,
+                    open_memmap(os.path.join(path, 'values.npy'), 'w+', dtype, shape),
+                    open_memmap(os.path.join(path, 'contributions.npy'), 'w+', dtype, shape),
+                    open_memmap(os.path.join(path, 'inputs.npy'), 'w+', np.float64,
+                                (shape[0], len(INPUT_COLUMNS))))
+        store._write_meta()
+        return store
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        """Map an existing store; ``mode='r+'`` allows writing"""
+        with open(os.path.join(path, 'meta.json')) as source:
+            meta = json.load(source)
+        if meta.get('format') != FORMAT_VERSION:
+            raise ValueError(f"unsupported result store format {meta.get('format')!r} in {path}")
+        arrays = [np.load(os.path.join(path, name), mmap_mode=mode)
+                  for name in ('values.npy', 'contributions.npy', 'inputs.npy')]
+        return cls(path, meta, *arrays)
+
+    def __len__(self):
+        return self.meta['scenarios']
+
+    @property
+    def horizon(self):
+        return self.meta['horizon']
+
+    def _write_meta(self):
+        with open(os.path.join(self.path, 'meta.json'), 'w') as target:
+            json.dump(self.meta, target, indent=2)
+            target.write('\n')
+
+    def write(self, start, batch, inputs):
+        """Copy a BatchProjection and its (rows, 5) inputs into rows ``start:``"""
+        stop = start + len(batch)
+        width = batch.portfolio_values.shape[1]
+        self.values[start:stop, :width] = batch.portfolio_values
+        self.values[start:stop, width:] = np.nan
+        self.contributions[start:stop, :width] = batch.contributions_total
+        self.contributions[start:stop, width:] = np.nan
+        self.inputs[start:stop] = inputs
+
+    def close(self):
+        """Flush a writable store and mark it complete"""
+        for array in (self.values, self.contributions, self.inputs):
+            array.flush()
+        self.meta['complete'] = True
+        self._write_meta()
+
+    def scenario(self, index):
+        """{input column: value} for one row"""
+        return dict(zip(INPUT_COLUMNS, self.inputs[index].tolist()))
+
+    def row(self, index):
+        """Unpadded ProjectionResult whose arrays are views into the mapped files"""
+        inputs = self.scenario(index)
+        end = int(inputs['years']) * 12 + 1
+        return ProjectionResult(self.values[index, :end], self.contributions[index, :end],
+                                inputs['weighted_return'] / 100 / 12)
+
+    def batch(self, rows=slice(None)):
+        """BatchProjection over a contiguous slice of rows, without copying"""
+        inputs = self.inputs[rows]
+        return BatchProjection(self.values[rows], self.contributions[rows],
+                               inputs[:, 2].astype(np.int64) * 12, inputs[:, 4] / 100 / 12)
+
+
+def project_to_store(path, monthly, annual_increase, years, initial, weighted_return,
+                     chunk_size=10000, dtype=np.float64):
+    """Project N scenarios straight into a new store, ``chunk_size`` rows at a time
+
+    Takes the same arguments as ``project_batch``; returns the store, open
+    for reading.
+    """
+    columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(arg, dtype=float))
+                                    for arg in (monthly, annual_increase, years, initial, weighted_return)))
+    inputs = np.column_stack(columns)
+    horizon = int(inputs[:, 2].astype(np.int64).max()) * 12 if len(inputs) else 0
+    store = ResultStore.create(path, len(inputs), horizon, dtype)
+    for start in range(0, len(inputs), chunk_size):
+        chunk = inputs[start:start + chunk_size]
+        store.write(start, project_batch(*chunk.T, dtype=dtype), chunk)
+    store.close()
+    return ResultStore.open(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('store', help="result store directory")
+    parser.add_argument('--scenario', type=int, default=0, help="row to show (default 0)")
+    parser.add_argument('--withdrawal-rate', type=float, default=4.0, help="safe withdrawal rate (%%)")
+    parser.add_argument('--png', help="also render the five-panel chart for the scenario to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        store = ResultStore.open(args.store)
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"error: {exc}\n")
+    if not 0 <= args.scenario < len(store):
+        parser.exit(2, f"error: scenario {args.scenario} out of range (store has {len(store):,})\n")
+
+    from milestones import MilestoneIndex
+    inputs = store.scenario(args.scenario)
+    result = store.row(args.scenario)
+    milestones = MilestoneIndex(result.portfolio_values)
+    contributed = result.contributions_total[-1] + inputs['initial']
+    print(f"store: {len(store):,} scenarios x {store.horizon + 1} months ({store.meta['dtype']}"
+          f"{'' if store.meta['complete'] else ', incomplete'})")
+    print(f"scenario {args.scenario}: " + ', '.join(f"{name}={value:g}" for name, value in inputs.items()))
+    print(f"final value ${result.final_value:,.2f}, contributed ${contributed:,.2f}, "
+          f"monthly income ${result.final_value * args.withdrawal_rate / 100 / 12:,.2f}")
+    for target, month in milestones.reached():
+        print(f"  ${target:>9,} after {month / 12:.1f} years")
+
+    if args.png:
+        import matplotlib
+        matplotlib.use('Agg')
+        from chart_panel import WealthChart
+        chart = WealthChart({'bg_light': '#0f3460', 'bg_medium': '#16213e', 'accent_blue': '#00d4ff',
+                             'accent_gold': '#ffd700', 'text_color': '#e4e4e4', 'text_dim': '#a0a0a0'})
+        chart.attach_headless()
+        chart.update({'time_array': np.arange(result.months + 1) / 12,
+                      'portfolio_values': np.asarray(result.portfolio_values, dtype=float),
+                      'contributions_total': np.asarray(result.contributions_total, dtype=float),
+                      'years': int(inputs['years']), 'withdrawal_rate': args.withdrawal_rate / 100,
+                      'milestones': milestones, 'monthly': inputs['monthly'],
+                      'annual_increase': inputs['annual_increase'], 'initial': inputs['initial']})
+        chart.figure.savefig(args.png, facecolor=chart.figure.get_facecolor())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
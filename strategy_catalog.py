@@ -0,0 +1,81 @@
+"""Strategy catalog shared by the GUI and the headless engines."""
+
+# Return rates for each strategy (annual %)
+RETURN_RATES = {
+    'High-Yield Savings': 4.5,
+    'Roth IRA': 8.0,
+    'Index Funds (S&P500)': 8.0,
+    'Robo-Advisor': 7.5,
+    'Round-Up Apps': 7.5,
+    'Certificates of Deposit': 5.0,
+    'Treasury Bonds': 4.0,
+    'Crypto (High Risk)': 15.0,
+    'Real Estate Crowdfund': 9.0
+}
+
+# Risk levels
+RISK_LEVELS = {
+    'High-Yield Savings': 'Very Low',
+    'Roth IRA': 'Medium',
+    'Index Funds (S&P500)': 'Medium',
+    'Robo-Advisor': 'Medium',
+    'Round-Up Apps': 'Medium',
+    'Certificates of Deposit': 'Very Low',
+    'Treasury Bonds': 'Very Low',
+    'Crypto (High Risk)': 'Very High',
+    'Real Estate Crowdfund': 'Medium-High'
+}
+
+# Annualized volatility (standard deviation of returns, %) used by Monte Carlo mode
+VOLATILITIES = {
+    'High-Yield Savings': 0.5,
+    'Roth IRA': 15.0,
+    'Index Funds (S&P500)': 15.0,
+    'Robo-Advisor': 11.0,
+    'Round-Up Apps': 13.0,
+    'Certificates of Deposit': 0.3,
+    'Treasury Bonds': 5.0,
+    'Crypto (High Risk)': 70.0,
+    'Real Estate Crowdfund': 12.0
+}
+
+# Largest share of the portfolio the allocation optimizer may give a strategy;
+# crypto follows the provider advice in the report ("5-10% of portfolio MAX")
+ALLOCATION_CAPS = {
+    'Crypto (High Risk)': 0.10,
+}
+
+# Correlation of monthly return shocks between strategies, used by Monte Carlo
+# mode. Pairs are unordered; pairs not listed are uncorrelated. Stock-market
+# strategies move together, cash-like ones barely move with anything.
+CORRELATIONS = {
+    ('Roth IRA', 'Index Funds (S&P500)'): 0.95,
+    ('Roth IRA', 'Robo-Advisor'): 0.9,
+    ('Roth IRA', 'Round-Up Apps'): 0.85,
+    ('Index Funds (S&P500)', 'Robo-Advisor'): 0.9,
+    ('Index Funds (S&P500)', 'Round-Up Apps'): 0.85,
+    ('Robo-Advisor', 'Round-Up Apps'): 0.85,
+    ('Real Estate Crowdfund', 'Roth IRA'): 0.5,
+    ('Real Estate Crowdfund', 'Index Funds (S&P500)'): 0.5,
+    ('Real Estate Crowdfund', 'Robo-Advisor'): 0.45,
+    ('Real Estate Crowdfund', 'Round-Up Apps'): 0.45,
+    ('Crypto (High Risk)', 'Roth IRA'): 0.3,
+    ('Crypto (High Risk)', 'Index Funds (S&P500)'): 0.3,
+    ('Crypto (High Risk)', 'Robo-Advisor'): 0.25,
+    ('Crypto (High Risk)', 'Round-Up Apps'): 0.25,
+    ('Crypto (High Risk)', 'Real Estate Crowdfund'): 0.15,
+    ('Treasury Bonds', 'Roth IRA'): -0.1,
+    ('Treasury Bonds', 'Index Funds (S&P500)'): -0.1,
+    ('Treasury Bonds', 'Robo-Advisor'): 0.1,
+    ('Treasury Bonds', 'Round-Up Apps'): -0.05,
+    ('Treasury Bonds', 'Certificates of Deposit'): 0.3,
+    ('Treasury Bonds', 'High-Yield Savings'): 0.2,
+    ('High-Yield Savings', 'Certificates of Deposit'): 0.6,
+}
+
+
+def correlation(a, b, correlations=CORRELATIONS):
+    """Correlation between two strategies in a {(a, b): rho} mapping, in either order"""
+    if a == b:
+        return 1.0
+    return correlations.get((a, b), correlations.get((b, a), 0.0))
@@ -0,0 +1,97 @@
+"""Latest-request-wins background worker used for live recalculation.
+
+The worker never touches Tk. Jobs run on a single daemon thread and hand
+their results to a queue; the GUI drains it with ``poll()`` from
+``root.after`` callbacks on the main thread.
+"""
+import queue
+import threading
+
+
+class Job:
+    """Handle passed to a running job for cooperative cancellation and progress"""
+
+    def __init__(self, worker, generation, handler):
+        self._worker = worker
+        self.generation = generation
+        self.handler = handler
+
+    def cancelled(self):
+        """True once a newer request has been submitted"""
+        return self.generation != self._worker.generation
+
+    def publish(self, value):
+        """Hand a partial result to the GUI while the job keeps running"""
+        if not self.cancelled():
+            self._worker._results.put((self.generation, self.handler, value, None, False))
+
+
+class BackgroundWorker:
+    """Runs submitted jobs on one daemon thread, dropping stale requests
+
+    Only the most recent pending request is kept, so a burst of slider
+    events costs a single computation. Every submission bumps
+    ``generation``; running jobs can check ``job.cancelled()`` to stop early,
+    and results from superseded generations are discarded.
+    """
+
+    def __init__(self, name="recalculation-worker"):
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._pending = None
+        self._running = False
+        self._wakeup = threading.Event()
+        self._results = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, handler=None):
+        """Queue ``fn(job, *args)``, replacing any request that has not started yet
+
+        ``handler`` is returned alongside the result by ``poll`` so the
+        caller knows how to apply it. Returns the request's generation.
+        """
+        with self._lock:
+            self.generation += 1
+            self._pending = (self.generation, fn, args, handler)
+        self._wakeup.set()
+        return self.generation
+
+    def cancel(self):
+        """Drop the pending request and mark the running one as stale"""
+        with self._lock:
+            self.generation += 1
+            self._pending = None
+
+    @property
+    def busy(self):
+        return self._running or self._pending is not None or not self._results.empty()
+
+    def poll(self):
+        """Drain finished work; returns (handler, value, error, done) for current results only"""
+        current = []
+        while True:
+            try:
+                generation, handler, value, error, done = self._results.get_nowait()
+            except queue.Empty:
+                return current
+            if generation == self.generation:
+                current.append((handler, value, error, done))
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                self._wakeup.clear()
+                request, self._pending = self._pending, None
+                self._running = request is not None
+            if request is None:
+                continue
+
+            generation, fn, args, handler = request
+            try:
+                result, error = fn(Job(self, generation, handler), *args), None
+            except Exception as exc:
+                result, error = None, exc
+            self._results.put((generation, handler, result, error, True))
+            self._running = False